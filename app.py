@@ -1,8 +1,13 @@
 import streamlit as st
 import os
-import time
-from blockchain_research import conduct_research
-from utils import download_markdown
+import uuid
+import jobs
+from batch_research import load_topics
+from comparison import MAX_ENTITIES, parse_entities
+from crawl_cache import normalize_topic
+from report_archive import get_default_archive
+from prefetch import get_default_prefetcher
+from utils import report_markdown
 
 # Set page configuration
 st.set_page_config(
@@ -43,6 +48,117 @@ research_topic = st.sidebar.text_area("Enter your research topic",
 st.sidebar.subheader("Research Settings")
 research_depth = st.sidebar.slider("Research Depth", min_value=1, max_value=5, value=3, 
                                   help="Higher values lead to more comprehensive research but take longer")
+compare_entities = parse_entities(st.sidebar.text_input(
+    "Compare protocols (optional)", placeholder="e.g. Solana, Sui",
+    help="Two or more protocols separated by commas, compared in one report from a single shared crawl"
+))
+
+# Background jobs shared by every session; each browser session has its own id and report cache
+@st.cache_resource
+def get_job_manager():
+    return jobs.get_default_job_manager()
+
+job_manager = get_job_manager()
+report_archive = get_default_archive()
+
+# Archived reports younger than this are shown straight away while a refresh runs
+ARCHIVE_MAX_AGE = float(os.getenv("REPORT_ARCHIVE_MAX_AGE", 7 * 24 * 3600))
+
+# Warm the caches for the example topics (or PREFETCH_TOPICS_FILE) once per process when
+# PREFETCH_ON_STARTUP is set and API keys are configured; PREFETCH_INTERVAL repeats it
+@st.cache_resource
+def get_prefetcher():
+    prefetcher = get_default_prefetcher()
+    if (os.getenv("PREFETCH_ON_STARTUP", "") in ("1", "true", "yes")
+            and os.getenv("OPENAI_API_KEY") and os.getenv("FIRECRAWL_API_KEY")):
+        topics_file = os.getenv("PREFETCH_TOPICS_FILE")
+        topics = load_topics(topics_file) if topics_file else example_prompts
+        prefetcher.start(topics, interval=float(os.getenv("PREFETCH_INTERVAL", 0)) or None)
+    return prefetcher
+
+prefetcher = get_prefetcher()
+
+# Start crawling a picked example topic while the user is still adjusting the settings
+if selected_prompt and firecrawl_api_key:
+    prefetcher.prefetch_crawl(selected_prompt, research_depth, api_key=firecrawl_api_key)
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+if "reports" not in st.session_state:
+    st.session_state.reports = {}
+
+def report_key(topic, depth):
+    """Key of a finished report in this session's cache"""
+    return f"{normalize_topic(topic)}|{depth}"
+
+def render_report(topic, sections):
+    """Lay out the report sections (possibly partial) in expanders"""
+    st.subheader("Research Results: " + topic)
+    
+    # Research overview tab
+    with st.expander("📊 Research Overview", expanded=True):
+        st.markdown(sections.get('overview', ''))
+        st.image("https://pixabay.com/get/g99ac5c6150f0c9bd1c6c451a2891c8c6eea30bde5c48035a73f7c5978917c50a08c06cab171797999552c5f554624d8479e93ebc95763c54b2cc62d82710c2a5_1280.jpg", 
+                  caption="Cryptocurrency Research", use_column_width=True)
+    
+    # Technical analysis tab
+    with st.expander("🔬 Technical Analysis", expanded=True):
+        st.markdown(sections.get('technical_analysis', ''))
+    
+    # Market and adoption tab
+    with st.expander("📈 Market & Adoption"):
+        st.markdown(sections.get('market_adoption', ''))
+        st.image("https://pixabay.com/get/g2e2bfdc7f83ef21e9dce6587bf99709225cbf501a48fef1797462867b5b7e2bed677056788685a17d310800ce2dc24c299213ec701b4cbcf5f3f9896c3ecfc61_1280.jpg", 
+                 caption="Data Analysis Dashboard", use_column_width=True)
+    
+    # Regulatory considerations tab
+    with st.expander("⚖️ Regulatory Considerations"):
+        st.markdown(sections.get('regulatory', ''))
+    
+    # Future outlook tab
+    with st.expander("🔮 Future Outlook"):
+        st.markdown(sections.get('future_outlook', ''))
+    
+    # References tab
+    with st.expander("📚 References & Sources"):
+        st.markdown(sections.get('references', ''))
+
+def describe_age(seconds):
+    """Human-readable age of an archived report"""
+    if seconds < 3600:
+        return f"{int(seconds // 60)} minutes"
+    if seconds < 2 * 86400:
+        return f"{int(seconds // 3600)} hours"
+    return f"{int(seconds // 86400)} days"
+
+@st.fragment(run_every=1.0)
+def show_job_progress(job_id, topic, archived=None):
+    """Poll a running job once a second, re-rendering only this fragment"""
+    job = job_manager.get(job_id)
+    if job is None or job["status"] in jobs.FINISHED_STATES:
+        # Rerun the whole script so the finished report replaces the polling view
+        st.rerun()
+    
+    live = job_manager.live(job_id)
+    st.progress(job["progress"])
+    status = job["stage"] or ""
+    if job["status"] == jobs.RUNNING and live["analysis_chars"] and job["progress"] < 0.6:
+        status += f" ({live['analysis_chars']:,} characters)"
+    st.text(status)
+    if live["sources"]:
+        caption = "Sources: " + ", ".join(str(source) for source in live["sources"])
+        if live["tokens_cleaned"]:
+            caption += f" — stripped ~{live['tokens_cleaned']:,} boilerplate tokens"
+        if live["tokens_removed"]:
+            caption += f" — removed ~{live['tokens_removed']:,} duplicate tokens"
+        st.caption(caption)
+    
+    if archived is not None:
+        # Offer the earlier report on a similar topic until the refreshed one is ready
+        st.info(f"Showing an archived report on \"{archived['topic']}\" from {describe_age(archived['age'])} ago "
+                "while a fresh one is researched in the background.")
+        render_report(topic, archived["sections"])
+    else:
+        render_report(topic, live["sections"])
 
 # Conduct research button
 if st.sidebar.button("Start Research", type="primary", disabled=not (openai_api_key and firecrawl_api_key and research_topic)):
@@ -50,100 +166,90 @@ if st.sidebar.button("Start Research", type="primary", disabled=not (openai_api_
         st.sidebar.error("Please enter both API keys to proceed.")
     elif not research_topic:
         st.sidebar.error("Please enter a research topic.")
+    elif len(compare_entities) == 1 or len(compare_entities) > MAX_ENTITIES:
+        st.sidebar.error(f"Enter between 2 and {MAX_ENTITIES} protocols to compare, or leave the field empty.")
     else:
-        # Set API keys as environment variables
-        os.environ["OPENAI_API_KEY"] = openai_api_key
-        os.environ["FIRECRAWL_API_KEY"] = firecrawl_api_key
+        # The keys go with this session's job only; other sessions may be using other keys
+        api_keys = {"openai": openai_api_key, "firecrawl": firecrawl_api_key}
+        research_options = {}
+        if compare_entities:
+            # Naming the entities keeps comparisons apart from plain reports on the same question
+            research_topic = f"{research_topic} ({' vs '.join(compare_entities)})"
+            research_options["compare"] = compare_entities
         
-        # Display blockchain technology images in the main panel
-        col1, col2 = st.columns(2)
-        with col1:
-            st.image("https://pixabay.com/get/g378abe9a7e28ab4586b0b6379761bd2b11525058647d539e783fc22f463158ae391ccc3e2333a1089190600ccec79d11fcbb8d25f99a476661590b47407b54e9_1280.jpg", 
-                     caption="Blockchain Technology", use_column_width=True)
-        with col2:
-            st.image("https://pixabay.com/get/gde86c75ed5d083b1ffe8c0594ab284435c2337a85d79b47b370bf89b504d2e70c539bdeb34bdea252c593e12eb2c56316b124e4e47a510ebcb2575dbe640e3b7_1280.jpg", 
-                     caption="Distributed Ledger", use_column_width=True)
+        key = report_key(research_topic, research_depth)
+        if key not in st.session_state.reports:
+            # A report this session finished earlier (e.g. before a page reload) is reused as is
+            finished = job_manager.store.find_completed(st.session_state.session_id, research_topic, research_depth)
+            if finished is not None:
+                st.session_state.reports[key] = finished["results"]
         
-        # Research progress tracking
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        # Research phases
-        phases = [
-            "Initializing research assistant...",
-            "Exploring blockchain sources with Firecrawl...",
-            "Synthesizing protocol details and metrics...",
-            "Elaborating on technical implications...",
-            "Generating comprehensive research report..."
-        ]
+        job_id = None
+        archived = None
+        if key not in st.session_state.reports:
+            if report_archive is not None:
+                archived = report_archive.find_similar(research_topic, research_depth, max_age=ARCHIVE_MAX_AGE,
+                                                       compare=compare_entities or None)
+            # Users asking for the same topic with the same API keys at the same time share one job
+            job_id, _ = job_manager.submit_coalesced(research_topic, research_depth,
+                                                     session_id=st.session_state.session_id,
+                                                     api_keys=api_keys, **research_options)
+        st.session_state.active_research = {"topic": research_topic, "depth": research_depth,
+                                            "key": key, "job_id": job_id, "archived": archived}
+
+# Full-text search over earlier reports
+if report_archive is not None:
+    archive_query = st.sidebar.text_input("Search past reports")
+    if archive_query:
+        matches = report_archive.search(archive_query, limit=5)
+        if not matches:
+            st.sidebar.caption("No archived reports match.")
+        for match in matches:
+            if st.sidebar.button(f"{match['topic']} (depth {match['depth']})", key=f"archived-{match['id']}"):
+                report = report_archive.get(match["id"])
+                key = report_key(report["topic"], report["depth"])
+                st.session_state.reports[key] = report["sections"]
+                st.session_state.active_research = {"topic": report["topic"], "depth": report["depth"],
+                                                    "key": key, "job_id": None, "archived": None}
+            st.sidebar.caption(match["snippet"])
+
+active_research = st.session_state.get("active_research")
+if active_research:
+    # Display blockchain technology images in the main panel
+    col1, col2 = st.columns(2)
+    with col1:
+        st.image("https://pixabay.com/get/g378abe9a7e28ab4586b0b6379761bd2b11525058647d539e783fc22f463158ae391ccc3e2333a1089190600ccec79d11fcbb8d25f99a476661590b47407b54e9_1280.jpg", 
+                 caption="Blockchain Technology", use_column_width=True)
+    with col2:
+        st.image("https://pixabay.com/get/gde86c75ed5d083b1ffe8c0594ab284435c2337a85d79b47b370bf89b504d2e70c539bdeb34bdea252c593e12eb2c56316b124e4e47a510ebcb2575dbe640e3b7_1280.jpg", 
+                 caption="Distributed Ledger", use_column_width=True)
+    
+    shown_topic = active_research["topic"]
+    research_results = st.session_state.reports.get(active_research["key"])
+    job = job_manager.get(active_research["job_id"]) if research_results is None and active_research["job_id"] else None
+    
+    if job is not None and job["status"] == jobs.COMPLETED:
+        research_results = st.session_state.reports[active_research["key"]] = job["results"]
+    
+    if research_results is not None:
+        st.progress(100)
+        st.text("Research completed!")
+        render_report(shown_topic, research_results)
         
-        # Simulate research process with progress updates
-        for i, phase in enumerate(phases):
-            status_text.text(phase)
-            progress_bar.progress((i+1) / len(phases))
-            if i < len(phases) - 1:  # Don't sleep after the last phase
-                time.sleep(2)  # Simulate processing time
+        # Download button for the report
+        full_report = report_markdown(shown_topic, research_results)
         
-        try:
-            # Actual research function
-            research_results = conduct_research(research_topic, research_depth)
-            
-            # Reset progress indicators
-            progress_bar.progress(100)
-            status_text.text("Research completed!")
-            
-            # Display results
-            st.subheader("Research Results: " + research_topic)
-            
-            # Research overview tab
-            with st.expander("📊 Research Overview", expanded=True):
-                st.markdown(research_results['overview'])
-                st.image("https://pixabay.com/get/g99ac5c6150f0c9bd1c6c451a2891c8c6eea30bde5c48035a73f7c5978917c50a08c06cab171797999552c5f554624d8479e93ebc95763c54b2cc62d82710c2a5_1280.jpg", 
-                          caption="Cryptocurrency Research", use_column_width=True)
-            
-            # Technical analysis tab
-            with st.expander("🔬 Technical Analysis"):
-                st.markdown(research_results['technical_analysis'])
-            
-            # Market and adoption tab
-            with st.expander("📈 Market & Adoption"):
-                st.markdown(research_results['market_adoption'])
-                st.image("https://pixabay.com/get/g2e2bfdc7f83ef21e9dce6587bf99709225cbf501a48fef1797462867b5b7e2bed677056788685a17d310800ce2dc24c299213ec701b4cbcf5f3f9896c3ecfc61_1280.jpg", 
-                         caption="Data Analysis Dashboard", use_column_width=True)
-            
-            # Regulatory considerations tab
-            with st.expander("⚖️ Regulatory Considerations"):
-                st.markdown(research_results['regulatory'])
-            
-            # Future outlook tab
-            with st.expander("🔮 Future Outlook"):
-                st.markdown(research_results['future_outlook'])
-            
-            # References tab
-            with st.expander("📚 References & Sources"):
-                st.markdown(research_results['references'])
-            
-            # Download button for the report
-            full_report = "\n\n".join([
-                f"# {research_topic} - Blockchain Research Report\n",
-                "## Overview\n" + research_results['overview'],
-                "## Technical Analysis\n" + research_results['technical_analysis'],
-                "## Market & Adoption\n" + research_results['market_adoption'],
-                "## Regulatory Considerations\n" + research_results['regulatory'],
-                "## Future Outlook\n" + research_results['future_outlook'],
-                "## References & Sources\n" + research_results['references']
-            ])
-            
-            st.download_button(
-                label="📥 Download Research Report",
-                data=full_report,
-                file_name=f"blockchain_research_{research_topic.replace(' ', '_')}.md",
-                mime="text/markdown",
-            )
-            
-        except Exception as e:
-            st.error(f"Research process encountered an error: {str(e)}")
-            st.sidebar.error("Please check your API keys and try again.")
+        st.download_button(
+            label="📥 Download Research Report",
+            data=full_report,
+            file_name=f"blockchain_research_{shown_topic.replace(' ', '_')}.md",
+            mime="text/markdown",
+        )
+    elif job is not None and job["status"] == jobs.FAILED:
+        st.error(f"Research process encountered an error: {job['error']}")
+        st.sidebar.error("Please check your API keys and try again.")
+    elif job is not None:
+        show_job_progress(job["job_id"], shown_topic, active_research.get("archived"))
 
 # Footer info
 st.sidebar.markdown("---")
@@ -151,7 +257,7 @@ st.sidebar.caption("Powered by OpenAI Agents SDK & Firecrawl")
 st.sidebar.caption("© 2023 Blockchain Research Assistant")
 
 # When no research is being conducted, show some information about the tool
-if 'research_results' not in locals():
+if not active_research:
     st.subheader("How the Blockchain Research Assistant Works")
     
     col1, col2 = st.columns(2)
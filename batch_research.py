@@ -0,0 +1,239 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from crawl_cache import normalize_topic
+import streaming
+from rate_limit import RateLimits, reset_limits, use_limits
+from blockchain_research import conduct_research_async
+
+
+def load_topics(path, default_depth=3):
+    """
+    Read research topics from a file
+
+    Plain text files list one topic per line (blank lines and lines starting
+    with "#" are ignored). Files ending in .jsonl hold one object per line
+    with a "topic" and optional "depth".
+
+    Args:
+        path (str): Topics file
+        default_depth (int): Depth for topics that don't specify one
+
+    Returns:
+        list: Job dicts with "topic" and "depth"
+    """
+    jobs = []
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if path.endswith(".jsonl"):
+                entry = json.loads(line)
+                jobs.append({"topic": entry["topic"], "depth": int(entry.get("depth", default_depth))})
+            else:
+                jobs.append({"topic": line, "depth": default_depth})
+    return jobs
+
+
+def job_key(topic, depth):
+    """Identity of a job for resuming: normalized topic plus depth"""
+    return f"{normalize_topic(topic)}|{depth}"
+
+
+def load_completed(path):
+    """
+    Collect the jobs an earlier (possibly interrupted) run already finished
+
+    Args:
+        path (str): Results file written by a previous run
+
+    Returns:
+        set: Job keys with status "ok" (degraded reports are researched again)
+    """
+    completed = set()
+    if not os.path.exists(path):
+        return completed
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A run killed mid-write can leave a truncated last line
+                continue
+            if record.get("status") == "ok":
+                completed.add(job_key(record["topic"], record["depth"]))
+    return completed
+
+
+def is_rate_limited(error):
+    """
+    Check whether an exception (or anything it wraps) is an HTTP 429 rejection
+
+    Args:
+        error (BaseException): Exception raised by the pipeline
+
+    Returns:
+        bool: True if the job should be retried after backing off
+    """
+    while error is not None:
+        if getattr(error, "status_code", None) == 429:
+            return True
+        response = getattr(error, "response", None)
+        if getattr(response, "status_code", None) == 429:
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class BatchRunner:
+    """
+    Run many research topics through a bounded worker pool under shared rate limits
+
+    Each finished job is appended to a JSONL results file straight away, so an
+    interrupted batch can be resumed and will skip topics already completed.
+    Reports built from simulated or stale fallback crawl data are recorded with
+    status "degraded" and are not treated as completed.
+    """
+
+    def __init__(self, output_path, workers=4, limits=None, max_attempts=4, research_options=None):
+        """
+        Args:
+            output_path (str): JSONL file that receives one record per job
+            workers (int): Number of research jobs running concurrently
+            limits (RateLimits): Firecrawl/OpenAI budgets shared by all workers
+            max_attempts (int): Attempts per job when rejected with HTTP 429
+            research_options (dict): Extra keyword arguments for conduct_research_async
+        """
+        self.output_path = output_path
+        self.workers = workers
+        self.limits = limits or RateLimits()
+        self.max_attempts = max_attempts
+        self.research_options = research_options or {}
+        self._write_lock = asyncio.Lock()
+
+    async def run(self, jobs):
+        """
+        Run every job not already completed in the results file
+
+        Args:
+            jobs (list): Job dicts with "topic" and "depth"
+
+        Returns:
+            dict: Summary with counts of completed, degraded, failed and skipped jobs and the elapsed time
+        """
+        completed = load_completed(self.output_path)
+        pending = [job for job in jobs if job_key(job["topic"], job["depth"]) not in completed]
+        summary = {"ok": 0, "degraded": 0, "error": 0, "skipped": len(jobs) - len(pending)}
+
+        queue = asyncio.Queue()
+        for job in pending:
+            queue.put_nowait(job)
+
+        # Every task started from here inherits the shared limiters
+        token = use_limits(self.limits)
+        started = time.monotonic()
+        try:
+            await asyncio.gather(*[
+                self._worker(queue, summary) for _ in range(min(self.workers, len(pending)) or 1)
+            ])
+        finally:
+            reset_limits(token)
+
+        summary["elapsed"] = round(time.monotonic() - started, 3)
+        summary["rate_limit_waits"] = self.limits.stats()
+        return summary
+
+    async def _worker(self, queue, summary):
+        """Take jobs off the queue until it is empty"""
+        while True:
+            try:
+                job = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            record = await self._run_job(job)
+            summary[record["status"]] += 1
+            await self._write(record)
+
+    async def _run_job(self, job):
+        """Run one job, backing off and retrying when rate limited"""
+        started = time.time()
+        record = {"topic": job["topic"], "depth": job["depth"]}
+        options = dict(self.research_options)
+        forward = options.pop("on_event", None)
+        fallback = []
+
+        def on_event(event):
+            # The pipeline falls back to simulated or expired cached data when the crawl fails
+            if event["type"] == streaming.CRAWL_FINISHED:
+                fallback[:] = [kind for kind in ("simulated", "stale") if event.get(kind)]
+            if forward is not None:
+                forward(event)
+
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                record["results"] = await conduct_research_async(
+                    job["topic"], depth=job["depth"], on_event=on_event, **options
+                )
+                record["status"] = "degraded" if fallback else "ok"
+                if fallback:
+                    record["degraded"] = list(fallback)
+                break
+            except Exception as e:
+                record["status"] = "error"
+                record["error"] = str(e)
+                if attempt == self.max_attempts or not is_rate_limited(e):
+                    break
+                # Exponential backoff with jitter so workers don't retry in lockstep
+                await asyncio.sleep(min(2 ** attempt, 60) * random.uniform(0.5, 1.5))
+
+        if record["status"] != "error":
+            record.pop("error", None)
+        finished = time.time()
+        record["timings"] = {
+            "started": started,
+            "finished": finished,
+            "duration": round(finished - started, 3),
+            "attempts": attempt
+        }
+        return record
+
+    async def _write(self, record):
+        """Append a result record and flush it to disk immediately"""
+        async with self._write_lock:
+            with open(self.output_path, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps(record) + "\n")
+                handle.flush()
+                os.fsync(handle.fileno())
+
+
+def main(argv=None):
+    """Command-line entry point for batch research"""
+    parser = argparse.ArgumentParser(description="Run blockchain research for many topics")
+    parser.add_argument("topics", help="Topics file (.txt one per line, or .jsonl with topic/depth)")
+    parser.add_argument("--out", default="batch_results.jsonl", help="JSONL results file (resumable)")
+    parser.add_argument("--depth", type=int, default=3, help="Default research depth (1-5)")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent research jobs")
+    parser.add_argument("--firecrawl-rps", type=float, default=2.0, help="Firecrawl requests per second")
+    parser.add_argument("--openai-rpm", type=float, default=60.0, help="OpenAI requests per minute")
+    parser.add_argument("--openai-tpm", type=float, default=90000.0, help="OpenAI tokens per minute")
+    parser.add_argument("--analysis-mode", default="single", help="single, map_reduce or retrieval")
+    args = parser.parse_args(argv)
+
+    runner = BatchRunner(
+        args.out,
+        workers=args.workers,
+        limits=RateLimits(args.firecrawl_rps, args.openai_rpm, args.openai_tpm),
+        research_options={"analysis_mode": args.analysis_mode}
+    )
+    summary = asyncio.run(runner.run(load_topics(args.topics, args.depth)))
+    print(json.dumps(summary, indent=2))
+    return 0 if summary["error"] == 0 and summary["degraded"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
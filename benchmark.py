@@ -0,0 +1,358 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import tracemalloc
+import contextlib
+from datetime import datetime, timezone
+import streaming
+from clients import registry
+from circuit_breaker import reset_breakers
+from blockchain_research import conduct_research_async
+from mock_servers import Latency, MockConfig, MockServers
+
+DEFAULT_RESULTS_DIR = "benchmark_results"
+
+# Metrics compared between runs, with whether a higher value is better
+COMPARED_METRICS = (
+    ("latency.p50", False),
+    ("latency.p95", False),
+    ("latency.p99", False),
+    ("throughput", True),
+    ("peak_memory_mb", False),
+    ("prompt_tokens.p95", False),
+    ("prompt_tokens.total", False),
+    ("errors", False)
+)
+
+
+def percentile(values, pct):
+    """
+    Percentile with linear interpolation between closest ranks
+
+    Args:
+        values (list): Samples
+        pct (float): Percentile between 0 and 100
+
+    Returns:
+        float: The percentile, or 0.0 for no samples
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(values, digits=3):
+    """Distribution summary (p50/p95/p99, mean, max) of a list of samples"""
+    return {
+        "p50": round(percentile(values, 50), digits),
+        "p95": round(percentile(values, 95), digits),
+        "p99": round(percentile(values, 99), digits),
+        "mean": round(sum(values) / len(values), digits) if values else 0.0,
+        "max": round(max(values), digits) if values else 0.0
+    }
+
+
+@contextlib.contextmanager
+def benchmark_environment(servers):
+    """
+    Point the pipeline at the stand-in servers with caches off, restoring the environment afterwards
+
+    Args:
+        servers (MockServers): Running stand-in servers
+    """
+    overrides = {
+        "FIRECRAWL_API_KEY": "benchmark",
+        "OPENAI_API_KEY": "benchmark",
+        "FIRECRAWL_BASE_URL": servers.firecrawl_url,
+        "OPENAI_BASE_URL": servers.openai_url,
+        # Every job must reach the servers, otherwise repeated topics measure the caches
+        "FIRECRAWL_CACHE_DISABLED": "1",
+        "LLM_CACHE_DISABLED": "1",
+        "REPORT_ARCHIVE_DISABLED": "1"
+    }
+    previous = {name: os.environ.get(name) for name in overrides}
+    os.environ.update(overrides)
+    # Breakers tripped by an earlier run (e.g. with injected errors) would skew this one
+    reset_breakers()
+    try:
+        yield
+    finally:
+        reset_breakers()
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+async def _timed_job(topic, depth, options, semaphore=None):
+    """Run one research job and record its latency and outcome"""
+    crawl = {}
+
+    def on_event(event):
+        if event["type"] == streaming.CRAWL_FINISHED:
+            crawl.update(event)
+
+    async with semaphore or contextlib.nullcontext():
+        started = time.perf_counter()
+        try:
+            await conduct_research_async(topic, depth=depth, on_event=on_event, **options)
+            error = None
+        except Exception as e:
+            error = str(e)
+        latency = time.perf_counter() - started
+
+    return {"latency": latency, "error": error, "simulated": bool(crawl.get("simulated"))}
+
+
+async def _run_concurrent(topics, depth, options, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(*[_timed_job(topic, depth, options, semaphore) for topic in topics])
+
+
+def run_scenario(servers, name, jobs, concurrency, depth=3, options=None, topic="Ethereum Layer 2 scaling"):
+    """
+    Run research jobs against the stand-in servers and measure them
+
+    With concurrency 1 jobs run one after another through the blocking entry
+    point, like conduct_research does; otherwise up to `concurrency` jobs share
+    the event loop. Each job gets a distinct topic so nothing is served from a cache.
+
+    Args:
+        servers (MockServers): Running stand-in servers
+        name (str): Scenario name
+        jobs (int): Number of research jobs
+        concurrency (int): Jobs in flight at once
+        depth (int): Research depth (1-5)
+        options (dict): Extra keyword arguments for conduct_research_async
+        topic (str): Base research topic
+
+    Returns:
+        dict: Latency percentiles, throughput, peak memory, prompt sizes and error counts
+    """
+    options = options or {}
+    topics = [f"{topic} {index}" for index in range(jobs)]
+    servers.reset()
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    if concurrency <= 1:
+        outcomes = [registry.run_sync(_timed_job(job_topic, depth, options)) for job_topic in topics]
+    else:
+        outcomes = registry.run_sync(_run_concurrent(topics, depth, options, concurrency))
+    elapsed = time.perf_counter() - started
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    server_stats = servers.stats()
+    latencies = [outcome["latency"] for outcome in outcomes if outcome["error"] is None]
+    return {
+        "name": name,
+        "jobs": jobs,
+        "concurrency": concurrency,
+        "errors": sum(1 for outcome in outcomes if outcome["error"] is not None),
+        "simulated_crawls": sum(1 for outcome in outcomes if outcome["simulated"]),
+        "elapsed": round(elapsed, 3),
+        "throughput": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        "latency": summarize(latencies),
+        "peak_memory_mb": round(peak_memory / (1024 * 1024), 2),
+        "prompt_tokens": {
+            **summarize(server_stats["prompt_tokens"], digits=1),
+            "total": sum(server_stats["prompt_tokens"]),
+            "calls": len(server_stats["prompt_tokens"])
+        },
+        "completion_tokens": sum(server_stats["completion_tokens"]),
+        "firecrawl_requests": server_stats["firecrawl_requests"],
+        "openai_requests": server_stats["openai_requests"],
+        "injected_errors": server_stats["injected_errors"],
+        "injected_rate_limits": server_stats["injected_rate_limits"],
+        "first_error": next((outcome["error"] for outcome in outcomes if outcome["error"]), None)
+    }
+
+
+def run_benchmark(config=None, jobs=5, concurrency=8, depth=3, options=None, label="benchmark"):
+    """
+    Run the single-job and concurrent-load scenarios against fresh stand-in servers
+
+    Args:
+        config (MockConfig): Stand-in server behaviour
+        jobs (int): Jobs in the single-job scenario; the concurrent scenario runs 2 * concurrency
+        concurrency (int): Jobs in flight in the concurrent scenario
+        depth (int): Research depth (1-5)
+        options (dict): Extra keyword arguments for conduct_research_async
+        label (str): Name stored with the results
+
+    Returns:
+        dict: Results document with metadata and per-scenario metrics
+    """
+    config = config or MockConfig()
+    options = options or {}
+
+    with MockServers(config) as servers, benchmark_environment(servers):
+        # Untimed first job: pays for lazy imports and client/pool creation outside the measurements
+        registry.run_sync(_timed_job("benchmark warm-up", depth, options))
+        scenarios = [
+            run_scenario(servers, "single", jobs, 1, depth, options),
+            run_scenario(servers, "concurrent", concurrency * 2, concurrency, depth, options)
+        ]
+
+    return {
+        "label": label,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "depth": depth,
+        "options": options,
+        "mock": config.to_dict(),
+        "scenarios": {scenario["name"]: scenario for scenario in scenarios}
+    }
+
+
+def save_results(results, path=None):
+    """
+    Write a results document as JSON
+
+    Args:
+        results (dict): Output of run_benchmark
+        path (str): Target file; defaults to benchmark_results/<timestamp>-<label>.json
+
+    Returns:
+        str: Path written
+    """
+    if path is None:
+        stamp = results["created"].replace(":", "").replace("-", "").replace("+0000", "")
+        path = os.path.join(DEFAULT_RESULTS_DIR, f"{stamp}-{results['label']}.json")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(results, handle, indent=2)
+    return path
+
+
+def _metric(scenario, dotted):
+    value = scenario
+    for part in dotted.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+def compare_results(baseline, current):
+    """
+    Compare the metrics of two results documents
+
+    Args:
+        baseline (dict): Earlier results
+        current (dict): New results
+
+    Returns:
+        list: Rows (scenario, metric, baseline value, current value, % change, regressed)
+    """
+    rows = []
+    for name, scenario in current["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS:
+            before, after = _metric(previous, metric), _metric(scenario, metric)
+            if before is None or after is None:
+                continue
+            change = ((after - before) / before * 100.0) if before else 0.0
+            regressed = after < before if higher_is_better else after > before
+            rows.append((name, metric, before, after, round(change, 1), regressed and abs(change) >= 5.0))
+    return rows
+
+
+def format_results(results):
+    """Render the headline metrics of a results document as text"""
+    lines = []
+    for scenario in results["scenarios"].values():
+        lines.append(
+            f"{scenario['name']:<11} jobs={scenario['jobs']:<3} concurrency={scenario['concurrency']:<3} "
+            f"p50={scenario['latency']['p50']:.3f}s p95={scenario['latency']['p95']:.3f}s "
+            f"p99={scenario['latency']['p99']:.3f}s throughput={scenario['throughput']:.2f}/s "
+            f"peak_mem={scenario['peak_memory_mb']:.1f}MB "
+            f"prompt_tokens(p95)={scenario['prompt_tokens']['p95']:.0f} errors={scenario['errors']}"
+        )
+    return "\n".join(lines)
+
+
+def format_comparison(rows):
+    """Render compare_results rows as a table, flagging regressions of 5% or more"""
+    lines = [f"{'scenario':<11} {'metric':<20} {'baseline':>12} {'current':>12} {'change':>8}"]
+    for name, metric, before, after, change, regressed in rows:
+        flag = "  <-- regression" if regressed else ""
+        lines.append(f"{name:<11} {metric:<20} {before:>12} {after:>12} {change:>7}%{flag}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """Command-line entry point for the offline benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark the research pipeline against local stand-in servers")
+    parser.add_argument("--label", default="benchmark", help="Name stored with the results")
+    parser.add_argument("--out", help="Results file (default: benchmark_results/<timestamp>-<label>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--jobs", type=int, default=5, help="Jobs in the single-job scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Jobs in flight in the concurrent scenario")
+    parser.add_argument("--depth", type=int, default=3, help="Research depth (1-5)")
+    parser.add_argument("--analysis-mode", default="single", help="single, map_reduce or retrieval")
+    parser.add_argument("--elaboration-mode", default="single", help="single or sections")
+    parser.add_argument("--firecrawl-latency", default="0.02", help="kind:mean[:spread] in seconds")
+    parser.add_argument("--openai-latency", default="lognormal:0.3:0.4", help="kind:mean[:spread] in seconds")
+    parser.add_argument("--job-time", default="0.5", help="Seconds a crawl job stays processing (kind:mean[:spread])")
+    parser.add_argument("--document-chars", type=int, default=4000, help="Size of each crawled document")
+    parser.add_argument("--documents-per-source", type=int, default=1, help="Documents returned per source")
+    parser.add_argument("--completion-chars", type=int, default=2000, help="Size of each completion")
+    parser.add_argument("--firecrawl-error-rate", type=float, default=0.0, help="Fraction of Firecrawl HTTP 500s")
+    parser.add_argument("--openai-error-rate", type=float, default=0.0, help="Fraction of OpenAI HTTP 500s")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of HTTP 429s on both servers")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the stand-in servers")
+    parser.add_argument("--page-chrome", action="store_true", help="Wrap documents in site boilerplate")
+    parser.add_argument("--clean", action="store_true", help="Run the content-cleaning stage")
+    parser.add_argument("--dedupe", default=None, choices=("paragraph", "document"),
+                        help="Remove near-duplicate content at this level")
+    parser.add_argument("--overlap", action="store_true", help="Analyze documents while the crawl runs")
+    parser.add_argument("--routing", default=None, help="Model routing policy (fixed, tiered, small)")
+    args = parser.parse_args(argv)
+
+    config = MockConfig(
+        firecrawl_latency=Latency.parse(args.firecrawl_latency),
+        job_time=Latency.parse(args.job_time),
+        document_chars=args.document_chars,
+        documents_per_source=args.documents_per_source,
+        firecrawl_error_rate=args.firecrawl_error_rate,
+        openai_latency=Latency.parse(args.openai_latency),
+        completion_chars=args.completion_chars,
+        openai_error_rate=args.openai_error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed,
+        page_chrome=args.page_chrome
+    )
+    options = {"analysis_mode": args.analysis_mode, "elaboration_mode": args.elaboration_mode,
+               "clean": args.clean, "dedupe": args.dedupe, "overlap": args.overlap,
+               "routing": args.routing}
+
+    results = run_benchmark(config, jobs=args.jobs, concurrency=args.concurrency, depth=args.depth,
+                            options=options, label=args.label)
+    print(format_results(results))
+    print(f"Saved results to {save_results(results, args.out)}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        rows = compare_results(baseline, results)
+        print()
+        print(format_comparison(rows))
+        return 1 if any(row[5] for row in rows) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
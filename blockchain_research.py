@@ -1,42 +1,470 @@
 import time
+# Taken before the other imports so the CLI can report how long startup took
+_IMPORT_STARTED = time.perf_counter()
+import os
+import sys
+import json
+import asyncio
+import argparse
+import streaming
+import tracing
+from dedup import NearDuplicateIndex, deduplicate
+from cleaning import clean_documents
+from comparison import parse_entities, split_by_entity, validate_entities
+from clients import registry
 from firecrawl_client import FirecrawlClient
 from openai_agent import ResearchAgent, ElaborationAgent
+from model_routing import get_router
+from refresh_store import diff_documents, get_default_refresh_store
+from report_archive import get_default_archive
+from utils import report_markdown
 
-def conduct_research(topic, depth=3):
+# Supported ways of running the Research Agent over crawled content
+ANALYSIS_MODES = ("single", "map_reduce", "retrieval")
+
+# Supported ways of running the Elaboration Agent
+ELABORATION_MODES = ("single", "sections")
+
+def conduct_research(topic, depth=3, analysis_mode="single", dedupe=None,
+                     elaboration_mode="single", incremental=False, archive_max_age=None, clean=False,
+                     overlap=False, routing=None, compare=None, api_keys=None):
     """
     Conduct comprehensive blockchain research on a given topic
     
+    This is a blocking wrapper around conduct_research_async for callers
+    that are not running inside an event loop (e.g. the Streamlit app). It runs
+    on the client registry's long-lived event loop so pooled connections are
+    reused between calls.
+    
     Args:
         topic (str): The blockchain research topic
         depth (int): Research depth level (1-5)
+        analysis_mode (str): "single" analyzes the first 15,000 characters in one call;
+            "map_reduce" analyzes every crawled document in concurrent chunks;
+            "retrieval" sends only the best-ranked passages for each analysis section
+        dedupe (str): Opt-in near-duplicate removal before analysis: "paragraph" or
+            "document"; None (the default) passes crawled content through unchanged
+        elaboration_mode (str): "single" writes the report in one completion; "sections"
+            writes each section in a concurrent completion
+        incremental (bool): Re-crawl, but only analyze documents that are new or changed
+            since the previous run of this topic and depth
+        archive_max_age (float): Return an archived report on a similar topic if one is at
+            most this many seconds old, instead of researching again (None to always research)
+        clean (bool): Strip boilerplate and low-information blocks from crawled pages
+        overlap (bool): Analyze crawled documents in batches as they arrive instead of
+            waiting for the whole crawl (always a map-reduce analysis)
+        routing (str): Model routing policy (see model_routing.py); None for MODEL_ROUTING_POLICY
+        compare (list): Entity names to compare in one report, with topic as the comparison
+            question (see conduct_research_async)
+        api_keys (dict): "openai" and "firecrawl" API keys for this request (see
+            conduct_research_async)
         
     Returns:
         dict: Structured research results with different sections
     """
+    return registry.run_sync(conduct_research_async(topic, depth=depth, analysis_mode=analysis_mode,
+                                                   dedupe=dedupe, elaboration_mode=elaboration_mode,
+                                                   incremental=incremental, archive_max_age=archive_max_age,
+                                                   clean=clean, overlap=overlap, routing=routing,
+                                                   compare=compare, api_keys=api_keys))
+
+def stream_research(topic, depth=3, analysis_mode="single", dedupe=None,
+                    elaboration_mode="single", incremental=False, archive_max_age=None, clean=False,
+                    overlap=False, routing=None, compare=None, api_keys=None):
+    """
+    Conduct research and yield progress events as they happen
+    
+    Events are dicts with a "type" key (see streaming.py): crawl progress,
+    per-source arrival, analysis and elaboration tokens, and finally
+    research_completed (with "results") or research_failed (with "error").
+    
+    Args:
+        topic (str): The blockchain research topic
+        depth (int): Research depth level (1-5)
+        analysis_mode (str): "single", "map_reduce" or "retrieval" (see conduct_research_async)
+        dedupe (str): "paragraph", "document" or None (see conduct_research_async)
+        elaboration_mode (str): "single" or "sections" (see conduct_research_async)
+        incremental (bool): Only re-analyze changed sources (see conduct_research_async)
+        archive_max_age (float): Reuse a recent archived report (see conduct_research_async)
+        clean (bool): Strip boilerplate from crawled pages (see conduct_research_async)
+        overlap (bool): Analyze documents while the crawl runs (see conduct_research_async)
+        routing (str): Model routing policy (see conduct_research_async)
+        compare (list): Entity names to compare (see conduct_research_async)
+        api_keys (dict): "openai" and "firecrawl" API keys (see conduct_research_async)
+        
+    Yields:
+        dict: Pipeline events
+    """
+    return streaming.iterate_events(
+        lambda on_event: conduct_research_async(topic, depth=depth, on_event=on_event,
+                                                analysis_mode=analysis_mode, dedupe=dedupe,
+                                                elaboration_mode=elaboration_mode,
+                                                incremental=incremental,
+                                                archive_max_age=archive_max_age,
+                                                clean=clean,
+                                                overlap=overlap,
+                                                routing=routing,
+                                                compare=compare,
+                                                api_keys=api_keys),
+        registry.submit
+    )
+
+async def conduct_research_async(topic, depth=3, on_event=None, analysis_mode="single",
+                                 dedupe=None, elaboration_mode="single", incremental=False,
+                                 archive_max_age=None, clean=False, overlap=False, routing=None,
+                                 compare=None, api_keys=None):
+    """
+    Conduct comprehensive blockchain research on a given topic without blocking
+    
+    Many research jobs can be awaited concurrently on a single event loop,
+    e.g. with asyncio.gather(conduct_research_async(a), conduct_research_async(b)).
+    
+    Args:
+        topic (str): The blockchain research topic
+        depth (int): Research depth level (1-5)
+        on_event (callable): Optional listener for progress events (see streaming.py)
+        analysis_mode (str): "single" analyzes the first 15,000 characters in one call;
+            "map_reduce" analyzes every crawled document in concurrent chunks;
+            "retrieval" sends only the best-ranked passages for each analysis section
+        dedupe (str): Opt-in near-duplicate removal before analysis: "paragraph" or
+            "document"; None (the default) passes crawled content through unchanged
+        elaboration_mode (str): "single" writes the report in one completion; "sections"
+            writes each section in a concurrent completion
+        incremental (bool): Re-crawl bypassing the crawl cache, then analyze only documents
+            whose content (or ETag / Last-Modified) changed since the previous run of this
+            topic and depth, and fold that analysis into the stored one before elaborating.
+            If nothing changed the stored report is returned without any OpenAI calls.
+        archive_max_age (float): Before crawling, look for an archived report on a similar
+            topic (at least as deep) that is at most this many seconds old and return it
+            with an "archived" entry describing the match. None always researches afresh.
+        clean (bool): Before deduplication, strip navigation, cookie banners, footers, image
+            and link markup and other low-information blocks from crawled pages, collapse
+            whitespace and shorten long code blocks (see cleaning.py); off by default
+        overlap (bool): Split the crawl into several Firecrawl jobs and analyze each job's
+            documents as soon as it finishes, merging partial analyses while the rest of
+            the crawl runs, so the slowest job no longer delays the whole analysis.
+            Always uses a map-reduce analysis (analysis_mode is ignored) and cannot be
+            combined with incremental.
+        routing (str): Model routing policy: a name in model_routing.POLICIES ("fixed" keeps
+            every call on gpt-4o; "tiered" sends chunk extraction and small or shallow
+            prompts to gpt-4o-mini; "small" uses gpt-4o-mini throughout) or a JSON rules
+            file. None selects MODEL_ROUTING_POLICY, default "fixed".
+        compare (list): Compare these entities (e.g. ["Solana", "Sui"]) with topic as the
+            comparison question. One crawl of the topic serves every entity: each document
+            is routed to the entities it mentions (documents mentioning none go to all),
+            the entities are analyzed concurrently, and a single comparative elaboration
+            writes the report, instead of a crawl and two completions per entity.
+            elaboration_mode is ignored; cannot be combined with incremental or overlap.
+        api_keys (dict): "openai" and "firecrawl" API keys to research with; a missing key
+            falls back to OPENAI_API_KEY or FIRECRAWL_API_KEY. Keys are never stored.
+        
+    Returns:
+        dict: Structured research results with different sections, plus a "trace"
+            summary (time per stage and per HTTP service, tokens and estimated cost)
+            unless TRACING_DISABLED is set. Finished reports are added to the report
+            archive (see report_archive.py) unless REPORT_ARCHIVE_DISABLED is set.
+    """
+    trace, token = tracing.start_trace("research", topic=topic, depth=depth, analysis_mode=analysis_mode,
+                                       elaboration_mode=elaboration_mode, incremental=incremental,
+                                       routing=routing, compare=compare)
+    try:
+        research_results = await _research_pipeline(topic, depth, on_event, analysis_mode, dedupe,
+                                                    elaboration_mode, incremental, archive_max_age, clean,
+                                                    overlap, routing, compare, api_keys or {})
+    except BaseException as e:
+        tracing.finish_trace(trace, token, error=e)
+        raise
+    tracing.finish_trace(trace, token)
+    
+    if trace is not None:
+        research_results["trace"] = trace.summary()
+    return research_results
+
+async def _research_pipeline(topic, depth, on_event, analysis_mode, dedupe, elaboration_mode, incremental,
+                             archive_max_age, clean, overlap, routing, compare, api_keys):
+    """Run the research stages for conduct_research_async, timing each one as a trace span"""
+    if analysis_mode not in ANALYSIS_MODES:
+        raise ValueError(f"Unknown analysis mode: {analysis_mode}")
+    if elaboration_mode not in ELABORATION_MODES:
+        raise ValueError(f"Unknown elaboration mode: {elaboration_mode}")
+    if overlap and incremental:
+        raise ValueError("Overlapped crawling cannot be combined with an incremental refresh")
+    if compare is not None:
+        validate_entities(compare)
+        if incremental or overlap:
+            raise ValueError("Comparisons cannot be combined with incremental refresh or overlapped crawling")
+    router = get_router(routing)
+    
+    # A recent report on a similar topic answers the request without crawling or OpenAI calls
+    archive = get_default_archive()
+    if archive is not None and archive_max_age is not None:
+        with tracing.span("archive_lookup") as span:
+            match = await asyncio.to_thread(archive.find_similar, topic, depth, max_age=archive_max_age,
+                                            compare=compare)
+            span.set(hit=match is not None)
+        if match is not None:
+            archived = {"id": match["id"], "topic": match["topic"], "depth": match["depth"],
+                        "similarity": match["similarity"], "age": match["age"]}
+            streaming.emit(on_event, streaming.ARCHIVE_HIT, **archived)
+            research_results = _organize_results(match["sections"])
+            research_results["archived"] = archived
+            if compare is not None:
+                research_results["compared"] = list(compare)
+            return research_results
     
     # Initialize the clients
-    firecrawl = FirecrawlClient()
-    research_agent = ResearchAgent()
-    elaboration_agent = ElaborationAgent()
+    firecrawl = FirecrawlClient(api_key=api_keys.get("firecrawl"))
+    research_agent = ResearchAgent(router=router, api_key=api_keys.get("openai"))
+    elaboration_agent = ElaborationAgent(router=router, api_key=api_keys.get("openai"))
+    
+    # The previous run of this topic is the baseline for an incremental refresh
+    refresh_store = get_default_refresh_store() if incremental else None
+    previous = await asyncio.to_thread(refresh_store.get, topic, depth) if incremental else None
     
     # Step 1: Gather raw data using Firecrawl
-    raw_data = firecrawl.explore_blockchain_topic(topic, depth=depth)
+    streaming.emit(on_event, streaming.CRAWL_STARTED, topic=topic, depth=depth)
+    if overlap:
+        # Steps 1 and 2 overlap: batches are analyzed while the rest of the crawl runs
+        raw_data, sources, initial_analysis = await _crawl_and_analyze_overlapped(
+            firecrawl, research_agent, topic, depth, on_event, clean, dedupe
+        )
+    else:
+        with tracing.span("crawl") as span:
+            raw_data = await firecrawl.explore_blockchain_topic_async(topic, depth=depth, use_cache=not incremental)
+            span.set(sources=len(raw_data.get("raw_data", [])), simulated=bool(raw_data.get("simulated")),
+                     **raw_data.get("polling", {}))
+        sources = [{"source": item.get("source"), "url": item.get("url")} for item in raw_data.get("raw_data", [])]
+        for source in sources:
+            streaming.emit(on_event, streaming.SOURCE_RECEIVED, **source)
+        streaming.emit(on_event, streaming.CRAWL_FINISHED, sources=len(raw_data.get("raw_data", [])),
+                       simulated=bool(raw_data.get("simulated")), stale=bool(raw_data.get("stale")))
     
-    # Step 2: Initial synthesis with Research Agent
-    initial_analysis = research_agent.analyze(
-        topic=topic,
-        raw_data=raw_data,
-        depth=depth
-    )
+        # Keep only new or changed documents; fingerprints are taken before dedup so they
+        # don't depend on which other documents arrived in the same crawl
+        if incremental:
+            with tracing.span("refresh_diff"):
+                raw_data, fingerprints, refresh_report = await asyncio.to_thread(
+                    diff_documents, previous["documents"] if previous else {}, raw_data
+                )
+            streaming.emit(on_event, streaming.REFRESH_DIFF, **refresh_report)
+        
+            # Nothing changed, or the crawl failed and only placeholder data came back
+            if previous and (not raw_data["raw_data"] or raw_data.get("simulated")):
+                streaming.emit(on_event, streaming.ANALYSIS_FINISHED, analysis=previous["initial_analysis"])
+                streaming.emit(on_event, streaming.ELABORATION_FINISHED)
+                return _organize_results(previous["results"])
+    
+        # Strip page chrome first so deduplication compares the actual content
+        if clean:
+            with tracing.span("clean") as span:
+                raw_data, clean_report = await asyncio.to_thread(clean_documents, raw_data)
+                span.set(ratio=clean_report["ratio"], tokens_removed=clean_report["tokens_removed"],
+                         processes=clean_report["processes"])
+            streaming.emit(on_event, streaming.CLEAN_FINISHED, **clean_report)
+    
+        # Drop syndicated copies before they use up prompt budget (CPU-bound, so off the loop)
+        if dedupe:
+            with tracing.span("dedup") as span:
+                raw_data, dedup_report = await asyncio.to_thread(deduplicate, raw_data, dedupe)
+                span.set(tokens_removed=dedup_report["tokens_removed"])
+            streaming.emit(on_event, streaming.DEDUP_FINISHED, **dedup_report)
+    
+        # Step 2: Initial synthesis with Research Agent
+        if analysis_mode == "map_reduce":
+            analyze = research_agent.analyze_map_reduce_async
+        elif analysis_mode == "retrieval":
+            analyze = research_agent.analyze_retrieval_async
+        else:
+            analyze = research_agent.analyze_async
+    
+        with tracing.span("analysis", mode=analysis_mode, entities=len(compare or ())):
+            if compare:
+                # One shared crawl, one analysis per entity of the documents about it
+                entity_data, split_report = split_by_entity(raw_data, compare)
+                streaming.emit(on_event, streaming.COMPARISON_PLANNED, entities=list(compare), **split_report)
+                analyses = await asyncio.gather(*[
+                    analyze(topic=f"{entity} ({topic})", raw_data=entity_data[entity], depth=depth,
+                            on_token=_entity_token_listener(on_event, entity))
+                    for entity in compare
+                ])
+                initial_analysis = dict(zip(compare, analyses))
+            elif previous:
+                # Only the changed documents were analyzed: update the stored analysis with them
+                update_analysis = await analyze(topic=topic, raw_data=raw_data, depth=depth)
+                initial_analysis = await research_agent.refresh_analysis_async(
+                    topic,
+                    previous["initial_analysis"],
+                    update_analysis,
+                    depth=depth,
+                    on_token=_token_listener(on_event, streaming.ANALYSIS_TOKEN)
+                )
+            else:
+                initial_analysis = await analyze(
+                    topic=topic,
+                    raw_data=raw_data,
+                    depth=depth,
+                    on_token=_token_listener(on_event, streaming.ANALYSIS_TOKEN)
+                )
+    streaming.emit(on_event, streaming.ANALYSIS_FINISHED, analysis=initial_analysis)
     
     # Step 3: Elaborate on findings with Elaboration Agent
-    elaborate_results = elaboration_agent.elaborate(
-        topic=topic, 
-        initial_analysis=initial_analysis,
-        depth=depth
-    )
+    with tracing.span("elaboration", mode="comparison" if compare else elaboration_mode):
+        if compare:
+            elaborate_results = await elaboration_agent.elaborate_comparison_async(
+                topic=topic,
+                analyses=initial_analysis,
+                depth=depth,
+                on_token=_token_listener(on_event, streaming.ELABORATION_TOKEN)
+            )
+        elif elaboration_mode == "sections":
+            elaborate_results = await elaboration_agent.elaborate_sections_async(
+                topic=topic,
+                initial_analysis=initial_analysis,
+                depth=depth,
+                on_section_token=_section_token_listener(on_event)
+            )
+        else:
+            elaborate_results = await elaboration_agent.elaborate_async(
+                topic=topic, 
+                initial_analysis=initial_analysis,
+                depth=depth,
+                on_token=_token_listener(on_event, streaming.ELABORATION_TOKEN)
+            )
+    streaming.emit(on_event, streaming.ELABORATION_FINISHED)
     
     # Step 4: Organize into structured sections
+    research_results = _organize_results(elaborate_results)
+    
+    # Simulated crawls are placeholders, not a baseline worth refreshing against
+    if incremental and not raw_data.get("simulated"):
+        await asyncio.to_thread(refresh_store.save, topic, depth, fingerprints,
+                                initial_analysis, research_results)
+    if archive is not None and not raw_data.get("simulated"):
+        await asyncio.to_thread(archive.add, topic, depth, research_results, sources=sources, metadata={
+            "analysis_mode": analysis_mode,
+            "elaboration_mode": elaboration_mode,
+            "dedupe": dedupe,
+            "clean": clean,
+            "incremental": incremental,
+            "overlap": overlap,
+            "routing": router.name,
+            "compare": list(compare) if compare else None
+        })
+    if compare:
+        research_results["compared"] = list(compare)
+    
+    return research_results
+
+async def _crawl_and_analyze_overlapped(firecrawl, research_agent, topic, depth, on_event, clean, dedupe):
+    """
+    Crawl and analyze concurrently for conduct_research_async(overlap=True)
+    
+    A crawl task cleans and deduplicates each batch as it arrives (against
+    everything before it) and hands it to the Research Agent through a queue.
+    
+    Returns:
+        tuple: (raw data with every original document, source list, initial analysis)
+    """
+    batches = asyncio.Queue()
+    crawled = {"raw_data": []}
+    sources = []
+    clean_reports = []
+    dedup_reports = []
+    index = NearDuplicateIndex()
+    
+    async def crawl():
+        try:
+            with tracing.span("crawl", overlapped=True) as span:
+                async for batch in firecrawl.iter_blockchain_topic_async(topic, depth=depth):
+                    crawled["raw_data"].extend(batch.get("raw_data", []))
+                    crawled["simulated"] = crawled.get("simulated") or bool(batch.get("simulated"))
+                    crawled["stale"] = crawled.get("stale") or bool(batch.get("stale"))
+                    for item in batch.get("raw_data", []):
+                        source = {"source": item.get("source"), "url": item.get("url")}
+                        sources.append(source)
+                        streaming.emit(on_event, streaming.SOURCE_RECEIVED, **source)
+                    if clean:
+                        batch, report = await asyncio.to_thread(clean_documents, batch)
+                        clean_reports.append(report)
+                    if dedupe:
+                        batch, report = await asyncio.to_thread(deduplicate, batch, dedupe, index=index)
+                        dedup_reports.append(report)
+                    await batches.put(batch)
+                span.set(sources=len(sources), simulated=bool(crawled.get("simulated")))
+        finally:
+            await batches.put(None)
+    
+    async def arrived():
+        while (batch := await batches.get()) is not None:
+            yield batch
+    
+    crawl_task = asyncio.ensure_future(crawl())
+    try:
+        with tracing.span("analysis", mode="overlap"):
+            initial_analysis = await research_agent.analyze_batches_async(
+                topic=topic,
+                batches=arrived(),
+                depth=depth,
+                on_token=_token_listener(on_event, streaming.ANALYSIS_TOKEN)
+            )
+        # Surfaces crawl errors; by now the crawl has finished
+        await crawl_task
+    finally:
+        crawl_task.cancel()
+    
+    streaming.emit(on_event, streaming.CRAWL_FINISHED, sources=len(sources), simulated=bool(crawled.get("simulated")),
+                   stale=bool(crawled.get("stale")))
+    if clean_reports:
+        streaming.emit(on_event, streaming.CLEAN_FINISHED, **_combine_clean_reports(clean_reports))
+    if dedup_reports:
+        streaming.emit(on_event, streaming.DEDUP_FINISHED, **{
+            key: sum(report[key] for report in dedup_reports) if key != "level" else dedupe
+            for key in dedup_reports[0]
+        })
+    return crawled, sources, initial_analysis
+
+def _combine_clean_reports(reports):
+    """Merge the cleaning reports of several batches into one"""
+    chars_before = sum(report["chars_before"] for report in reports)
+    chars_after = sum(report["chars_after"] for report in reports)
+    return {
+        "sources": [entry for report in reports for entry in report["sources"]],
+        "chars_before": chars_before,
+        "chars_after": chars_after,
+        "ratio": round(chars_after / chars_before, 3) if chars_before else 1.0,
+        "tokens_removed": sum(report["tokens_removed"] for report in reports),
+        "processes": max(report["processes"] for report in reports)
+    }
+
+def _token_listener(on_event, event_type):
+    """Adapt an event listener to the agents' on_token callback (None disables streaming)"""
+    if on_event is None:
+        return None
+    return lambda text: streaming.emit(on_event, event_type, text=text)
+
+def _entity_token_listener(on_event, entity):
+    """Analysis token listener for comparisons, tagging tokens with their entity"""
+    if on_event is None:
+        return None
+    return lambda text: streaming.emit(on_event, streaming.ANALYSIS_TOKEN, text=text, entity=entity)
+
+def _section_token_listener(on_event):
+    """Adapt an event listener to section-mode elaboration, tagging tokens with their section"""
+    if on_event is None:
+        return None
+    return lambda section, text: streaming.emit(on_event, streaming.ELABORATION_TOKEN,
+                                                text=text, section=section)
+
+def _organize_results(elaborate_results):
+    """
+    Organize elaborated results into the structured research sections
+    
+    Args:
+        elaborate_results (dict): Output of the Elaboration Agent
+        
+    Returns:
+        dict: Structured research results with different sections
+    """
     research_results = {
         'overview': elaborate_results['overview'],
         'technical_analysis': elaborate_results['technical_analysis'],
@@ -47,3 +475,71 @@ def conduct_research(topic, depth=3):
     }
     
     return research_results
+
+def main(argv=None):
+    """Command-line entry point: research one topic without the Streamlit app"""
+    parser = argparse.ArgumentParser(description="Research a blockchain topic and write the report as markdown")
+    parser.add_argument("topic", help="Research topic (the comparison question with --compare)")
+    parser.add_argument("--depth", type=int, default=3, choices=range(1, 6), help="Research depth (1-5)")
+    parser.add_argument("--out", help="Report file (default: print to stdout)")
+    parser.add_argument("--json", action="store_true", help="Write the full results as JSON instead of markdown")
+    parser.add_argument("--analysis-mode", default="single", choices=ANALYSIS_MODES)
+    parser.add_argument("--elaboration-mode", default="single", choices=ELABORATION_MODES)
+    parser.add_argument("--dedupe", default="none", choices=("paragraph", "document", "none"))
+    parser.add_argument("--compare", help="Entities to compare in one report, e.g. \"Solana, Sui\"")
+    parser.add_argument("--routing", default=None, help="Model routing policy (fixed, tiered, small)")
+    parser.add_argument("--archive-max-age", type=float, default=None,
+                        help="Reuse an archived report on a similar topic at most this many seconds old")
+    parser.add_argument("--quiet", action="store_true", help="Don't print progress to stderr")
+    args = parser.parse_args(argv)
+    
+    parsed = time.perf_counter()
+    progress = {"first_request": None}
+    
+    def on_event(event):
+        now = time.perf_counter()
+        if progress["first_request"] is None and event["type"] in (streaming.ARCHIVE_HIT, streaming.CRAWL_STARTED):
+            # Everything before this point is startup: imports, argument parsing, local lookups
+            progress["first_request"] = now - _IMPORT_STARTED
+            if not args.quiet:
+                print(f"Startup: imports {parsed - _IMPORT_STARTED:.3f}s, "
+                      f"first request after {progress['first_request']:.3f}s", file=sys.stderr)
+        if args.quiet or event["type"] in (streaming.ANALYSIS_TOKEN, streaming.ELABORATION_TOKEN,
+                                           streaming.SOURCE_RECEIVED):
+            return
+        details = {key: value for key, value in event.items()
+                   if key != "type" and isinstance(value, (str, int, float, bool))}
+        summary = " ".join(f"{key}={value}" for key, value in details.items())
+        print(f"[{now - _IMPORT_STARTED:7.2f}s] {event['type']} {summary}".rstrip(), file=sys.stderr)
+    
+    try:
+        results = registry.run_sync(conduct_research_async(
+            args.topic,
+            depth=args.depth,
+            on_event=on_event,
+            analysis_mode=args.analysis_mode,
+            dedupe=None if args.dedupe == "none" else args.dedupe,
+            elaboration_mode=args.elaboration_mode,
+            archive_max_age=args.archive_max_age,
+            routing=args.routing,
+            compare=parse_entities(args.compare) if args.compare else None
+        ))
+    except Exception as e:
+        print(f"Research failed: {e}", file=sys.stderr)
+        return 1
+    
+    report = json.dumps(results, indent=2) if args.json else report_markdown(args.topic, results)
+    if args.out:
+        directory = os.path.dirname(args.out)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as handle:
+            handle.write(report)
+        if not args.quiet:
+            print(f"Saved report to {args.out}", file=sys.stderr)
+    else:
+        print(report)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+import re
+
+# Rough average for English prose with GPT tokenizers; good enough for budgeting
+CHARS_PER_TOKEN = 4
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def estimate_tokens(text):
+    """
+    Estimate the number of model tokens in a piece of text
+
+    Args:
+        text (str): Text to measure
+
+    Returns:
+        int: Approximate token count
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def iter_documents(raw_data):
+    """
+    Iterate over the crawled documents that carry content
+
+    Args:
+        raw_data (dict): Raw data from Firecrawl
+
+    Yields:
+        dict: Items of raw_data["raw_data"] with a "content" field
+    """
+    items = raw_data.get("raw_data") if isinstance(raw_data, dict) else None
+    if not isinstance(items, list):
+        return
+    for item in items:
+        if isinstance(item, dict) and item.get("content"):
+            yield item
+
+
+def split_paragraphs(text, max_chars):
+    """
+    Split text on blank lines, hard-wrapping paragraphs longer than max_chars
+
+    Args:
+        text (str): Document content
+        max_chars (int): Upper bound on the size of a single piece
+
+    Yields:
+        str: Paragraphs (or paragraph slices) in document order
+    """
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = paragraph.strip()
+        for start in range(0, len(paragraph), max_chars):
+            yield paragraph[start:start + max_chars]
+
+
+def chunk_documents(documents, max_tokens=3000):
+    """
+    Pack documents into token-bounded chunks without joining them all first
+
+    Paragraph boundaries are respected where possible and each chunk notes the
+    sources its text came from, so the model can attribute findings.
+
+    Args:
+        documents (iterable): Crawled document dicts with "content" (and optionally "source"/"url")
+        max_tokens (int): Approximate token budget per chunk
+
+    Yields:
+        str: Chunk text
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    parts = []
+    size = 0
+
+    for document in documents:
+        header = f"[Source: {document.get('source') or document.get('url') or 'unknown'}]"
+        header_written = False
+
+        for paragraph in split_paragraphs(document["content"], max_chars - len(header) - 2):
+            if size and size + len(paragraph) + len(header) + 2 > max_chars:
+                yield "\n\n".join(parts)
+                parts, size = [], 0
+                header_written = False
+
+            if not header_written:
+                parts.append(header)
+                size += len(header) + 2
+                header_written = True
+
+            parts.append(paragraph)
+            size += len(paragraph) + 2
+
+    if parts:
+        yield "\n\n".join(parts)
@@ -0,0 +1,238 @@
+import os
+import math
+import time
+import contextlib
+import threading
+from collections import deque
+import tracing
+
+# Breaker states, exported as the circuit_breaker_state gauge value
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while its endpoint's breaker is open"""
+
+
+class LatencyWindow:
+    """
+    The most recent durations of an operation, for percentile estimates
+    """
+
+    def __init__(self, size=100):
+        """
+        Args:
+            size (int): Number of samples kept
+        """
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, pct):
+        """
+        Nearest-rank percentile of the recorded durations
+
+        Args:
+            pct (float): Percentile between 0 and 100
+
+        Returns:
+            float: Duration in seconds, or None without samples
+        """
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return None
+        rank = max(1, min(len(ordered), math.ceil(pct / 100 * len(ordered))))
+        return ordered[rank - 1]
+
+
+class CircuitBreaker:
+    """
+    Stop calling an endpoint that keeps failing or responding slowly
+
+    Outcomes of the last `window` calls are kept. Once at least `min_calls`
+    are recorded and the share of failures (errors, 5xx responses and calls
+    slower than `slow_seconds`) reaches `failure_rate`, the breaker opens and
+    callers fail fast. After `cooldown` seconds one probe call is let through
+    (half-open): success closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, name, window=20, min_calls=5, failure_rate=0.5, slow_seconds=10.0, cooldown=30.0):
+        """
+        Args:
+            name (str): Endpoint name, used as the metrics label
+            window (int): Number of recent calls considered
+            min_calls (int): Calls needed before the breaker can open
+            failure_rate (float): Share of failed calls that opens the breaker
+            slow_seconds (float): Calls taking longer count as failures (None to ignore latency)
+            cooldown (float): Seconds to stay open before probing again
+        """
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_seconds = slow_seconds
+        self.cooldown = cooldown
+        self.latency = LatencyWindow()
+        self._outcomes = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        tracing.metrics.set("circuit_breaker_state", STATE_VALUES[CLOSED], endpoint=name)
+
+    @property
+    def state(self):
+        """Current state; an open breaker reads as half-open once its cooldown has passed"""
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                return HALF_OPEN
+            return self._state
+
+    def is_open(self):
+        """True while calls would be rejected (open and still cooling down)"""
+        return self.state == OPEN
+
+    def allow(self):
+        """
+        Ask to make a call
+
+        Returns:
+            bool: False if the call should fail fast; True means the outcome must be
+                reported with record()
+        """
+        with self._lock:
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    tracing.metrics.inc("circuit_breaker_rejections_total", endpoint=self.name)
+                    return False
+                self._transition(HALF_OPEN)
+            if self._state == HALF_OPEN:
+                # A single probe at a time decides whether the endpoint has recovered
+                if self._probing:
+                    tracing.metrics.inc("circuit_breaker_rejections_total", endpoint=self.name)
+                    return False
+                self._probing = True
+            return True
+
+    def record(self, success, seconds):
+        """
+        Report the outcome of an allowed call
+
+        Args:
+            success (bool): False for transport errors and server errors
+            seconds (float): How long the call took
+        """
+        self.latency.add(seconds)
+        failed = not success or (self.slow_seconds is not None and seconds > self.slow_seconds)
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probing = False
+                self._outcomes.clear()
+                if failed:
+                    self._open()
+                else:
+                    self._transition(CLOSED)
+                return
+
+            self._outcomes.append(failed)
+            if (self._state == CLOSED and len(self._outcomes) >= self.min_calls
+                    and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate):
+                self._open()
+
+    def release(self):
+        """Give back an allowed call that ended without an outcome (e.g. it was cancelled)"""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probing = False
+
+    @contextlib.contextmanager
+    def guard(self):
+        """
+        Run a call through the breaker, recording its outcome
+
+        Exceptions count as failures; set `call.success = False` inside the block
+        for responses that failed without raising (e.g. HTTP 5xx).
+
+        Yields:
+            _Call: Outcome holder for the call
+
+        Raises:
+            CircuitOpenError: If the call is not allowed
+        """
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open)")
+        call = _Call()
+        started = time.monotonic()
+        try:
+            yield call
+        except Exception:
+            self.record(False, time.monotonic() - started)
+            raise
+        except BaseException:
+            self.release()
+            raise
+        self.record(call.success, time.monotonic() - started)
+
+    def _open(self):
+        self._opened_at = time.monotonic()
+        self._transition(OPEN)
+
+    def _transition(self, state):
+        self._state = state
+        tracing.metrics.set("circuit_breaker_state", STATE_VALUES[state], endpoint=self.name)
+        tracing.metrics.inc("circuit_breaker_transitions_total", endpoint=self.name, state=state)
+
+
+class _Call:
+    """Outcome of a call made through CircuitBreaker.guard"""
+
+    __slots__ = ("success",)
+
+    def __init__(self):
+        self.success = True
+
+
+def get_breaker(name):
+    """
+    Return the process-wide breaker for an endpoint, creating it on first use
+
+    Settings come from CIRCUIT_BREAKER_WINDOW, CIRCUIT_BREAKER_MIN_CALLS,
+    CIRCUIT_BREAKER_FAILURE_RATE, CIRCUIT_BREAKER_SLOW_SECONDS and
+    CIRCUIT_BREAKER_COOLDOWN.
+
+    Args:
+        name (str): Endpoint name, e.g. "firecrawl /research/start"
+
+    Returns:
+        CircuitBreaker: The endpoint's breaker
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(
+                name,
+                window=int(os.getenv("CIRCUIT_BREAKER_WINDOW", 20)),
+                min_calls=int(os.getenv("CIRCUIT_BREAKER_MIN_CALLS", 5)),
+                failure_rate=float(os.getenv("CIRCUIT_BREAKER_FAILURE_RATE", 0.5)),
+                slow_seconds=float(os.getenv("CIRCUIT_BREAKER_SLOW_SECONDS", 10.0)),
+                cooldown=float(os.getenv("CIRCUIT_BREAKER_COOLDOWN", 30.0))
+            )
+        return breaker
+
+
+def reset_breakers():
+    """Forget every breaker, e.g. between benchmark runs"""
+    with _breakers_lock:
+        _breakers.clear()
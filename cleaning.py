@@ -0,0 +1,229 @@
+import os
+import re
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from chunking import estimate_tokens
+
+# Batches with at least this much content are cleaned in worker processes; smaller
+# ones are cheaper to clean in-process than to ship to the pool
+POOL_MIN_CHARS = 500_000
+
+# Longest fenced code block kept whole; longer ones keep their first lines only
+MAX_CODE_LINES = 15
+
+# Blocks with fewer words than this are dropped unless they are headings or hold facts
+# (table rows, list items, figures)
+MIN_BLOCK_WORDS = 4
+
+# Blocks where at least this share of the tokens are figures hold facts ("Block time: 400 ms")
+# rather than being menus or footers that merely contain a number ("Web3 · Layer 2 · Subscribe")
+MIN_FIGURE_SHARE = 0.25
+
+_BLOCK_BREAK = re.compile(r"\n\s*\n")
+_CODE_FENCE = re.compile(r"^```[^\n]*\n(.*?)^```[^\n]*$", re.MULTILINE | re.DOTALL)
+_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_LINK = re.compile(r"\[([^\]]*)\]\((?:[^()]|\([^)]*\))*\)")
+_BARE_URL = re.compile(r"https?://\S+")
+_HTML_TAG = re.compile(r"</?[a-zA-Z][^>]*>")
+_SPACES = re.compile(r"[ \t\u00a0]+")
+_WORD = re.compile(r"[A-Za-z]{2,}")
+_LIST_ITEM = re.compile(r"^(?:[-*+]|\d+[.)])\s")
+_TABLE_ROW = re.compile(r"^\|.*\|$")
+_TOKEN = re.compile(r"\S*\w\S*")
+# Figures such as "588,012,345", "5.1%", "$12" or "400"; a lone digit is more often part
+# of a name ("Layer 2", "Top 5") than a fact
+_FIGURE = re.compile(r"[$€£~+-]?(?:\d[\d,.]*\d|\d)(?:%|[kKmMbBx])?")
+_LONE_DIGIT = re.compile(r"\d")
+_MENU_SEPARATOR = re.compile(r"\s+[·•|]\s+")
+_BOILERPLATE = re.compile(
+    r"(\bcookies?\b|accept all|privacy policy|terms of (use|service)|all rights reserved|©|"
+    r"copyright \d{4}|newsletter|\bsign (in|up)\b|\blog ?in\b|skip to (main )?content|"
+    r"share (this|on)\b|follow us|back to top|was this (page|article) helpful|edit (this page|on github))",
+    re.IGNORECASE
+)
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _shorten_code(match):
+    # Blank lines inside code would split it into blocks judged as prose
+    lines = [line for line in match.group(1).splitlines() if line.strip()]
+    if len(lines) <= MAX_CODE_LINES:
+        return "```\n" + "\n".join(lines) + "\n```"
+    kept = "\n".join(lines[:MAX_CODE_LINES])
+    return f"```\n{kept}\n... ({len(lines) - MAX_CODE_LINES} more lines)\n```"
+
+
+def _holds_facts(lines):
+    """Tables, lists and blocks made up largely of figures"""
+    if any(_LIST_ITEM.match(line) or _TABLE_ROW.match(line) for line in lines):
+        return True
+    tokens = [token.strip(".,;:()[]") for line in lines for token in _TOKEN.findall(line)]
+    figures = sum(1 for token in tokens if _FIGURE.fullmatch(token) and not _LONE_DIGIT.fullmatch(token))
+    return bool(tokens) and figures / len(tokens) >= MIN_FIGURE_SHARE
+
+
+def _is_low_information(block):
+    """Navigation lists, banners, link farms and other blocks with little prose"""
+    if block.startswith("#") or block.startswith("```"):
+        return False
+
+    lines = [line.strip() for line in block.splitlines() if line.strip()]
+    words = _WORD.findall(block)
+
+    # Short boilerplate lines (banners, footers); long paragraphs that merely mention a term are kept
+    if len(words) < 40 and _BOILERPLATE.search(block) and not any("|" in line for line in lines):
+        return True
+
+    # Tables, lists and figures state facts in few words and many symbols; the rules
+    # below only judge prose
+    if _holds_facts(lines):
+        return False
+
+    if len(words) < MIN_BLOCK_WORDS:
+        return True
+
+    # Menus: many lines or separated items, almost all of them one or two words
+    items = [item for line in lines for item in _MENU_SEPARATOR.split(line)]
+    if len(items) >= 4 and sum(len(_WORD.findall(item)) <= 2 for item in items) / len(items) > 0.8:
+        return True
+
+    # Mostly symbols or markup rather than words
+    letters = sum(len(word) for word in words)
+    return letters / max(len(block), 1) < 0.4
+
+
+def clean_content(text):
+    """
+    Shrink crawled page content to the text worth sending to the model
+
+    Removes images, link targets, HTML remnants, cookie banners, navigation
+    menus, footers and other low-information blocks, shortens long code
+    blocks and collapses whitespace. Headings and prose are kept.
+
+    Args:
+        text (str): Document content (markdown or plain text)
+
+    Returns:
+        str: Cleaned content
+    """
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = _CODE_FENCE.sub(_shorten_code, text)
+    text = _IMAGE.sub("", text)
+    # Keep link text only; the targets are long and rarely useful to the analysis
+    text = _LINK.sub(r"\1", text)
+    text = _BARE_URL.sub("", text)
+    text = _HTML_TAG.sub("", text)
+
+    blocks = []
+    for block in _BLOCK_BREAK.split(text):
+        block = "\n".join(_SPACES.sub(" ", line).strip() for line in block.splitlines()).strip()
+        if block and not _is_low_information(block):
+            blocks.append(block)
+    return "\n\n".join(blocks)
+
+
+def _clean_batch(texts):
+    """Worker entry point: clean several documents in one round trip"""
+    return [clean_content(text) for text in texts]
+
+
+def _get_pool():
+    """
+    Worker processes shared by every cleaning call, started on first use
+
+    Returns:
+        tuple: (ProcessPoolExecutor, number of workers)
+    """
+    global _pool, _pool_workers
+
+    with _pool_lock:
+        if _pool is None:
+            _pool_workers = os.cpu_count() or 1
+            # Spawned rather than forked: the parent runs event-loop and client threads
+            _pool = ProcessPoolExecutor(max_workers=_pool_workers,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool, _pool_workers
+
+
+def _discard_pool(pool):
+    """Forget a broken pool so the next large batch starts a fresh one"""
+    global _pool
+
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def clean_documents(raw_data, min_pool_chars=POOL_MIN_CHARS):
+    """
+    Clean every crawled document, in worker processes for large batches
+
+    Args:
+        raw_data (dict): Raw data from Firecrawl
+        min_pool_chars (int): Total content size from which a process pool is used
+
+    Returns:
+        tuple: (raw_data with cleaned content and empty documents dropped, report dict
+            with per-source "sources" entries and batch totals)
+    """
+    items = raw_data.get("raw_data") if isinstance(raw_data, dict) else None
+    if not isinstance(items, list):
+        return raw_data, {"sources": [], "chars_before": 0, "chars_after": 0, "ratio": 1.0,
+                          "tokens_removed": 0, "processes": 0}
+
+    documents = [item for item in items if isinstance(item, dict) and item.get("content")]
+    texts = [document["content"] for document in documents]
+    total = sum(len(text) for text in texts)
+
+    cleaned, processes = None, 0
+    if total >= min_pool_chars and len(texts) > 1 and (os.cpu_count() or 1) > 1:
+        pool, processes = _get_pool()
+        # A few documents per task keeps pickling overhead low while spreading the work
+        size = max(1, len(texts) // (processes * 4))
+        batches = [texts[start:start + size] for start in range(0, len(texts), size)]
+        try:
+            cleaned = [text for batch in pool.map(_clean_batch, batches) for text in batch]
+        except BrokenProcessPool:
+            # Workers could not start (e.g. no importable __main__); clean in-process instead
+            _discard_pool(pool)
+            processes = 0
+    if cleaned is None:
+        cleaned = _clean_batch(texts)
+
+    replacements = {id(document): text for document, text in zip(documents, cleaned)}
+    kept = []
+    sources = []
+    for item in items:
+        if id(item) not in replacements:
+            kept.append(item)
+            continue
+        before, after = item["content"], replacements[id(item)]
+        sources.append({
+            "source": item.get("source"),
+            "url": item.get("url"),
+            "chars_before": len(before),
+            "chars_after": len(after),
+            "ratio": round(len(after) / len(before), 3)
+        })
+        if after:
+            kept.append({**item, "content": after})
+
+    chars_after = sum(entry["chars_after"] for entry in sources)
+    report = {
+        "sources": sources,
+        "chars_before": total,
+        "chars_after": chars_after,
+        "ratio": round(chars_after / total, 3) if total else 1.0,
+        "tokens_removed": sum(map(estimate_tokens, texts)) - sum(map(estimate_tokens, cleaned)),
+        "processes": processes
+    }
+
+    cleaned_data = dict(raw_data)
+    cleaned_data["raw_data"] = kept
+    return cleaned_data, report
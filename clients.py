@@ -0,0 +1,215 @@
+import os
+import asyncio
+import threading
+import httpx
+
+# requests and openai are imported by the methods that create their clients: the
+# openai package alone takes about half a second to import, which headless runs
+# (and research served from the caches) would otherwise pay before doing anything
+
+
+class ClientConfig:
+    """
+    Connection pool and timeout settings shared by every pooled client
+    """
+
+    def __init__(self, pool_size=None, timeout=None, connect_timeout=None, max_retries=None):
+        """
+        Args:
+            pool_size (int): Keep-alive connections kept per host (HTTP_POOL_SIZE, default 20)
+            timeout (float): Read timeout in seconds (HTTP_TIMEOUT, default 60)
+            connect_timeout (float): Connect timeout in seconds (HTTP_CONNECT_TIMEOUT, default 10)
+            max_retries (int): Retries the OpenAI client makes on transient errors (OPENAI_MAX_RETRIES, default 2)
+        """
+        self.pool_size = pool_size or int(os.getenv("HTTP_POOL_SIZE", 20))
+        self.timeout = timeout or float(os.getenv("HTTP_TIMEOUT", 60))
+        self.connect_timeout = connect_timeout or float(os.getenv("HTTP_CONNECT_TIMEOUT", 10))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("OPENAI_MAX_RETRIES", 2))
+
+    def requests_timeout(self):
+        """Timeout tuple for requests calls"""
+        return (self.connect_timeout, self.timeout)
+
+    def httpx_timeout(self):
+        """Timeout object for httpx clients"""
+        return httpx.Timeout(self.timeout, connect=self.connect_timeout)
+
+
+class ClientRegistry:
+    """
+    Thread-safe registry of pooled HTTP and OpenAI clients
+
+    Clients are created once per API key and reused across research runs and
+    Streamlit reruns, so repeated calls keep their TCP/TLS connections alive.
+    Async clients are bound to the event loop they were created on; the
+    registry owns a long-lived background loop (see run_sync) so blocking
+    callers reuse the same async clients as well.
+    """
+
+    def __init__(self, config=None):
+        """
+        Args:
+            config (ClientConfig): Pool and timeout settings; defaults come from environment variables
+        """
+        self.config = config or ClientConfig()
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._openai_clients = {}
+        self._async_clients = {}
+        self._loop = None
+        self._loop_thread = None
+
+    def configure(self, **settings):
+        """
+        Replace the pool settings and drop existing clients so new ones pick them up
+
+        Args:
+            **settings: Keyword arguments accepted by ClientConfig
+        """
+        with self._lock:
+            self.config = ClientConfig(**settings)
+            for session in self._sessions.values():
+                session.close()
+            for client in self._openai_clients.values():
+                client.close()
+            self._sessions.clear()
+            self._openai_clients.clear()
+            self._async_clients.clear()
+
+    def http_session(self, api_key):
+        """
+        Return the pooled requests session for an API key
+
+        Args:
+            api_key (str): Key the session's default headers authenticate with
+
+        Returns:
+            requests.Session: Session with keep-alive connection pools
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        with self._lock:
+            session = self._sessions.get(api_key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.config.pool_size, pool_maxsize=self.config.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({
+                    "Authorization": f"Bearer {api_key}",
+                    "Content-Type": "application/json"
+                })
+                self._sessions[api_key] = session
+            return session
+
+    def openai_client(self, api_key):
+        """
+        Return the shared blocking OpenAI client for an API key
+
+        Args:
+            api_key (str): OpenAI API key
+
+        Returns:
+            OpenAI: Client reused across agents and runs
+        """
+        from openai import OpenAI
+
+        with self._lock:
+            client = self._openai_clients.get(api_key)
+            if client is None:
+                client = OpenAI(
+                    api_key=api_key,
+                    timeout=self.config.timeout,
+                    max_retries=self.config.max_retries
+                )
+                self._openai_clients[api_key] = client
+            return client
+
+    def async_http_client(self):
+        """
+        Return the pooled httpx client for the running event loop
+
+        Returns:
+            httpx.AsyncClient: Client shared by every coroutine on this loop
+        """
+        return self._loop_scoped("http", lambda: httpx.AsyncClient(
+            timeout=self.config.httpx_timeout(),
+            limits=httpx.Limits(
+                max_connections=self.config.pool_size,
+                max_keepalive_connections=self.config.pool_size
+            )
+        ))
+
+    def async_openai_client(self, api_key):
+        """
+        Return the shared async OpenAI client for an API key and the running event loop
+
+        Args:
+            api_key (str): OpenAI API key
+
+        Returns:
+            AsyncOpenAI: Client reused by every coroutine on this loop
+        """
+        from openai import AsyncOpenAI
+
+        return self._loop_scoped(("openai", api_key), lambda: AsyncOpenAI(
+            api_key=api_key,
+            timeout=self.config.timeout,
+            max_retries=self.config.max_retries
+        ))
+
+    def _loop_scoped(self, key, factory):
+        """Get or create a client bound to the currently running event loop"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            # Forget clients whose loop has shut down; they can no longer be used
+            for stale in [known for known in self._async_clients if known.is_closed()]:
+                del self._async_clients[stale]
+
+            clients = self._async_clients.setdefault(loop, {})
+            if key not in clients:
+                clients[key] = factory()
+            return clients[key]
+
+    def submit(self, coro):
+        """
+        Schedule a coroutine on the registry's background event loop
+
+        Unlike asyncio.run, the loop outlives the call, so async clients and their
+        keep-alive connections are reused by the next caller.
+
+        Args:
+            coro: Coroutine to execute
+
+        Returns:
+            concurrent.futures.Future: Future for the coroutine's result
+        """
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="research-event-loop",
+                    daemon=True
+                )
+                self._loop_thread.start()
+            loop = self._loop
+
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def run_sync(self, coro):
+        """
+        Run a coroutine on the background event loop and wait for its result
+
+        Args:
+            coro: Coroutine to execute
+
+        Returns:
+            The coroutine's result
+        """
+        return self.submit(coro).result()
+
+
+# Process-wide registry used by the Firecrawl client and the agents
+registry = ClientRegistry()
@@ -0,0 +1,87 @@
+import re
+from chunking import iter_documents
+
+# Most entities a single comparison covers; each one adds a concurrent analysis
+MAX_ENTITIES = 6
+
+_SEPARATORS = re.compile(r"\s*(?:,|;|\bvs\.?|\bversus\b|\band\b)\s*", re.IGNORECASE)
+
+
+def parse_entities(text):
+    """
+    Split a list of protocols such as "Solana, Sui and Aptos" or "Solana vs Sui"
+
+    Args:
+        text (str): Entity names separated by commas, "and", "vs" or "versus"
+
+    Returns:
+        list: Distinct entity names in the order given
+    """
+    entities = []
+    for name in _SEPARATORS.split(text or ""):
+        name = name.strip()
+        if name and name.lower() not in (entity.lower() for entity in entities):
+            entities.append(name)
+    return entities
+
+
+def validate_entities(entities):
+    """
+    Check a comparison's entity list
+
+    Args:
+        entities (list): Entity names
+
+    Raises:
+        ValueError: If there are fewer than two or more than MAX_ENTITIES distinct names
+    """
+    if not isinstance(entities, (list, tuple)) or not all(isinstance(name, str) and name.strip() for name in entities):
+        raise ValueError("Comparison entities must be a list of names")
+    distinct = {name.strip().lower() for name in entities}
+    if len(distinct) != len(entities) or not 2 <= len(entities) <= MAX_ENTITIES:
+        raise ValueError(f"A comparison needs between 2 and {MAX_ENTITIES} distinct entities")
+
+
+def _mention_pattern(entity):
+    # Whole-name match, so "Sui" doesn't match "suite" and "Polygon zkEVM" tolerates extra spaces
+    words = [re.escape(word) for word in entity.split()]
+    return re.compile(r"(?<!\w)" + r"\s+".join(words) + r"(?!\w)", re.IGNORECASE)
+
+
+def split_by_entity(raw_data, entities):
+    """
+    Route the documents of one shared crawl to the entities they are about
+
+    A document mentioning several entities is crawled once but analyzed for
+    each of them; a document mentioning none is general background and goes
+    to every entity.
+
+    Args:
+        raw_data (dict): Raw data from Firecrawl for the whole comparison
+        entities (list): Entity names
+
+    Returns:
+        tuple: (dict of entity name to raw data, report dict with "documents" per entity
+            and the number of "shared" and "general" documents)
+    """
+    patterns = {entity: _mention_pattern(entity) for entity in entities}
+    routed = {entity: [] for entity in entities}
+    report = {"documents": {entity: 0 for entity in entities}, "shared": 0, "general": 0}
+
+    for document in iter_documents(raw_data):
+        text = f"{document.get('title') or ''}\n{document['content']}"
+        mentioned = [entity for entity, pattern in patterns.items() if pattern.search(text)]
+        if len(mentioned) > 1:
+            report["shared"] += 1
+        elif not mentioned:
+            report["general"] += 1
+            mentioned = entities
+        for entity in mentioned:
+            routed[entity].append(document)
+            report["documents"][entity] += 1
+
+    entity_data = {}
+    for entity, documents in routed.items():
+        entity_data[entity] = dict(raw_data)
+        entity_data[entity]["raw_data"] = documents
+    return entity_data, report
@@ -0,0 +1,243 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+# Default location and limits for the shared crawl cache
+DEFAULT_CACHE_PATH = os.path.join(".cache", "firecrawl_cache.sqlite3")
+DEFAULT_TTL_SECONDS = 6 * 60 * 60
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def normalize_topic(topic):
+    """
+    Normalize a research topic so trivially different spellings share a cache entry
+
+    Args:
+        topic (str): The blockchain research topic
+
+    Returns:
+        str: Lower-cased topic with collapsed whitespace
+    """
+    return " ".join(str(topic).lower().split())
+
+
+class CrawlCache:
+    """
+    Persistent SQLite cache for Firecrawl research results
+
+    Entries are keyed on (normalized topic, depth, source list) and expire after
+    a per-entry TTL. Expired entries are no longer served as fresh but are kept
+    as a stale fallback (see get's allow_stale) until eviction: once the total
+    payload size exceeds the byte budget, expired entries go first, then the
+    least recently used ones.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL_SECONDS, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Open (or create) the cache database
+
+        Args:
+            path (str): SQLite database file, or ":memory:" for a process-local cache
+            ttl (float): Default time-to-live for new entries in seconds
+            max_bytes (int): Upper bound on the total size of cached payloads
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if path != ":memory:" and directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS crawl_cache (
+                key TEXT PRIMARY KEY,
+                topic TEXT NOT NULL,
+                depth INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS crawl_cache_last_access ON crawl_cache (last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(topic, depth, sources):
+        """
+        Build the cache key for a research request
+
+        Args:
+            topic (str): The blockchain research topic
+            depth (int): Research depth level (1-5)
+            sources (list): Source domains requested from Firecrawl
+
+        Returns:
+            str: Hex digest identifying the request
+        """
+        key_material = json.dumps(
+            [normalize_topic(topic), int(depth), sorted(sources or [])],
+            separators=(",", ":")
+        )
+        return hashlib.sha256(key_material.encode()).hexdigest()
+
+    def get(self, topic, depth, sources, allow_stale=False):
+        """
+        Look up cached research results
+
+        Args:
+            topic (str): The blockchain research topic
+            depth (int): Research depth level (1-5)
+            sources (list): Source domains requested from Firecrawl
+            allow_stale (bool): Also return expired entries that haven't been evicted yet,
+                e.g. while Firecrawl is unavailable
+
+        Returns:
+            dict: Cached raw research data, or None on a miss
+        """
+        key = self.make_key(topic, depth, sources)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, expires_at FROM crawl_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or (row[1] <= now and not allow_stale):
+                # Expired entries stay behind as a fallback for when Firecrawl is unavailable
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE crawl_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def put(self, topic, depth, sources, data, ttl=None):
+        """
+        Store research results, evicting old entries if over the byte budget
+
+        Simulated fallback payloads are never stored.
+
+        Args:
+            topic (str): The blockchain research topic
+            depth (int): Research depth level (1-5)
+            sources (list): Source domains requested from Firecrawl
+            data (dict): Raw research data returned by Firecrawl
+            ttl (float): Optional time-to-live overriding the cache default
+
+        Returns:
+            bool: True if the entry was stored
+        """
+        if not isinstance(data, dict) or data.get("simulated"):
+            return False
+
+        payload = json.dumps(data)
+        size = len(payload.encode())
+        if size > self.max_bytes:
+            return False
+
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        key = self.make_key(topic, depth, sources)
+
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO crawl_cache
+                    (key, topic, depth, payload, size, created_at, expires_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, normalize_topic(topic), int(depth), payload, size, now, expires_at, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+        return True
+
+    def _evict(self, now):
+        """Drop expired entries, then least-recently-used ones, until under the byte budget"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM crawl_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM crawl_cache ORDER BY expires_at > ? ASC, last_access ASC", (now,)
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM crawl_cache WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock:
+            self._conn.execute("DELETE FROM crawl_cache")
+            self._conn.commit()
+
+    def stats(self):
+        """
+        Report cache effectiveness and size
+
+        Returns:
+            dict: Hit/miss counters, hit rate, entry count and stored bytes
+        """
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM crawl_cache"
+            ).fetchone()
+
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes
+        }
+
+
+def get_default_cache():
+    """
+    Return the process-wide crawl cache, configured from environment variables
+
+    FIRECRAWL_CACHE_PATH, FIRECRAWL_CACHE_TTL and FIRECRAWL_CACHE_MAX_BYTES
+    override the defaults; setting FIRECRAWL_CACHE_DISABLED=1 turns caching off.
+
+    Returns:
+        CrawlCache: The shared cache, or None if caching is disabled
+    """
+    global _default_cache
+
+    if os.getenv("FIRECRAWL_CACHE_DISABLED", "") in ("1", "true", "yes"):
+        return None
+
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = CrawlCache(
+                path=os.getenv("FIRECRAWL_CACHE_PATH", DEFAULT_CACHE_PATH),
+                ttl=float(os.getenv("FIRECRAWL_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+                max_bytes=int(os.getenv("FIRECRAWL_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+            )
+        return _default_cache
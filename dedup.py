@@ -0,0 +1,164 @@
+import re
+import hashlib
+from chunking import estimate_tokens, iter_documents
+
+_WORD = re.compile(r"\w+")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+FINGERPRINT_BITS = 64
+# Near-duplicates within MAX_DISTANCE bits share at least one band (pigeonhole), so
+# bucketing by band finds candidates without comparing every pair
+BANDS = 4
+BAND_BITS = FINGERPRINT_BITS // BANDS
+MAX_DISTANCE = 3
+# Below this many words a fingerprint is too noisy; such blocks only dedupe on exact text
+MIN_WORDS = 8
+
+
+def _hash64(text):
+    """Stable 64-bit hash of a shingle"""
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "big")
+
+
+def simhash(text, shingle_size=3):
+    """
+    Compute a 64-bit SimHash fingerprint over word shingles
+
+    Texts that differ only by small edits (syndicated copies, changed bylines,
+    tracking parameters) get fingerprints a few bits apart.
+
+    Args:
+        text (str): Text to fingerprint
+        shingle_size (int): Number of consecutive words per shingle
+
+    Returns:
+        int: Fingerprint, or None if the text has too few words
+    """
+    words = _WORD.findall(text.lower())
+    if len(words) < MIN_WORDS:
+        return None
+
+    weights = [0] * FINGERPRINT_BITS
+    for start in range(len(words) - shingle_size + 1):
+        feature = _hash64(" ".join(words[start:start + shingle_size]))
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if feature >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+class NearDuplicateIndex:
+    """
+    Banded SimHash index answering "have we already seen something like this?"
+
+    Lookups and inserts touch only the BANDS buckets of a fingerprint, so
+    deduplicating a batch runs in roughly linear time.
+    """
+
+    def __init__(self, max_distance=MAX_DISTANCE):
+        """
+        Args:
+            max_distance (int): Largest Hamming distance still treated as a duplicate
+        """
+        self.max_distance = max_distance
+        self._buckets = {}
+        self._exact = set()
+
+    def _bands(self, fingerprint):
+        mask = (1 << BAND_BITS) - 1
+        return [(band, fingerprint >> (band * BAND_BITS) & mask) for band in range(BANDS)]
+
+    def seen(self, text):
+        """
+        Check whether text duplicates something already added, adding it if not
+
+        Args:
+            text (str): Document or paragraph text
+
+        Returns:
+            bool: True if an earlier text was a (near-)duplicate
+        """
+        normalized = " ".join(_WORD.findall(text.lower()))
+        if normalized in self._exact:
+            return True
+
+        fingerprint = simhash(text)
+        if fingerprint is not None:
+            for band in self._bands(fingerprint):
+                for other in self._buckets.get(band, ()):
+                    if (fingerprint ^ other).bit_count() <= self.max_distance:
+                        return True
+            for band in self._bands(fingerprint):
+                self._buckets.setdefault(band, []).append(fingerprint)
+
+        self._exact.add(normalized)
+        return False
+
+
+def deduplicate(raw_data, level="paragraph", max_distance=MAX_DISTANCE, index=None):
+    """
+    Remove near-duplicate documents or paragraphs from crawled research data
+
+    Earlier documents win, so the source priority order of the crawl is kept.
+
+    Args:
+        raw_data (dict): Raw data from Firecrawl
+        level (str): "document" drops whole duplicate documents; "paragraph" also drops
+            repeated paragraphs inside otherwise distinct documents
+        max_distance (int): Largest SimHash Hamming distance treated as a duplicate
+        index (NearDuplicateIndex): Index of text seen so far, to deduplicate batches of
+            one crawl against each other; a fresh index by default
+
+    Returns:
+        tuple: (deduplicated raw data, report dict with documents, paragraphs,
+            characters and estimated tokens removed)
+    """
+    if level not in ("document", "paragraph"):
+        raise ValueError(f"Unknown deduplication level: {level}")
+
+    if index is None:
+        index = NearDuplicateIndex(max_distance)
+    kept = []
+    report = {
+        "level": level,
+        "documents_removed": 0,
+        "paragraphs_removed": 0,
+        "chars_removed": 0,
+        "tokens_removed": 0
+    }
+
+    for document in iter_documents(raw_data):
+        content = document["content"]
+
+        if level == "document":
+            if index.seen(content):
+                report["documents_removed"] += 1
+                report["chars_removed"] += len(content)
+                report["tokens_removed"] += estimate_tokens(content)
+            else:
+                kept.append(document)
+            continue
+
+        paragraphs = []
+        for paragraph in _PARAGRAPH_BREAK.split(content):
+            if not paragraph.strip():
+                continue
+            if index.seen(paragraph):
+                report["paragraphs_removed"] += 1
+                report["chars_removed"] += len(paragraph)
+                report["tokens_removed"] += estimate_tokens(paragraph)
+            else:
+                paragraphs.append(paragraph)
+
+        if paragraphs:
+            kept.append({**document, "content": "\n\n".join(paragraphs)})
+        else:
+            report["documents_removed"] += 1
+
+    deduplicated = dict(raw_data)
+    deduplicated["raw_data"] = kept
+    return deduplicated, report
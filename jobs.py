@@ -0,0 +1,517 @@
+import os
+import json
+import time
+import uuid
+import socket
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import streaming
+from clients import registry
+from crawl_cache import normalize_topic
+from blockchain_research import conduct_research_async
+
+DEFAULT_JOB_STORE_PATH = os.path.join(".cache", "jobs.sqlite3")
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+FINISHED_STATES = (COMPLETED, FAILED)
+
+# Progress and status message recorded when each pipeline stage is reached
+STAGE_PROGRESS = {
+    streaming.CRAWL_STARTED: (0.05, "Exploring blockchain sources with Firecrawl..."),
+    streaming.CRAWL_FINISHED: (0.3, "Synthesizing protocol details and metrics..."),
+    streaming.ANALYSIS_FINISHED: (0.6, "Elaborating on technical implications..."),
+    streaming.ELABORATION_FINISHED: (0.95, "Organizing the report...")
+}
+
+_default_manager = None
+_default_manager_lock = threading.Lock()
+
+# Owner ids of the job managers running in this process
+_live_owners = set()
+
+
+class QueueFullError(Exception):
+    """Raised when a job is rejected because too many jobs are already waiting or running"""
+
+
+class JobStore:
+    """
+    SQLite record of research jobs: who asked, what state they are in, and their results
+
+    The store outlives the process, so finished reports stay available across
+    app restarts and jobs that were cut off by a restart are reported as failed.
+    Each job records the job manager that owns it, so several processes can
+    share one store without failing each other's live jobs.
+    """
+
+    COLUMNS = ("job_id", "session_id", "topic", "topic_key", "depth", "options", "status",
+               "progress", "stage", "results", "error", "created", "updated")
+
+    def __init__(self, path=DEFAULT_JOB_STORE_PATH):
+        """
+        Args:
+            path (str): SQLite database file, or ":memory:"
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if path != ":memory:" and directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                session_id TEXT,
+                topic TEXT NOT NULL,
+                topic_key TEXT NOT NULL,
+                depth INTEGER NOT NULL,
+                options TEXT NOT NULL,
+                status TEXT NOT NULL,
+                progress REAL NOT NULL,
+                stage TEXT,
+                results TEXT,
+                error TEXT,
+                created REAL NOT NULL,
+                updated REAL NOT NULL,
+                owner TEXT
+            )
+            """
+        )
+        # Stores created before jobs had owners
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "owner" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_session ON jobs (session_id, topic_key, depth)")
+        self._conn.commit()
+
+    def create(self, session_id, topic, depth, options, owner=None):
+        """
+        Record a new queued job
+
+        Args:
+            session_id (str): Browser session (or other caller) that submitted the job
+            topic (str): The blockchain research topic
+            depth (int): Research depth level (1-5)
+            options (dict): Extra keyword arguments for conduct_research_async
+            owner (str): Job manager running the job (see JobManager.owner)
+
+        Returns:
+            str: The new job id
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, session_id, topic, topic_key, depth, options, status, progress, "
+                "stage, results, error, created, updated, owner) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?, NULL, NULL, ?, ?, ?)",
+                (job_id, session_id, topic, normalize_topic(topic), int(depth), json.dumps(options),
+                 QUEUED, "Waiting for a free research slot...", now, now, owner)
+            )
+            self._conn.commit()
+        return job_id
+
+    def update(self, job_id, **fields):
+        """
+        Change columns of a job
+
+        Args:
+            job_id (str): Job to update
+            **fields: Column values; "results" is stored as JSON
+        """
+        if "results" in fields:
+            fields["results"] = json.dumps(fields["results"])
+        fields["updated"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*fields.values(), job_id))
+            self._conn.commit()
+
+    def get(self, job_id):
+        """
+        Load a job
+
+        Args:
+            job_id (str): Job to load
+
+        Returns:
+            dict: Job record with decoded options and results, or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return self._to_dict(row)
+
+    def find_completed(self, session_id, topic, depth):
+        """
+        Find the latest completed report a session already has for a topic
+
+        Args:
+            session_id (str): Session to search
+            topic (str): The blockchain research topic
+            depth (int): Research depth level (1-5)
+
+        Returns:
+            dict: Job record, or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE session_id = ? AND topic_key = ? "
+                "AND depth = ? AND status = ? ORDER BY updated DESC LIMIT 1",
+                (session_id, normalize_topic(topic), int(depth), COMPLETED)
+            ).fetchone()
+        return self._to_dict(row)
+
+    def list_jobs(self, session_id, limit=20):
+        """
+        List a session's most recent jobs, without their results
+
+        Args:
+            session_id (str): Session to list
+            limit (int): Maximum number of jobs
+
+        Returns:
+            list: Job records, newest first
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE session_id = ? ORDER BY created DESC LIMIT ?",
+                (session_id, limit)
+            ).fetchall()
+        jobs = [self._to_dict(row) for row in rows]
+        for job in jobs:
+            job.pop("results")
+        return jobs
+
+    def fail_unfinished(self, reason, is_alive=None):
+        """
+        Mark jobs left queued or running by an earlier process as failed
+
+        Args:
+            reason (str): Error message to record
+            is_alive (callable): Called with a job's owner; jobs whose owner is still
+                running are left alone. None fails every unfinished job.
+
+        Returns:
+            int: Number of jobs marked
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id, owner FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+            ).fetchall()
+            orphans = [job_id for job_id, owner in rows
+                       if is_alive is None or owner is None or not is_alive(owner)]
+            now = time.time()
+            self._conn.executemany(
+                "UPDATE jobs SET status = ?, error = ?, updated = ? WHERE job_id = ?",
+                [(FAILED, reason, now, job_id) for job_id in orphans]
+            )
+            self._conn.commit()
+        return len(orphans)
+
+    def _to_dict(self, row):
+        if row is None:
+            return None
+        job = dict(zip(self.COLUMNS, row))
+        job["options"] = json.loads(job["options"])
+        job["results"] = json.loads(job["results"]) if job["results"] else None
+        return job
+
+
+class JobManager:
+    """
+    Run research jobs in the background and keep their state in a JobStore
+
+    Jobs run on the client registry's background event loop, so they don't
+    hold a Streamlit script thread while they wait on Firecrawl and OpenAI;
+    at most max_concurrent of them run at once and the rest wait in line.
+    Streamed progress (sources, partial report sections) is kept in memory
+    for the UI, while the store holds status, stage and the final report.
+    """
+
+    def __init__(self, store=None, max_concurrent=None):
+        """
+        Args:
+            store (JobStore): Where jobs are recorded; defaults to JOB_STORE_PATH
+                (or .cache/jobs.sqlite3)
+            max_concurrent (int): Jobs running at once (RESEARCH_MAX_CONCURRENT_JOBS, default 4)
+        """
+        self.store = store or JobStore(os.getenv("JOB_STORE_PATH", DEFAULT_JOB_STORE_PATH))
+        self.max_concurrent = max_concurrent or int(os.getenv("RESEARCH_MAX_CONCURRENT_JOBS", 4))
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self._futures = {}
+        self._inflight = {}
+        self._running = 0
+        self._live = {}
+        self._started = set()
+        self._lock = threading.Lock()
+        # Store writes run in order on their own thread, off the shared event loop
+        self._writes = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-store")
+        # Identifies this manager's jobs in a store shared with other processes
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        _live_owners.add(self.owner)
+        # Jobs of managers that are gone (e.g. before a restart) will never finish
+        self.store.fail_unfinished("Interrupted by a restart", is_alive=_owner_alive)
+
+    def submit(self, topic, depth=3, session_id=None, api_keys=None, **research_options):
+        """
+        Queue a research job and return immediately
+
+        Args:
+            topic (str): The blockchain research topic
+            depth (int): Research depth level (1-5)
+            session_id (str): Session the job belongs to
+            api_keys (dict): "openai" and "firecrawl" API keys for the job (see submit_coalesced)
+            **research_options: Extra keyword arguments for conduct_research_async
+
+        Returns:
+            str: Job id for polling with get()
+        """
+        job_id, _ = self.submit_coalesced(topic, depth, session_id=session_id, coalesce=False, api_keys=api_keys,
+                                          **research_options)
+        return job_id
+    
+    def submit_coalesced(self, topic, depth=3, session_id=None, max_pending=None, coalesce=True, api_keys=None,
+                         **research_options):
+        """
+        Join an identical job that is already queued or running, or queue a new one
+        
+        Requests are identical when the normalized topic, depth, options and API keys
+        match, so a burst of requests for a popular topic runs the pipeline once
+        without one user's job running on another user's keys.
+        
+        Args:
+            topic (str): The blockchain research topic
+            depth (int): Research depth level (1-5)
+            session_id (str): Session the job belongs to if a new one is created
+            max_pending (int): Reject new jobs with QueueFullError once this many are
+                queued or running (joining an existing job is always allowed)
+            coalesce (bool): Set to False to always create a new job
+            api_keys (dict): "openai" and "firecrawl" API keys passed to the pipeline; None
+                uses the process environment. Only a hash of them is kept, in memory.
+            **research_options: Extra keyword arguments for conduct_research_async
+            
+        Returns:
+            tuple: (job id, True if an existing job was joined)
+        """
+        key = self.flight_key(topic, depth, research_options, api_keys)
+        with self._lock:
+            if coalesce and key in self._inflight:
+                return self._inflight[key], True
+            if max_pending is not None and len(self._futures) >= max_pending:
+                raise QueueFullError(f"{len(self._futures)} research jobs are already queued or running")
+            
+            job_id = self.store.create(session_id, topic, depth, research_options, owner=self.owner)
+            self._live[job_id] = {"sources": [], "tokens_cleaned": 0, "tokens_removed": 0, "analysis_chars": 0,
+                                  "buffers": {}}
+            self._inflight[key] = job_id
+            future = self._futures[job_id] = registry.submit(self._run(job_id, topic, depth, research_options,
+                                                                       api_keys))
+        # Also runs when the job is cancelled before _run starts; outside the lock, since an
+        # already finished future calls it straight away
+        future.add_done_callback(lambda done: self._finished(job_id, key, done))
+        return job_id, False
+    
+    @staticmethod
+    def flight_key(topic, depth, options, api_keys=None):
+        """Identity of a request for coalescing: normalized topic, depth, options and hashed API keys"""
+        keys = hashlib.sha256(json.dumps(api_keys or {}, sort_keys=True).encode("utf-8")).hexdigest()
+        return f"{normalize_topic(topic)}|{int(depth)}|{json.dumps(options, sort_keys=True)}|{keys}"
+    
+    def pending(self):
+        """Number of jobs queued or running in this process"""
+        with self._lock:
+            return len(self._futures)
+    
+    def running(self):
+        """Number of jobs currently holding a research slot"""
+        with self._lock:
+            return self._running
+
+    def get(self, job_id):
+        """
+        Current state of a job
+
+        Args:
+            job_id (str): Job to look up
+
+        Returns:
+            dict: Job record (see JobStore.get), or None for unknown jobs
+        """
+        return self.store.get(job_id)
+
+    def live(self, job_id):
+        """
+        Streamed progress of a job started by this process
+
+        Args:
+            job_id (str): Job to look up
+
+        Returns:
+            dict: "sources", "tokens_cleaned" (boilerplate), "tokens_removed" (duplicates),
+                "analysis_chars" and the partial report
+                "sections" generated so far (empty once the job is finished)
+        """
+        with self._lock:
+            live = self._live.get(job_id)
+            if live is None:
+                return {"sources": [], "tokens_cleaned": 0, "tokens_removed": 0, "analysis_chars": 0,
+                        "sections": {}}
+            sources = list(live["sources"])
+            buffers = list(live["buffers"].values())
+            tokens_cleaned = live["tokens_cleaned"]
+            tokens_removed = live["tokens_removed"]
+            analysis_chars = live["analysis_chars"]
+
+        sections = {}
+        for buffer in buffers:
+            sections.update(streaming.parse_partial_json(buffer))
+        return {"sources": sources, "tokens_cleaned": tokens_cleaned, "tokens_removed": tokens_removed,
+                "analysis_chars": analysis_chars, "sections": sections}
+
+    def cancel(self, job_id):
+        """
+        Stop a queued or running job
+
+        Args:
+            job_id (str): Job to cancel
+
+        Returns:
+            bool: True if the job was still running and has been cancelled
+        """
+        with self._lock:
+            future = self._futures.get(job_id)
+        return future is not None and future.cancel()
+
+    async def wait(self, job_id, timeout):
+        """
+        Wait until a job started by this process finishes, or the timeout passes
+        
+        Can be awaited from any event loop; waiting never cancels the job.
+        
+        Args:
+            job_id (str): Job to wait for
+            timeout (float): Maximum seconds to wait
+        """
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            await asyncio.wait([asyncio.shield(asyncio.wrap_future(future))], timeout=timeout)
+    
+    async def _run(self, job_id, topic, depth, options, api_keys=None):
+        """Run one job once a slot is free, recording progress and the outcome"""
+        with self._lock:
+            self._started.add(job_id)
+        try:
+            async with self._semaphore:
+                with self._lock:
+                    self._running += 1
+                try:
+                    await self._update(job_id, status=RUNNING, progress=0.0, stage="Starting research...")
+                    results = await conduct_research_async(
+                        topic, depth=depth, on_event=lambda event: self._on_event(job_id, event),
+                        api_keys=api_keys, **options
+                    )
+                finally:
+                    with self._lock:
+                        self._running -= 1
+            await self._update(job_id, status=COMPLETED, progress=1.0, stage="Research completed!",
+                               results=results)
+        except asyncio.CancelledError:
+            # Queued behind this job's earlier writes, so it can't be overwritten by them
+            self._writes.submit(self.store.update, job_id, status=FAILED, error="Cancelled")
+            raise
+        except Exception as e:
+            await self._update(job_id, status=FAILED, error=str(e))
+
+    def _finished(self, job_id, key, future):
+        """Forget a finished or cancelled job; _run records the outcome unless it never started"""
+        with self._lock:
+            self._live.pop(job_id, None)
+            self._futures.pop(job_id, None)
+            if self._inflight.get(key) == job_id:
+                del self._inflight[key]
+            started = job_id in self._started
+            self._started.discard(job_id)
+        if future.cancelled() and not started:
+            self._writes.submit(self.store.update, job_id, status=FAILED, error="Cancelled")
+
+    def _on_event(self, job_id, event):
+        """Fold a pipeline event into the job's live progress and stored stage"""
+        event_type = event["type"]
+        with self._lock:
+            live = self._live.get(job_id)
+            if live is None:
+                return
+            if event_type == streaming.SOURCE_RECEIVED:
+                live["sources"].append(event["source"])
+            elif event_type == streaming.CLEAN_FINISHED:
+                live["tokens_cleaned"] = event["tokens_removed"]
+            elif event_type == streaming.DEDUP_FINISHED:
+                live["tokens_removed"] = event["tokens_removed"]
+            elif event_type == streaming.ANALYSIS_TOKEN:
+                live["analysis_chars"] += len(event["text"])
+            elif event_type == streaming.ELABORATION_TOKEN:
+                # Section-mode tokens arrive interleaved, so buffer them per section
+                section = event.get("section", "")
+                live["buffers"][section] = live["buffers"].get(section, "") + event["text"]
+
+        # Only stage changes touch the store, without waiting for the write; tokens stay in memory
+        if event_type in STAGE_PROGRESS:
+            progress, stage = STAGE_PROGRESS[event_type]
+            self._writes.submit(self.store.update, job_id, progress=progress, stage=stage)
+
+    def _update(self, job_id, **fields):
+        """Queue a store update behind earlier ones, awaitable from the event loop"""
+        return asyncio.wrap_future(self._writes.submit(self.store.update, job_id, **fields))
+
+
+def _owner_alive(owner):
+    """
+    Check whether the job manager that owns a job may still be running
+
+    Args:
+        owner (str): Owner id, "host:pid:token"
+
+    Returns:
+        bool: False if the manager is known to be gone; jobs owned on other hosts count as alive
+    """
+    host, pid, _ = owner.rsplit(":", 2)
+    if host != socket.gethostname():
+        return True
+    if int(pid) == os.getpid():
+        return owner in _live_owners
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def get_default_job_manager():
+    """
+    Return the process-wide job manager
+
+    Returns:
+        JobManager: The shared manager
+    """
+    global _default_manager
+
+    with _default_manager_lock:
+        if _default_manager is None:
+            _default_manager = JobManager()
+        return _default_manager
@@ -0,0 +1,257 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_CACHE_PATH = os.path.join(".cache", "llm_cache.sqlite3")
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+class MemoryLRUBackend:
+    """
+    In-process LRU backend for the LLM response cache
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            max_entries (int): Maximum number of responses kept in memory
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the stored entry for a key, or None"""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key, value):
+        """Store an entry, evicting the least recently used one if full"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove every stored entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteBackend:
+    """
+    On-disk backend for the LLM response cache, shared across processes and restarts
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=None):
+        """
+        Args:
+            path (str): SQLite database file
+            max_entries (int): Optional cap on stored responses (least recently used are dropped)
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if path != ":memory:" and directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        """Return the stored entry for a key, or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        """Store an entry, trimming to max_entries if configured"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, last_access) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time())
+            )
+            if self.max_entries:
+                self._conn.execute(
+                    """
+                    DELETE FROM llm_cache WHERE key NOT IN (
+                        SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT ?
+                    )
+                    """,
+                    (self.max_entries,)
+                )
+            self._conn.commit()
+
+    def clear(self):
+        """Remove every stored entry"""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+class LLMCache:
+    """
+    Content-addressed cache for chat completion responses
+
+    Responses are keyed on a hash of everything that determines the model output
+    (model, system message, user prompt, temperature and response format), so
+    identical requests from any agent share one entry.
+    """
+
+    def __init__(self, backend=None):
+        """
+        Args:
+            backend: Storage backend (MemoryLRUBackend or SQLiteBackend); defaults to in-memory LRU
+        """
+        self.backend = backend if backend is not None else MemoryLRUBackend()
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+        self.latency_saved = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model, system_message, prompt, temperature, response_format):
+        """
+        Hash the inputs that determine a chat completion
+
+        Returns:
+            str: Hex digest identifying the request
+        """
+        key_material = json.dumps(
+            [model, system_message, prompt, temperature, response_format],
+            sort_keys=True,
+            separators=(",", ":")
+        )
+        return hashlib.sha256(key_material.encode()).hexdigest()
+
+    def get(self, key):
+        """
+        Look up a cached response and record what the hit saved
+
+        Args:
+            key (str): Key from make_key
+
+        Returns:
+            dict: Cached entry with "content", "usage" and "latency", or None on a miss
+        """
+        entry = self.backend.get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.tokens_saved += entry.get("usage", {}).get("total_tokens", 0)
+            self.latency_saved += entry.get("latency", 0.0)
+        return entry
+
+    def set(self, key, content, usage=None, latency=0.0):
+        """
+        Store a completion response
+
+        Args:
+            key (str): Key from make_key
+            content (str): Message content returned by the model
+            usage (dict): Token usage reported for the original call
+            latency (float): Wall-clock seconds the original call took
+        """
+        self.backend.set(key, {"content": content, "usage": usage or {}, "latency": latency})
+
+    def clear(self):
+        """Remove every cached response"""
+        self.backend.clear()
+
+    def stats(self):
+        """
+        Report cache effectiveness
+
+        Returns:
+            dict: Hit/miss counters, hit rate, and tokens and seconds saved by hits
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "tokens_saved": self.tokens_saved,
+            "latency_saved": round(self.latency_saved, 3),
+            "entries": len(self.backend)
+        }
+
+
+def usage_to_dict(usage):
+    """
+    Convert an OpenAI usage object into a plain dict
+
+    Args:
+        usage: response.usage from the OpenAI client (may be None)
+
+    Returns:
+        dict: prompt_tokens, completion_tokens and total_tokens
+    """
+    if usage is None:
+        return {}
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+        "total_tokens": getattr(usage, "total_tokens", 0) or 0
+    }
+
+
+def get_default_llm_cache():
+    """
+    Return the process-wide LLM response cache, configured from environment variables
+
+    LLM_CACHE_BACKEND selects "memory" (default) or "sqlite"; LLM_CACHE_PATH and
+    LLM_CACHE_MAX_ENTRIES tune the backend. LLM_CACHE_DISABLED=1 turns caching off.
+
+    Returns:
+        LLMCache: The shared cache, or None if caching is disabled
+    """
+    global _default_cache
+
+    if os.getenv("LLM_CACHE_DISABLED", "") in ("1", "true", "yes"):
+        return None
+
+    with _default_cache_lock:
+        if _default_cache is None:
+            max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+            if os.getenv("LLM_CACHE_BACKEND", "memory") == "sqlite":
+                backend = SQLiteBackend(os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH), max_entries)
+            else:
+                backend = MemoryLRUBackend(max_entries)
+            _default_cache = LLMCache(backend)
+        return _default_cache
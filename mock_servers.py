@@ -0,0 +1,503 @@
+import re
+import sys
+import json
+import math
+import time
+import zlib
+import random
+import argparse
+import threading
+import multiprocessing
+import requests
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from chunking import estimate_tokens
+
+# Filler vocabulary for generated documents; varied enough that dedup keeps them apart
+_WORDS = """
+block chain consensus validator staking rollup bridge token liquidity protocol layer
+throughput latency governance treasury upgrade mainnet testnet wallet custody oracle
+sequencer proof zero knowledge settlement finality shard fee burn emission supply
+developer ecosystem adoption volume market regulation compliance audit exploit security
+""".split()
+
+# Sections the stand-in model fills in: every "key": "..." of the JSON schema in the system message
+_SCHEMA_KEY = re.compile(r'"(\w+)"\s*:\s*"')
+
+
+class Latency:
+    """
+    Random response delay
+
+    Kinds: "fixed" (always mean), "uniform" (mean +/- spread), "lognormal"
+    (median mean, sigma spread, for long tails) and "exponential" (given mean).
+    """
+
+    KINDS = ("fixed", "uniform", "lognormal", "exponential")
+
+    def __init__(self, kind="fixed", mean=0.0, spread=0.0):
+        """
+        Args:
+            kind (str): One of KINDS
+            mean (float): Typical delay in seconds
+            spread (float): Width of the distribution (see class docstring)
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        self.kind = kind
+        self.mean = mean
+        self.spread = spread
+
+    @classmethod
+    def parse(cls, spec):
+        """
+        Build a Latency from "kind:mean[:spread]", e.g. "lognormal:0.4:0.5", or a plain number
+
+        Args:
+            spec (str): Latency specification
+
+        Returns:
+            Latency: Parsed distribution
+        """
+        parts = str(spec).split(":")
+        if len(parts) == 1:
+            return cls("fixed", float(parts[0]))
+        return cls(parts[0], float(parts[1]), float(parts[2]) if len(parts) > 2 else 0.0)
+
+    def sample(self, rng):
+        """Draw one delay in seconds"""
+        if self.kind == "uniform":
+            delay = rng.uniform(self.mean - self.spread, self.mean + self.spread)
+        elif self.kind == "lognormal":
+            delay = self.mean * math.exp(rng.gauss(0.0, self.spread))
+        elif self.kind == "exponential":
+            delay = rng.expovariate(1.0 / self.mean) if self.mean > 0 else 0.0
+        else:
+            delay = self.mean
+        return max(delay, 0.0)
+
+    def to_dict(self):
+        return {"kind": self.kind, "mean": self.mean, "spread": self.spread}
+
+
+class MockConfig:
+    """
+    Behaviour of the stand-in Firecrawl and OpenAI servers
+    """
+
+    def __init__(self, firecrawl_latency=None, job_time=None, document_chars=4000,
+                 documents_per_source=1, firecrawl_error_rate=0.0, openai_latency=None,
+                 completion_chars=2000, openai_error_rate=0.0, rate_limit_rate=0.0, seed=0,
+                 page_chrome=False, model_latency=None):
+        """
+        Args:
+            firecrawl_latency (Latency): Delay of every Firecrawl response
+            job_time (Latency): Time a research job stays "processing" after it starts
+            document_chars (int): Size of each crawled document
+            documents_per_source (int): Documents returned per requested source
+            firecrawl_error_rate (float): Fraction of Firecrawl requests answered with HTTP 500
+            openai_latency (Latency): Delay of every chat completion
+            completion_chars (int): Total size of each completion's section text
+            openai_error_rate (float): Fraction of completions answered with HTTP 500
+            rate_limit_rate (float): Fraction of requests to either server answered with HTTP 429
+            seed (int): Random seed for latencies, errors and generated content
+            page_chrome (bool): Wrap documents in navigation, cookie banner and footer
+                boilerplate, as real crawled pages are
+            model_latency (dict): Completion delay per model name, overriding openai_latency
+                (e.g. a faster distribution for a small model)
+        """
+        self.firecrawl_latency = firecrawl_latency or Latency("fixed", 0.02)
+        self.job_time = job_time or Latency("fixed", 0.5)
+        self.document_chars = document_chars
+        self.documents_per_source = documents_per_source
+        self.firecrawl_error_rate = firecrawl_error_rate
+        self.openai_latency = openai_latency or Latency("lognormal", 0.3, 0.4)
+        self.completion_chars = completion_chars
+        self.openai_error_rate = openai_error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.seed = seed
+        self.page_chrome = page_chrome
+        self.model_latency = model_latency or {}
+
+    def to_dict(self):
+        def convert(value):
+            if isinstance(value, dict):
+                return {key: convert(item) for key, item in value.items()}
+            return value.to_dict() if isinstance(value, Latency) else value
+        return {key: convert(value) for key, value in vars(self).items()}
+
+
+# Site boilerplate wrapped around documents when MockConfig.page_chrome is set
+PAGE_HEADER = """[Skip to content](#main)
+
+- [Home](/)
+- [Docs](/docs)
+- [Blog](/blog)
+- [Community](/community)
+- [Pricing](/pricing)
+
+We use cookies to improve your experience. [Accept all](#) [Manage preferences](#)
+"""
+
+PAGE_FOOTER = """[Edit this page on GitHub](https://github.com/example/site/edit/main/docs/index.md)
+
+- [Twitter](https://twitter.com/example)
+- [Discord](https://discord.gg/example)
+- [GitHub](https://github.com/example)
+- [Newsletter](/newsletter)
+
+© 2024 Example Labs. All rights reserved. [Privacy Policy](/privacy) · [Terms of Service](/terms)
+"""
+
+
+def generate_document(query, source, index, chars, page_chrome=False):
+    """
+    Produce deterministic filler text of a given size for one crawled document
+
+    Args:
+        query (str): Research query
+        source (str): Source domain
+        index (int): Document number within the source
+        chars (int): Approximate document length
+        page_chrome (bool): Add navigation, cookie banner and footer boilerplate
+
+    Returns:
+        str: Document content
+    """
+    rng = random.Random(zlib.crc32(f"{query}|{source}|{index}".encode()))
+    paragraphs = []
+    length = 0
+    while length < chars:
+        sentence_count = rng.randint(3, 6)
+        paragraph = " ".join(
+            " ".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 16))).capitalize() + "."
+            for _ in range(sentence_count)
+        )
+        paragraphs.append(paragraph)
+        length += len(paragraph) + 2
+    document = f"{query} on {source}.\n\n" + "\n\n".join(paragraphs)
+    if page_chrome:
+        document = f"{PAGE_HEADER}\n{document}\n\n{PAGE_FOOTER}"
+    return document
+
+
+class _MockState:
+    """Shared, lock-protected state and counters of the stand-in servers"""
+
+    def __init__(self, config):
+        self.config = config
+        self.lock = threading.Lock()
+        self.rng = random.Random(config.seed)
+        self.jobs = {}
+        self.next_job = 1
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.stats = {
+                "firecrawl_requests": 0,
+                "openai_requests": 0,
+                "injected_errors": 0,
+                "injected_rate_limits": 0,
+                "prompt_tokens": [],
+                "completion_tokens": []
+            }
+
+    def draw(self, latency):
+        with self.lock:
+            return latency.sample(self.rng)
+
+    def fault(self, error_rate):
+        """Pick the injected failure for a request: 429, 500 or None"""
+        with self.lock:
+            roll = self.rng.random()
+            if roll < self.config.rate_limit_rate:
+                self.stats["injected_rate_limits"] += 1
+                return 429
+            if roll < self.config.rate_limit_rate + error_rate:
+                self.stats["injected_errors"] += 1
+                return 500
+        return None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _send_fault(self, status):
+        if status == 429:
+            self._send_json({"error": "rate limited"}, 429, {"Retry-After": "0"})
+        else:
+            self._send_json({"error": "injected failure"}, 500)
+
+    def _control(self):
+        """Handle the /_stats and /_reset endpoints used by the benchmark harness"""
+        if self.path == "/_stats":
+            with self.state.lock:
+                self._send_json(self.state.stats)
+            return True
+        if self.path == "/_reset":
+            self.state.reset()
+            self._send_json({})
+            return True
+        return False
+
+
+class FirecrawlHandler(_Handler):
+    """Stand-in for the Firecrawl research endpoints"""
+
+    def do_POST(self):
+        if self._control():
+            return
+        payload = self._read_json()
+        if not self._begin():
+            return
+        if not self.path.endswith("/research/start"):
+            return self._send_json({"error": "not found"}, 404)
+
+        with self.state.lock:
+            job_id = str(self.state.next_job)
+            self.state.next_job += 1
+            self.state.jobs[job_id] = (time.monotonic() + self.state.config.job_time.sample(self.state.rng), payload)
+        self._send_json({"job_id": job_id})
+
+    def do_GET(self):
+        if self._control():
+            return
+        if not self._begin():
+            return
+        job_id = self.path.rsplit("/", 1)[-1]
+        with self.state.lock:
+            job = self.state.jobs.get(job_id)
+        if job is None:
+            return self._send_json({"error": "unknown job"}, 404)
+        ready_at, payload = job
+
+        if "/research/status/" in self.path:
+            status = "processing" if time.monotonic() < ready_at else "completed"
+            return self._send_json({"status": status})
+
+        if "/research/results/" in self.path:
+            config = self.state.config
+            query = payload.get("query", "")
+            raw_data = [
+                {
+                    "source": source,
+                    "url": f"https://{source}/research/{index}",
+                    "content": generate_document(query, source, index, config.document_chars, config.page_chrome)
+                }
+                for source in payload.get("sources", [])
+                for index in range(config.documents_per_source)
+            ]
+            return self._send_json({"status": "completed", "query": query,
+                                    "sources_crawled": payload.get("sources", []), "raw_data": raw_data})
+
+        self._send_json({"error": "not found"}, 404)
+
+    def _begin(self):
+        """Count the request, apply latency and maybe inject a failure; False if one was sent"""
+        with self.state.lock:
+            self.state.stats["firecrawl_requests"] += 1
+        time.sleep(self.state.draw(self.state.config.firecrawl_latency))
+        status = self.state.fault(self.state.config.firecrawl_error_rate)
+        if status:
+            self._send_fault(status)
+            return False
+        return True
+
+
+class OpenAIHandler(_Handler):
+    """Stand-in for the OpenAI chat completions endpoint (non-streaming and streaming)"""
+
+    def do_GET(self):
+        if not self._control():
+            self._send_json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        if self._control():
+            return
+        payload = self._read_json()
+        if not self.path.endswith("/chat/completions"):
+            return self._send_json({"error": "not found"}, 404)
+
+        config = self.state.config
+        with self.state.lock:
+            self.state.stats["openai_requests"] += 1
+        time.sleep(self.state.draw(config.model_latency.get(payload.get("model"), config.openai_latency)))
+        status = self.state.fault(config.openai_error_rate)
+        if status:
+            return self._send_fault(status)
+
+        messages = payload.get("messages", [])
+        prompt_tokens = estimate_tokens("".join(message.get("content") or "" for message in messages))
+        keys = _SCHEMA_KEY.findall(messages[0].get("content", "")) if messages else []
+        keys = keys or ["text"]
+        filler = ("Stand-in completion text. " * (config.completion_chars // 26 + 1))
+        content = json.dumps({key: filler[:max(config.completion_chars // len(keys), 1)] for key in keys})
+        completion_tokens = estimate_tokens(content)
+        with self.state.lock:
+            self.state.stats["prompt_tokens"].append(prompt_tokens)
+            self.state.stats["completion_tokens"].append(completion_tokens)
+
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        base = {"id": "chatcmpl-mock", "created": int(time.time()), "model": payload.get("model", "mock")}
+
+        if not payload.get("stream"):
+            return self._send_json({
+                **base,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                             "finish_reason": "stop"}],
+                "usage": usage
+            })
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for start in range(0, len(content), 64):
+            chunk = {**base, "object": "chat.completion.chunk",
+                     "choices": [{"index": 0, "delta": {"content": content[start:start + 64]},
+                                  "finish_reason": None}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        final = {**base, "object": "chat.completion.chunk",
+                 "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": usage}
+        self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode())
+        self.wfile.flush()
+        self.close_connection = True
+
+
+def serve(config, ready=None, host="127.0.0.1", firecrawl_port=0, openai_port=0):
+    """
+    Run both stand-in servers until the process is terminated
+
+    Args:
+        config (MockConfig): Server behaviour
+        ready (multiprocessing.Queue): Receives (firecrawl_port, openai_port) once listening
+        host (str): Interface to bind
+        firecrawl_port (int): Firecrawl stand-in port (0 picks a free port)
+        openai_port (int): OpenAI stand-in port (0 picks a free port)
+    """
+    state = _MockState(config)
+    servers = [
+        ThreadingHTTPServer((host, firecrawl_port), type("Firecrawl", (FirecrawlHandler,), {"state": state})),
+        ThreadingHTTPServer((host, openai_port), type("OpenAI", (OpenAIHandler,), {"state": state}))
+    ]
+    for server in servers:
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    if ready is not None:
+        ready.put(tuple(server.server_port for server in servers))
+    while True:
+        time.sleep(3600)
+
+
+class MockServers:
+    """
+    Stand-in Firecrawl and OpenAI servers running in a child process
+
+    A separate process keeps the servers' CPU time and memory out of the
+    measurements of the pipeline under test. Use as a context manager.
+    """
+
+    def __init__(self, config=None, host="127.0.0.1"):
+        """
+        Args:
+            config (MockConfig): Server behaviour; defaults to MockConfig()
+            host (str): Interface to bind
+        """
+        self.config = config or MockConfig()
+        self.host = host
+        self._process = None
+        self.firecrawl_port = None
+        self.openai_port = None
+
+    @property
+    def firecrawl_url(self):
+        """Base URL to use as FIRECRAWL_BASE_URL"""
+        return f"http://{self.host}:{self.firecrawl_port}/v1"
+
+    @property
+    def openai_url(self):
+        """Base URL to use as OPENAI_BASE_URL"""
+        return f"http://{self.host}:{self.openai_port}/v1"
+
+    def start(self):
+        ready = multiprocessing.Queue()
+        self._process = multiprocessing.Process(target=serve, args=(self.config, ready, self.host), daemon=True)
+        self._process.start()
+        self.firecrawl_port, self.openai_port = ready.get(timeout=30)
+        return self
+
+    def stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+
+    def stats(self):
+        """
+        Fetch request counts and prompt/completion token sizes seen since the last reset
+
+        Returns:
+            dict: Counters from the servers
+        """
+        return requests.get(f"http://{self.host}:{self.openai_port}/_stats", timeout=10).json()
+
+    def reset(self):
+        """Clear the counters"""
+        requests.post(f"http://{self.host}:{self.openai_port}/_reset", timeout=10)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main(argv=None):
+    """Run the stand-in servers in the foreground, e.g. to point the Streamlit app at them"""
+    parser = argparse.ArgumentParser(description="Local stand-in Firecrawl and OpenAI servers")
+    parser.add_argument("--firecrawl-port", type=int, default=8701)
+    parser.add_argument("--openai-port", type=int, default=8702)
+    parser.add_argument("--firecrawl-latency", default="0.02", help="kind:mean[:spread] in seconds")
+    parser.add_argument("--openai-latency", default="lognormal:0.3:0.4", help="kind:mean[:spread] in seconds")
+    parser.add_argument("--job-time", default="0.5", help="kind:mean[:spread] in seconds")
+    parser.add_argument("--document-chars", type=int, default=4000)
+    parser.add_argument("--page-chrome", action="store_true", help="Wrap documents in site boilerplate")
+    args = parser.parse_args(argv)
+
+    config = MockConfig(
+        firecrawl_latency=Latency.parse(args.firecrawl_latency),
+        openai_latency=Latency.parse(args.openai_latency),
+        job_time=Latency.parse(args.job_time),
+        document_chars=args.document_chars,
+        page_chrome=args.page_chrome
+    )
+    print(f"FIRECRAWL_BASE_URL=http://127.0.0.1:{args.firecrawl_port}/v1")
+    print(f"OPENAI_BASE_URL=http://127.0.0.1:{args.openai_port}/v1")
+    try:
+        serve(config, firecrawl_port=args.firecrawl_port, openai_port=args.openai_port)
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
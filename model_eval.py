@@ -0,0 +1,314 @@
+import os
+import re
+import sys
+import json
+import time
+import tempfile
+import argparse
+import contextlib
+from datetime import datetime, timezone
+import streaming
+from clients import registry
+from crawl_cache import get_default_cache
+from firecrawl_client import FirecrawlClient
+from blockchain_research import conduct_research_async
+from model_routing import POLICIES
+from openai_agent import ElaborationAgent
+from retrieval import tokenize
+from benchmark import summarize
+from mock_servers import Latency, MockConfig, MockServers
+
+DEFAULT_FIXTURES_DIR = "eval_fixtures"
+DEFAULT_RESULTS_DIR = "benchmark_results"
+
+# Fixture crawls never expire from the evaluation's private crawl cache
+FIXTURE_TTL = 10 * 365 * 24 * 3600
+
+
+def record_fixture(topic, depth=3, path=None):
+    """
+    Crawl a topic once and save the result as an evaluation fixture
+
+    Args:
+        topic (str): The blockchain research topic
+        depth (int): Research depth level (1-5)
+        path (str): Fixture file; defaults to eval_fixtures/<topic>-d<depth>.json
+
+    Returns:
+        str: Path written
+
+    Raises:
+        ValueError: If the crawl only returned simulated data
+    """
+    raw_data = registry.run_sync(FirecrawlClient(cache=False).explore_blockchain_topic_async(topic, depth=depth))
+    if raw_data.get("simulated"):
+        raise ValueError("Crawl returned simulated data; check FIRECRAWL_API_KEY and FIRECRAWL_BASE_URL")
+
+    if path is None:
+        slug = re.sub(r"[^a-z0-9]+", "-", topic.lower()).strip("-")
+        path = os.path.join(DEFAULT_FIXTURES_DIR, f"{slug}-d{depth}.json")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fixture = {"topic": topic, "depth": depth,
+               "raw_data": {key: value for key, value in raw_data.items() if key != "polling"}}
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(fixture, handle, indent=2)
+    return path
+
+
+def load_fixtures(paths):
+    """
+    Load fixtures from files and directories of *.json files
+
+    Args:
+        paths (list): Fixture files or directories
+
+    Returns:
+        list: Fixture dicts with "topic", "depth" and "raw_data"
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".json")))
+        else:
+            files.append(path)
+
+    fixtures = []
+    for file in files:
+        with open(file, encoding="utf-8") as handle:
+            fixture = json.load(handle)
+        if not fixture.get("topic") or not isinstance(fixture.get("raw_data"), dict):
+            raise ValueError(f"Not an evaluation fixture: {file}")
+        fixture.setdefault("depth", 3)
+        fixtures.append(fixture)
+    return fixtures
+
+
+@contextlib.contextmanager
+def fixture_environment(fixtures, openai_url=None):
+    """
+    Serve crawls from fixtures and send every completion to OpenAI, restoring the environment afterwards
+
+    The fixtures are stored in a private crawl cache so the unchanged pipeline
+    reads them instead of crawling. Must run in a fresh process, before anything
+    has opened the shared crawl cache.
+
+    Args:
+        fixtures (list): Fixtures from load_fixtures
+        openai_url (str): OpenAI-compatible endpoint, e.g. stand-in servers (default: OPENAI_BASE_URL)
+    """
+    directory = tempfile.mkdtemp(prefix="model-eval-")
+    overrides = {
+        "FIRECRAWL_API_KEY": os.getenv("FIRECRAWL_API_KEY") or "fixtures",
+        "FIRECRAWL_CACHE_PATH": os.path.join(directory, "crawl_cache.sqlite3"),
+        "FIRECRAWL_CACHE_TTL": str(FIXTURE_TTL),
+        "FIRECRAWL_CACHE_DISABLED": "",
+        # Every policy must reach the model, otherwise later policies measure the cache
+        "LLM_CACHE_DISABLED": "1",
+        "REPORT_ARCHIVE_DISABLED": "1"
+    }
+    if openai_url:
+        overrides.update(OPENAI_BASE_URL=openai_url, OPENAI_API_KEY="evaluation")
+    previous = {name: os.environ.get(name) for name in overrides}
+    os.environ.update(overrides)
+    try:
+        cache = get_default_cache()
+        if cache is None or cache.path != overrides["FIRECRAWL_CACHE_PATH"]:
+            raise RuntimeError("The crawl cache was opened before the evaluation; run it in a fresh process")
+        client = FirecrawlClient(cache=False)
+        for fixture in fixtures:
+            payload = client._build_payload(fixture["topic"], fixture["depth"])
+            cache.put(payload["query"], payload["depth"], payload["sources"], fixture["raw_data"])
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def _terms_overlap(first, second):
+    first_terms, second_terms = set(tokenize(first)), set(tokenize(second))
+    if not first_terms and not second_terms:
+        return 1.0
+    return len(first_terms & second_terms) / len(first_terms | second_terms)
+
+
+async def _evaluate_one(fixture, policy, options):
+    """Research one fixture topic under a routing policy"""
+    crawl = {}
+
+    def on_event(event):
+        if event["type"] == streaming.CRAWL_FINISHED:
+            crawl.update(event)
+
+    started = time.perf_counter()
+    try:
+        results = await conduct_research_async(fixture["topic"], depth=fixture["depth"], on_event=on_event,
+                                               routing=policy, **options)
+        error = None
+    except Exception as e:
+        results, error = {}, str(e)
+    trace = results.get("trace", {})
+    return {
+        "topic": fixture["topic"],
+        "seconds": time.perf_counter() - started,
+        "error": error,
+        "from_fixture": not crawl.get("simulated", True),
+        "prompt_tokens": trace.get("prompt_tokens", 0),
+        "completion_tokens": trace.get("completion_tokens", 0),
+        "cost_usd": trace.get("cost_usd", 0.0),
+        "models": {model: usage["calls"] for model, usage in trace.get("models", {}).items()},
+        "report": {section: results.get(section) for section in ElaborationAgent.REPORT_SECTIONS}
+    }
+
+
+def evaluate_policies(fixtures, policies, repeats=1, options=None):
+    """
+    Run every fixture under every routing policy and compare the reports
+
+    The first policy is the reference. Schema agreement is the share of report
+    sections that are non-empty text exactly when the reference's are; content
+    overlap is the mean term overlap (Jaccard) of each section with the
+    reference's, a rough signal of how much substance a cheaper policy keeps.
+
+    Args:
+        fixtures (list): Fixtures from load_fixtures (crawls must be served by fixture_environment)
+        policies (list): Routing policy names or rules files
+        repeats (int): Runs per fixture and policy
+        options (dict): Extra keyword arguments for conduct_research_async
+
+    Returns:
+        dict: Results document with per-policy latency, tokens, cost, model calls and agreement
+    """
+    options = options or {}
+    runs = {policy: [] for policy in policies}
+    for _ in range(repeats):
+        for fixture in fixtures:
+            for policy in policies:
+                runs[policy].append(registry.run_sync(_evaluate_one(fixture, policy, options)))
+
+    reference = runs[policies[0]]
+    summaries = {}
+    for policy in policies:
+        schema, overlap, valid = [], [], 0
+        for run, base in zip(runs[policy], reference):
+            filled = {section: isinstance(text, str) and bool(text.strip()) for section, text in run["report"].items()}
+            valid += all(filled.values())
+            for section, text in run["report"].items():
+                base_text = base["report"][section]
+                schema.append(filled[section] == (isinstance(base_text, str) and bool(base_text.strip())))
+                overlap.append(_terms_overlap(text or "", base_text or ""))
+
+        models = {}
+        for run in runs[policy]:
+            for model, calls in run["models"].items():
+                models[model] = models.get(model, 0) + calls
+        completed = [run for run in runs[policy] if run["error"] is None]
+        summaries[policy] = {
+            "runs": len(runs[policy]),
+            "errors": len(runs[policy]) - len(completed),
+            "not_from_fixture": sum(1 for run in runs[policy] if not run["from_fixture"]),
+            "latency": summarize([run["seconds"] for run in completed]),
+            "prompt_tokens": sum(run["prompt_tokens"] for run in runs[policy]),
+            "completion_tokens": sum(run["completion_tokens"] for run in runs[policy]),
+            "cost_usd": round(sum(run["cost_usd"] for run in runs[policy]), 6),
+            "model_calls": models,
+            "schema_valid": round(valid / len(runs[policy]), 3) if runs[policy] else 0.0,
+            "schema_agreement": round(sum(schema) / len(schema), 3) if schema else 0.0,
+            "content_overlap": round(sum(overlap) / len(overlap), 3) if overlap else 0.0,
+            "first_error": next((run["error"] for run in runs[policy] if run["error"]), None)
+        }
+
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "reference": policies[0],
+        "fixtures": [{"topic": fixture["topic"], "depth": fixture["depth"]} for fixture in fixtures],
+        "repeats": repeats,
+        "options": options,
+        "policies": summaries
+    }
+
+
+def format_evaluation(results):
+    """Render an evaluation results document as a table"""
+    lines = [f"{'policy':<12} {'p50':>8} {'p95':>8} {'prompt':>9} {'completion':>10} {'cost':>9} "
+             f"{'valid':>6} {'schema':>7} {'overlap':>8}  model calls"]
+    for policy, summary in results["policies"].items():
+        calls = ", ".join(f"{model}={count}" for model, count in sorted(summary["model_calls"].items()))
+        lines.append(
+            f"{policy:<12} {summary['latency']['p50']:>7.3f}s {summary['latency']['p95']:>7.3f}s "
+            f"{summary['prompt_tokens']:>9} {summary['completion_tokens']:>10} ${summary['cost_usd']:>8.4f} "
+            f"{summary['schema_valid']:>6.2f} {summary['schema_agreement']:>7.2f} "
+            f"{summary['content_overlap']:>8.2f}  {calls}"
+        )
+        if summary["errors"]:
+            lines.append(f"{'':<12} {summary['errors']} failed runs, first error: {summary['first_error']}")
+        if summary["not_from_fixture"]:
+            lines.append(f"{'':<12} {summary['not_from_fixture']} runs did not use their fixture crawl")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """Command-line entry point for recording fixtures and evaluating routing policies"""
+    parser = argparse.ArgumentParser(description="Compare model routing policies on recorded crawls")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="Crawl a topic and save it as a fixture")
+    record.add_argument("topic", help="Research topic")
+    record.add_argument("--depth", type=int, default=3, help="Research depth (1-5)")
+    record.add_argument("--out", help=f"Fixture file (default: {DEFAULT_FIXTURES_DIR}/<topic>-d<depth>.json)")
+
+    run = commands.add_parser("run", help="Evaluate routing policies on fixtures")
+    run.add_argument("fixtures", nargs="*", default=[DEFAULT_FIXTURES_DIR], help="Fixture files or directories")
+    run.add_argument("--policies", default="fixed,tiered,small",
+                     help="Comma-separated policies or rules files; the first is the reference")
+    run.add_argument("--repeats", type=int, default=1, help="Runs per fixture and policy")
+    run.add_argument("--analysis-mode", default="single", help="single, map_reduce or retrieval")
+    run.add_argument("--elaboration-mode", default="single", help="single or sections")
+    run.add_argument("--mock", action="store_true",
+                     help="Answer completions from local stand-in servers (latency and tokens only)")
+    run.add_argument("--openai-latency", default="lognormal:1.0:0.3", help="Stand-in latency of large models")
+    run.add_argument("--small-latency", default="lognormal:0.4:0.3", help="Stand-in latency of gpt-4o-mini")
+    run.add_argument("--out", help="Results file (default: benchmark_results/<timestamp>-routing.json)")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        print(f"Saved fixture to {record_fixture(args.topic, depth=args.depth, path=args.out)}")
+        return 0
+
+    policies = [policy.strip() for policy in args.policies.split(",") if policy.strip()]
+    for policy in policies:
+        if policy not in POLICIES and not os.path.isfile(policy):
+            parser.error(f"Unknown routing policy: {policy}")
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        parser.error("No fixtures found; record some with: python model_eval.py record \"<topic>\"")
+    options = {"analysis_mode": args.analysis_mode, "elaboration_mode": args.elaboration_mode}
+
+    with contextlib.ExitStack() as stack:
+        openai_url = None
+        if args.mock:
+            config = MockConfig(openai_latency=Latency.parse(args.openai_latency),
+                                model_latency={"gpt-4o-mini": Latency.parse(args.small_latency)})
+            openai_url = stack.enter_context(MockServers(config)).openai_url
+        stack.enter_context(fixture_environment(fixtures, openai_url))
+        results = evaluate_policies(fixtures, policies, repeats=args.repeats, options=options)
+
+    print(format_evaluation(results))
+    path = args.out or os.path.join(
+        DEFAULT_RESULTS_DIR, results["created"].replace(":", "").replace("-", "").replace("+0000", "") + "-routing.json"
+    )
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(results, handle, indent=2)
+    print(f"Saved results to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
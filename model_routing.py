@@ -0,0 +1,124 @@
+import os
+import json
+import threading
+
+# Pipeline stages a model is chosen for
+STAGES = (
+    "analysis",     # single-prompt initial analysis (single and retrieval modes)
+    "map",          # per-chunk extraction into the analysis schema (map-reduce, overlap)
+    "merge",        # combining partial analyses (map-reduce, overlap)
+    "refresh",      # folding changed sources into a stored analysis (incremental)
+    "elaboration",  # whole report in one completion
+    "section"       # one report section (sections mode); rules may target "section:<name>"
+)
+
+# Named routing policies: per stage (or "section:<name>", or "*" for any stage) a list
+# of tiers tried in order. A tier applies when the prompt is at most max_tokens long and
+# the research depth at most max_depth (either may be omitted); no matching tier means
+# the agent's default model.
+POLICIES = {
+    # Every call on the agents' default model
+    "fixed": {},
+    # Small model for mechanical extraction and small or shallow prompts
+    "tiered": {
+        "map": [{"model": "gpt-4o-mini"}],
+        "merge": [{"model": "gpt-4o-mini", "max_tokens": 6000, "max_depth": 3}],
+        "analysis": [{"model": "gpt-4o-mini", "max_tokens": 2500, "max_depth": 2}],
+        "section:references": [{"model": "gpt-4o-mini"}],
+        "section": [{"model": "gpt-4o-mini", "max_depth": 2}],
+        "elaboration": [{"model": "gpt-4o-mini", "max_depth": 1}]
+    },
+    # Every call on the small model
+    "small": {
+        "*": [{"model": "gpt-4o-mini"}]
+    }
+}
+
+_default_router = None
+_default_router_lock = threading.Lock()
+
+
+class ModelRouter:
+    """
+    Pick the model for each completion from its stage, section, prompt size and depth
+    """
+
+    def __init__(self, rules=None, name="custom"):
+        """
+        Args:
+            rules (dict): Tiers per stage, in the format of POLICIES values
+            name (str): Policy name, recorded in traces and reports
+        """
+        self.name = name
+        self.rules = rules or {}
+        for key in self.rules:
+            if key != "*" and key.split(":", 1)[0] not in STAGES:
+                raise ValueError(f"Unknown routing stage: {key}")
+
+    @classmethod
+    def from_policy(cls, policy):
+        """
+        Build a router from a policy name in POLICIES or a JSON file of rules
+
+        Args:
+            policy (str): Policy name, or path to a JSON file in the POLICIES format
+
+        Returns:
+            ModelRouter: The router
+        """
+        if policy in POLICIES:
+            return cls(POLICIES[policy], name=policy)
+        if os.path.isfile(policy):
+            with open(policy, encoding="utf-8") as handle:
+                rules = json.load(handle)
+            return cls(rules, name=os.path.splitext(os.path.basename(policy))[0])
+        raise ValueError(f"Unknown routing policy: {policy}")
+
+    def route(self, stage, input_tokens=0, depth=3, section=None):
+        """
+        Choose the model for one completion
+
+        Args:
+            stage (str): One of STAGES
+            input_tokens (int): Estimated prompt tokens (system message included)
+            depth (int): Research depth (1-5)
+            section (str): Report section, for the "section" stage
+
+        Returns:
+            str: Model name, or None for the agent's default model
+        """
+        keys = [f"{stage}:{section}"] if section else []
+        for key in keys + [stage, "*"]:
+            for tier in self.rules.get(key, ()):
+                if tier.get("max_tokens") is not None and input_tokens > tier["max_tokens"]:
+                    continue
+                if tier.get("max_depth") is not None and depth > tier["max_depth"]:
+                    continue
+                return tier["model"]
+            if key in self.rules:
+                # A stage's own rules take precedence over the "*" fallback
+                return None
+        return None
+
+
+def get_router(policy=None):
+    """
+    Return the router for a policy, or the process-wide default one
+
+    The default policy comes from MODEL_ROUTING_POLICY (a name in POLICIES or a
+    JSON rules file) and is "fixed" when unset.
+
+    Args:
+        policy (str): Policy name or rules file; None for the default policy
+
+    Returns:
+        ModelRouter: The router
+    """
+    global _default_router
+
+    if policy is not None:
+        return ModelRouter.from_policy(policy)
+    with _default_router_lock:
+        if _default_router is None:
+            _default_router = ModelRouter.from_policy(os.getenv("MODEL_ROUTING_POLICY", "fixed"))
+        return _default_router
@@ -1,21 +1,252 @@
 import os
 import json
-from openai import OpenAI
+import time
+import asyncio
+import logging
+from clients import registry
+import rate_limit
+import tracing
+from chunking import chunk_documents, estimate_tokens, iter_documents
+from retrieval import PassageIndex, build_section_context
+from llm_cache import LLMCache, get_default_llm_cache, usage_to_dict
+from model_routing import get_router
 
-class ResearchAgent:
+logger = logging.getLogger(__name__)
+
+class BaseAgent:
     """
-    Agent that uses OpenAI to synthesize raw blockchain research data
+    Shared OpenAI plumbing for the research agents: clients, model routing and response cache
     """
     
-    def __init__(self):
-        """Initialize the ResearchAgent with OpenAI API"""
-        self.api_key = os.getenv("OPENAI_API_KEY", "")
-        self.client = OpenAI(api_key=self.api_key)
+    def __init__(self, cache=None, router=None, api_key=None):
+        """
+        Initialize the agent with OpenAI API
+        
+        Args:
+            cache (LLMCache): Response cache to use; None selects the shared default
+                cache and False disables caching
+            router (ModelRouter): Picks the model per call; None selects the default
+                policy (MODEL_ROUTING_POLICY), which keeps every call on self.model
+            api_key (str): OpenAI API key; None reads OPENAI_API_KEY
+        """
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY", "")
         # The newest OpenAI model is "gpt-4o" which was released May 13, 2024.
         # Do not change this unless explicitly requested by the user
         self.model = "gpt-4o"
+        self.cache = get_default_llm_cache() if cache is None else (cache or None)
+        self.router = router or get_router()
+    
+    @property
+    def client(self):
+        """Pooled blocking OpenAI client shared with every other agent using this API key"""
+        return registry.openai_client(self.api_key)
+    
+    @property
+    def async_client(self):
+        """Pooled async OpenAI client bound to the running event loop"""
+        return registry.async_openai_client(self.api_key)
+    
+    def _complete(self, system_message, prompt, temperature, use_cache=True, stage=None, depth=3, section=None):
+        """
+        Run a JSON chat completion, serving identical requests from the cache
+        
+        Args:
+            system_message (str): System message for the model
+            prompt (str): User prompt
+            temperature (float): Sampling temperature
+            use_cache (bool): Set to False to bypass the response cache for this call
+            stage (str): Pipeline stage of the call, for model routing (see model_routing.STAGES)
+            depth (int): Research depth (1-5), for model routing
+            section (str): Report section written by the call, for model routing
+            
+        Returns:
+            dict: Parsed JSON response
+        """
+        model = self._select_model(stage, system_message, prompt, depth, section)
+        response_format = {"type": "json_object"}
+        cache_key = self._cache_lookup_key(model, system_message, prompt, temperature, response_format, use_cache)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                tracing.record_usage(model, cached.get("usage"), cached=True)
+                return json.loads(cached["content"])
+        
+        started = time.perf_counter()
+        
+        # Call OpenAI API
+        with tracing.span("openai.chat", kind="http", service="openai", model=model, stage=stage) as span:
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_message},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format=response_format,
+                temperature=temperature
+            )
+            span.set(status=200)
+        
+        return self._finish(model, response.choices[0].message.content, response.usage, cache_key,
+                            time.perf_counter() - started)
+    
+    async def _complete_async(self, system_message, prompt, temperature, use_cache=True, on_token=None,
+                              stage=None, depth=3, section=None):
+        """
+        Async variant of _complete, optionally streaming tokens as they are generated
+        
+        Args:
+            system_message (str): System message for the model
+            prompt (str): User prompt
+            temperature (float): Sampling temperature
+            use_cache (bool): Set to False to bypass the response cache for this call
+            on_token (callable): Called with each content delta; enables a streaming completion
+            stage (str): Pipeline stage of the call, for model routing (see model_routing.STAGES)
+            depth (int): Research depth (1-5), for model routing
+            section (str): Report section written by the call, for model routing
+            
+        Returns:
+            dict: Parsed JSON response
+        """
+        model = self._select_model(stage, system_message, prompt, depth, section)
+        response_format = {"type": "json_object"}
+        cache_key = self._cache_lookup_key(model, system_message, prompt, temperature, response_format, use_cache)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                tracing.record_usage(model, cached.get("usage"), cached=True)
+                if on_token is not None:
+                    on_token(cached["content"])
+                return json.loads(cached["content"])
+        
+        # Hold back if a batch runner has put this call under a rate limit
+        estimated_tokens = (estimate_tokens(system_message) + estimate_tokens(prompt)
+                            + rate_limit.DEFAULT_COMPLETION_ESTIMATE)
+        await rate_limit.acquire_openai(estimated_tokens)
+        
+        started = time.perf_counter()
+        request = dict(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_message},
+                {"role": "user", "content": prompt}
+            ],
+            response_format=response_format,
+            temperature=temperature
+        )
+        
+        if on_token is None:
+            with tracing.span("openai.chat", kind="http", service="openai", model=model, stage=stage) as span:
+                response = await self.async_client.chat.completions.create(**request)
+                span.set(status=200)
+            rate_limit.settle_openai(estimated_tokens, usage_to_dict(response.usage).get("total_tokens", 0))
+            return self._finish(model, response.choices[0].message.content, response.usage, cache_key,
+                                time.perf_counter() - started)
+        
+        # Stream the completion so callers can render partial output
+        with tracing.span("openai.chat", kind="http", service="openai", model=model, stage=stage,
+                          stream=True) as span:
+            stream = await self.async_client.chat.completions.create(
+                stream=True,
+                stream_options={"include_usage": True},
+                **request
+            )
+            parts = []
+            usage = None
+            async for chunk in stream:
+                if chunk.usage is not None:
+                    usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    delta = chunk.choices[0].delta.content
+                    if not parts:
+                        span.set(first_token=round(time.perf_counter() - started, 4))
+                    parts.append(delta)
+                    on_token(delta)
+            span.set(status=200)
+        
+        rate_limit.settle_openai(estimated_tokens, usage_to_dict(usage).get("total_tokens", 0))
+        return self._finish(model, "".join(parts), usage, cache_key, time.perf_counter() - started)
+    
+    def _select_model(self, stage, system_message, prompt, depth, section):
+        """Model for a call: the router's choice for its stage and size, else self.model"""
+        if stage is None:
+            return self.model
+        input_tokens = estimate_tokens(system_message) + estimate_tokens(prompt)
+        return self.router.route(stage, input_tokens, depth, section) or self.model
+    
+    def _cache_lookup_key(self, model, system_message, prompt, temperature, response_format, use_cache):
+        """Return the response cache key for a request, or None when the cache is not used"""
+        if not use_cache or self.cache is None:
+            return None
+        return LLMCache.make_key(model, system_message, prompt, temperature, response_format)
+    
+    def _finish(self, model, content, usage, cache_key, latency):
+        """Parse completion content and store it in the cache once it is known to be valid"""
+        tracing.record_usage(model, usage_to_dict(usage))
+        parsed = json.loads(content)
+        
+        if cache_key:
+            self.cache.set(cache_key, content, usage=usage_to_dict(usage), latency=latency)
+        
+        return parsed
+
+
+class ResearchAgent(BaseAgent):
+    """
+    Agent that uses OpenAI to synthesize raw blockchain research data
+    """
+    
+    # Keys of the initial analysis JSON produced by every analysis mode
+    ANALYSIS_SECTIONS = [
+        "technical_specs",
+        "adoption_metrics",
+        "tokenomics",
+        "roadmap",
+        "stakeholders",
+        "key_findings"
+    ]
     
-    def analyze(self, topic, raw_data, depth=3):
+    # System message for combining partial analyses in map-reduce mode
+    MERGE_SYSTEM_MESSAGE = """
+        You are a specialized blockchain research agent. You will receive several partial
+        analyses of the same research topic, each produced from a different slice of the
+        crawled data.
+        
+        Merge them into one coherent analysis. Combine complementary facts, remove
+        repetition, keep specific figures and sources, and note contradictions rather than
+        silently picking one side. Do not add information that is not in the partial analyses.
+        Structure your response as JSON with the following sections: 
+        {
+            "technical_specs": "...",
+            "adoption_metrics": "...",
+            "tokenomics": "...",
+            "roadmap": "...",
+            "stakeholders": "...",
+            "key_findings": "..."
+        }
+        """
+    
+    # System message for folding an analysis of new or changed sources into a previous one
+    REFRESH_SYSTEM_MESSAGE = """
+        You are a specialized blockchain research agent. You will receive a previous
+        analysis of a research topic and an analysis of sources that are new or have
+        changed since then.
+        
+        Update the previous analysis with the new findings. Where they conflict, prefer the
+        new findings as more recent, keep everything from the previous analysis that is not
+        superseded, and keep specific figures and sources. Do not add information that is
+        not in either analysis.
+        Structure your response as JSON with the following sections: 
+        {
+            "technical_specs": "...",
+            "adoption_metrics": "...",
+            "tokenomics": "...",
+            "roadmap": "...",
+            "stakeholders": "...",
+            "key_findings": "..."
+        }
+        """
+    
+    def analyze(self, topic, raw_data, depth=3, use_cache=True):
         """
         Analyze raw blockchain data to create initial research synthesis
         
@@ -23,6 +254,7 @@ class ResearchAgent:
             topic (str): The blockchain research topic
             raw_data (dict): Raw data from Firecrawl
             depth (int): Research depth (1-5)
+            use_cache (bool): Set to False to bypass the response cache
             
         Returns:
             dict: Initial analysis of the blockchain topic
@@ -30,16 +262,319 @@ class ResearchAgent:
         if not self.api_key:
             raise ValueError("OpenAI API key is required")
         
-        # Extract content from raw data
+        system_message, analysis_prompt = self._build_messages(topic, raw_data, depth)
+        
+        try:
+            # Call OpenAI API for analysis
+            return self._complete(system_message, analysis_prompt, temperature=0.1, use_cache=use_cache,
+                                  stage="analysis", depth=depth)
+            
+        except Exception as e:
+            raise Exception(f"Error analyzing blockchain data: {str(e)}") from e
+    
+    async def analyze_async(self, topic, raw_data, depth=3, use_cache=True, on_token=None):
+        """
+        Async variant of analyze that does not block the event loop
+        
+        Args:
+            topic (str): The blockchain research topic
+            raw_data (dict): Raw data from Firecrawl
+            depth (int): Research depth (1-5)
+            use_cache (bool): Set to False to bypass the response cache
+            on_token (callable): Called with each streamed content delta
+            
+        Returns:
+            dict: Initial analysis of the blockchain topic
+        """
+        if not self.api_key:
+            raise ValueError("OpenAI API key is required")
+        
+        system_message, analysis_prompt = self._build_messages(topic, raw_data, depth)
+        
+        try:
+            return await self._complete_async(system_message, analysis_prompt, temperature=0.1,
+                                             use_cache=use_cache, on_token=on_token,
+                                             stage="analysis", depth=depth)
+            
+        except Exception as e:
+            raise Exception(f"Error analyzing blockchain data: {str(e)}") from e
+    
+    async def analyze_map_reduce_async(self, topic, raw_data, depth=3, use_cache=True, on_token=None,
+                                       chunk_tokens=3000, concurrency=4, merge_fan_in=4):
+        """
+        Analyze all crawled content with a map-reduce over token-bounded chunks
+        
+        Instead of truncating the joined content, every chunk is analyzed into the
+        usual JSON schema concurrently (map), then partial analyses are merged in
+        groups of merge_fan_in until one remains (reduce). Latency grows with
+        chunks / concurrency rather than with the total input size.
+        
+        Args:
+            topic (str): The blockchain research topic
+            raw_data (dict): Raw data from Firecrawl
+            depth (int): Research depth (1-5)
+            use_cache (bool): Set to False to bypass the response cache
+            on_token (callable): Called with each streamed content delta of the final merge
+            chunk_tokens (int): Approximate token budget per chunk
+            concurrency (int): Maximum number of concurrent completions
+            merge_fan_in (int): Number of partial analyses combined by each merge
+            
+        Returns:
+            dict: Initial analysis of the blockchain topic
+        """
+        if not self.api_key:
+            raise ValueError("OpenAI API key is required")
+        
+        chunks = list(chunk_documents(iter_documents(raw_data), max_tokens=chunk_tokens))
+        if len(chunks) <= 1:
+            # Everything fits in one prompt: a plain analysis is cheaper than map-reduce
+            system_message, analysis_prompt = self._build_prompt(topic, chunks[0] if chunks else "", depth)
+            try:
+                return await self._complete_async(system_message, analysis_prompt, temperature=0.1,
+                                                 use_cache=use_cache, on_token=on_token,
+                                                 stage="analysis", depth=depth)
+            except Exception as e:
+                raise Exception(f"Error analyzing blockchain data: {str(e)}") from e
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        merge_fan_in = max(merge_fan_in, 2)
+        
+        async def run(stage, system_message, prompt, stream=None):
+            async with semaphore:
+                return await self._complete_async(system_message, prompt, temperature=0.1,
+                                                 use_cache=use_cache, on_token=stream,
+                                                 stage=stage, depth=depth)
+        
+        try:
+            # Map: analyze each chunk into the shared schema
+            partials = await asyncio.gather(*[
+                run("map", *self._build_prompt(topic, chunk, depth)) for chunk in chunks
+            ])
+            
+            # Reduce: merge partial analyses hierarchically
+            while len(partials) > 1:
+                groups = [partials[i:i + merge_fan_in] for i in range(0, len(partials), merge_fan_in)]
+                final_level = len(groups) == 1
+                partials = await asyncio.gather(*[
+                    run("merge", self.MERGE_SYSTEM_MESSAGE, self._build_merge_prompt(topic, group, depth),
+                        on_token if final_level else None)
+                    for group in groups
+                ])
+            
+            # Keep the schema stable even if a merge dropped an empty section
+            analysis = partials[0]
+            for section in self.ANALYSIS_SECTIONS:
+                analysis.setdefault(section, "")
+            return analysis
+            
+        except Exception as e:
+            raise Exception(f"Error analyzing blockchain data: {str(e)}") from e
+    
+    async def analyze_batches_async(self, topic, batches, depth=3, use_cache=True, on_token=None,
+                                    chunk_tokens=3000, concurrency=4, merge_fan_in=4):
+        """
+        Map-reduce analysis over documents that are still arriving
+        
+        Chunks of each batch are analyzed as soon as the batch arrives, and
+        finished partial analyses are merged in groups of merge_fan_in while
+        later batches are still being crawled. Only the last merges wait for the
+        final batch, so crawl tail latency overlaps with completions.
+        
+        Args:
+            topic (str): The blockchain research topic
+            batches: Async iterator of raw data dicts (see FirecrawlClient.iter_blockchain_topic_async)
+            depth (int): Research depth (1-5)
+            use_cache (bool): Set to False to bypass the response cache
+            on_token (callable): Called with each streamed content delta of the final completion
+            chunk_tokens (int): Approximate token budget per chunk
+            concurrency (int): Maximum number of concurrent completions
+            merge_fan_in (int): Number of partial analyses combined by each merge
+            
+        Returns:
+            dict: Initial analysis of the blockchain topic
+        """
+        if not self.api_key:
+            raise ValueError("OpenAI API key is required")
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        merge_fan_in = max(merge_fan_in, 2)
+        
+        async def run(stage, system_message, prompt, stream=None):
+            async with semaphore:
+                return await self._complete_async(system_message, prompt, temperature=0.1,
+                                                 use_cache=use_cache, on_token=stream,
+                                                 stage=stage, depth=depth)
+        
+        chunks = []
+        tasks = set()
+        
+        async def consume():
+            async for batch in batches:
+                for chunk in chunk_documents(iter_documents(batch), max_tokens=chunk_tokens):
+                    chunks.append(chunk)
+                    tasks.add(asyncio.ensure_future(run("map", *self._build_prompt(topic, chunk, depth))))
+        
+        producer = asyncio.ensure_future(consume())
+        partials = []
+        try:
+            # Analyze chunks as they arrive, merging finished partials while more are on the way
+            while True:
+                if producer.done():
+                    # Surfaces a failed crawl; a finished producer must leave the wait set,
+                    # otherwise every wait returns at once and the loop spins
+                    producer.result()
+                    if not tasks:
+                        break
+                    waiting = tasks
+                else:
+                    waiting = tasks | {producer}
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task is not producer:
+                        tasks.discard(task)
+                        partials.append(task.result())
+                while len(partials) >= merge_fan_in and (not producer.done() or tasks):
+                    group, partials = partials[:merge_fan_in], partials[merge_fan_in:]
+                    tasks.add(asyncio.ensure_future(
+                        run("merge", self.MERGE_SYSTEM_MESSAGE, self._build_merge_prompt(topic, group, depth))
+                    ))
+            
+            if not chunks:
+                system_message, analysis_prompt = self._build_prompt(topic, "", depth)
+                return await run("analysis", system_message, analysis_prompt, on_token)
+            
+            # Everything has arrived: finish the reduce as analyze_map_reduce_async does
+            while len(partials) > 1:
+                groups = [partials[i:i + merge_fan_in] for i in range(0, len(partials), merge_fan_in)]
+                final_level = len(groups) == 1
+                partials = await asyncio.gather(*[
+                    run("merge", self.MERGE_SYSTEM_MESSAGE, self._build_merge_prompt(topic, group, depth),
+                        on_token if final_level else None)
+                    for group in groups
+                ])
+            
+            analysis = partials[0]
+            for section in self.ANALYSIS_SECTIONS:
+                analysis.setdefault(section, "")
+            return analysis
+        
+        except Exception as e:
+            raise Exception(f"Error analyzing blockchain data: {str(e)}") from e
+        finally:
+            producer.cancel()
+            for task in tasks:
+                task.cancel()
+    
+    async def analyze_retrieval_async(self, topic, raw_data, depth=3, use_cache=True, on_token=None,
+                                      token_budget=3500):
+        """
+        Analyze the most relevant passages for each analysis section
+        
+        Crawled documents are indexed with BM25 and every section of the analysis
+        schema gets its own top-k slice of passages within a shared token budget,
+        instead of passing content in arrival order.
+        
+        Args:
+            topic (str): The blockchain research topic
+            raw_data (dict): Raw data from Firecrawl
+            depth (int): Research depth (1-5)
+            use_cache (bool): Set to False to bypass the response cache
+            on_token (callable): Called with each streamed content delta
+            token_budget (int): Approximate tokens of crawled content to include
+            
+        Returns:
+            dict: Initial analysis of the blockchain topic
+        """
+        if not self.api_key:
+            raise ValueError("OpenAI API key is required")
+        
+        # Index building is CPU-bound, keep it off the event loop
+        context = await asyncio.to_thread(
+            lambda: build_section_context(PassageIndex.from_raw_data(raw_data), topic,
+                                          self.ANALYSIS_SECTIONS, token_budget=token_budget)
+        )
+        system_message, analysis_prompt = self._build_prompt(topic, context, depth)
+        
+        try:
+            return await self._complete_async(system_message, analysis_prompt, temperature=0.1,
+                                             use_cache=use_cache, on_token=on_token,
+                                             stage="analysis", depth=depth)
+            
+        except Exception as e:
+            raise Exception(f"Error analyzing blockchain data: {str(e)}") from e
+    
+    async def refresh_analysis_async(self, topic, previous_analysis, update_analysis, depth=3,
+                                     use_cache=True, on_token=None):
+        """
+        Fold an analysis of new or changed sources into the analysis from a previous run
+        
+        Args:
+            topic (str): The blockchain research topic
+            previous_analysis (dict): Initial analysis stored by the previous run
+            update_analysis (dict): Analysis of only the new or changed documents
+            depth (int): Research depth (1-5)
+            use_cache (bool): Set to False to bypass the response cache
+            on_token (callable): Called with each streamed content delta
+            
+        Returns:
+            dict: Updated initial analysis of the blockchain topic
+        """
+        if not self.api_key:
+            raise ValueError("OpenAI API key is required")
+        
+        refresh_prompt = self._build_refresh_prompt(topic, previous_analysis, update_analysis, depth)
+        
+        try:
+            analysis = await self._complete_async(self.REFRESH_SYSTEM_MESSAGE, refresh_prompt, temperature=0.1,
+                                                  use_cache=use_cache, on_token=on_token,
+                                                  stage="refresh", depth=depth)
+            for section in self.ANALYSIS_SECTIONS:
+                analysis.setdefault(section, previous_analysis.get(section, ""))
+            return analysis
+            
+        except Exception as e:
+            raise Exception(f"Error analyzing blockchain data: {str(e)}") from e
+    
+    def _build_messages(self, topic, raw_data, depth, content_limit=15000):
+        """
+        Build the system message and analysis prompt for a research topic
+        
+        Args:
+            topic (str): The blockchain research topic
+            raw_data (dict): Raw data from Firecrawl
+            depth (int): Research depth (1-5)
+            content_limit (int): Maximum characters of crawled content to include
+            
+        Returns:
+            tuple: (system_message, analysis_prompt)
+        """
+        # Extract content from raw data, stopping once the limit is reached
         content_list = []
-        if "raw_data" in raw_data and isinstance(raw_data["raw_data"], list):
-            for item in raw_data["raw_data"]:
-                if "content" in item:
-                    content_list.append(item["content"])
+        collected = 0
+        for item in iter_documents(raw_data):
+            if collected >= content_limit:
+                break
+            content_list.append(item["content"])
+            collected += len(item["content"]) + 2
         
         # Join content with source information
         research_content = "\n\n".join(content_list)
         
+        # Limit content to avoid token limits
+        return self._build_prompt(topic, research_content[:content_limit], depth)
+    
+    def _build_prompt(self, topic, research_content, depth):
+        """
+        Build the system message and analysis prompt for a block of research content
+        
+        Args:
+            topic (str): The blockchain research topic
+            research_content (str): Crawled content to analyze
+            depth (int): Research depth (1-5)
+            
+        Returns:
+            tuple: (system_message, analysis_prompt)
+        """
         # Create system message for the research agent
         system_message = """
         You are a specialized blockchain research agent with expertise in cryptocurrency, 
@@ -74,47 +609,90 @@ class ResearchAgent:
         Research Depth: {depth}/5
         
         Raw Research Data:
-        {research_content[:15000]}  # Limit content to avoid token limits
+        {research_content}
         
         Based on this data, provide a detailed initial analysis following the structure specified.
         """
         
-        try:
-            # Call OpenAI API for analysis
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": analysis_prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            
-            # Parse the response
-            analysis_text = response.choices[0].message.content
-            analysis_json = json.loads(analysis_text)
+        return system_message, analysis_prompt
+    
+    def _build_merge_prompt(self, topic, partial_analyses, depth):
+        """
+        Build the prompt that merges several partial analyses into one
+        
+        Args:
+            topic (str): The blockchain research topic
+            partial_analyses (list): Partial analysis dicts produced from separate chunks
+            depth (int): Research depth (1-5)
             
-            return analysis_json
+        Returns:
+            str: Merge prompt
+        """
+        numbered = "\n\n".join(
+            f"Partial Analysis {index}:\n{json.dumps(partial, indent=2)}"
+            for index, partial in enumerate(partial_analyses, start=1)
+        )
+        
+        return f"""
+        Research Topic: {topic}
+        
+        Research Depth: {depth}/5
+        
+        {numbered}
+        
+        Merge these partial analyses into a single analysis following the structure specified.
+        """
+    
+    def _build_refresh_prompt(self, topic, previous_analysis, update_analysis, depth):
+        """
+        Build the prompt that updates a previous analysis with new findings
+        
+        Args:
+            topic (str): The blockchain research topic
+            previous_analysis (dict): Initial analysis stored by the previous run
+            update_analysis (dict): Analysis of only the new or changed documents
+            depth (int): Research depth (1-5)
             
-        except Exception as e:
-            raise Exception(f"Error analyzing blockchain data: {str(e)}")
+        Returns:
+            str: Refresh prompt
+        """
+        return f"""
+        Research Topic: {topic}
+        
+        Research Depth: {depth}/5
+        
+        Previous Analysis:
+        {json.dumps(previous_analysis, indent=2)}
+        
+        Analysis of New or Changed Sources:
+        {json.dumps(update_analysis, indent=2)}
+        
+        Update the previous analysis with the new findings following the structure specified.
+        """
 
 
-class ElaborationAgent:
+class ElaborationAgent(BaseAgent):
     """
     Agent that elaborates on initial blockchain research findings
     """
     
-    def __init__(self):
-        """Initialize the ElaborationAgent with OpenAI API"""
-        self.api_key = os.getenv("OPENAI_API_KEY", "")
-        self.client = OpenAI(api_key=self.api_key)
-        # The newest OpenAI model is "gpt-4o" which was released May 13, 2024.
-        # Do not change this unless explicitly requested by the user
-        self.model = "gpt-4o"
+    # Report sections in display order, with what each one should cover
+    REPORT_SECTIONS = {
+        "overview": "Executive summary of the research findings",
+        "technical_analysis": "Detailed explanation of technical aspects",
+        "market_adoption": "Analysis of market position, adoption metrics, and economic implications",
+        "regulatory": "Regulatory considerations and compliance frameworks",
+        "future_outlook": "Future potential and development paths",
+        "references": "Key sources and references (formatted as markdown links)"
+    }
     
-    def elaborate(self, topic, initial_analysis, depth=3):
+    # Default cap on concurrent section completions in section mode
+    SECTION_CONCURRENCY = 3
+    
+    # Completions per section before a missing or empty section fails the report
+    SECTION_ATTEMPTS = 2
+    
+    def elaborate(self, topic, initial_analysis, depth=3, use_cache=True):
         """
         Elaborate on initial findings to create comprehensive research report
         
@@ -122,6 +700,34 @@ class ElaborationAgent:
             topic (str): The blockchain research topic
             initial_analysis (dict): Initial analysis from ResearchAgent
             depth (int): Research depth (1-5)
+            use_cache (bool): Set to False to bypass the response cache
+            
+        Returns:
+            dict: Elaborated research results with different sections
+        """
+        if not self.api_key:
+            raise ValueError("OpenAI API key is required")
+        
+        system_message, elaboration_prompt = self._build_messages(topic, initial_analysis, depth)
+        
+        try:
+            # Call OpenAI API for elaboration
+            return self._complete(system_message, elaboration_prompt, temperature=0.2, use_cache=use_cache,
+                                  stage="elaboration", depth=depth)
+            
+        except Exception as e:
+            raise Exception(f"Error elaborating on blockchain research: {str(e)}") from e
+    
+    async def elaborate_async(self, topic, initial_analysis, depth=3, use_cache=True, on_token=None):
+        """
+        Async variant of elaborate that does not block the event loop
+        
+        Args:
+            topic (str): The blockchain research topic
+            initial_analysis (dict): Initial analysis from ResearchAgent
+            depth (int): Research depth (1-5)
+            use_cache (bool): Set to False to bypass the response cache
+            on_token (callable): Called with each streamed content delta
             
         Returns:
             dict: Elaborated research results with different sections
@@ -129,6 +735,228 @@ class ElaborationAgent:
         if not self.api_key:
             raise ValueError("OpenAI API key is required")
         
+        system_message, elaboration_prompt = self._build_messages(topic, initial_analysis, depth)
+        
+        try:
+            return await self._complete_async(system_message, elaboration_prompt, temperature=0.2,
+                                             use_cache=use_cache, on_token=on_token,
+                                             stage="elaboration", depth=depth)
+            
+        except Exception as e:
+            raise Exception(f"Error elaborating on blockchain research: {str(e)}") from e
+    
+    async def elaborate_sections_async(self, topic, initial_analysis, depth=3, use_cache=True,
+                                       on_section_token=None, concurrency=None, overview_last=True):
+        """
+        Elaborate each report section in its own concurrent completion
+        
+        A single completion generates all sections one token after another; here
+        every section is written by a separate, smaller call reading the shared
+        initial analysis, so the wait is roughly that of the longest section.
+        A completion that leaves its section out (e.g. under a different key) or
+        empty is logged and requested again, up to SECTION_ATTEMPTS times.
+        
+        Args:
+            topic (str): The blockchain research topic
+            initial_analysis (dict): Initial analysis from ResearchAgent
+            depth (int): Research depth (1-5)
+            use_cache (bool): Set to False to bypass the response cache
+            on_section_token (callable): Called as on_section_token(section, delta) while streaming
+            concurrency (int): Maximum concurrent section completions (default SECTION_CONCURRENCY)
+            overview_last (bool): Write the overview after, and from, the other sections
+            
+        Returns:
+            dict: Elaborated research results with different sections
+        """
+        if not self.api_key:
+            raise ValueError("OpenAI API key is required")
+        
+        semaphore = asyncio.Semaphore(concurrency or self.SECTION_CONCURRENCY)
+        
+        async def write_section(section, completed_sections=None):
+            system_message, prompt = self._build_section_messages(
+                topic, initial_analysis, depth, section, completed_sections
+            )
+            stream = None
+            if on_section_token is not None:
+                stream = lambda text: on_section_token(section, text)
+            for attempt in range(1, self.SECTION_ATTEMPTS + 1):
+                async with semaphore:
+                    # A retry bypasses the cache, which would hand back the same response
+                    result = await self._complete_async(system_message, prompt, temperature=0.2,
+                                                        use_cache=use_cache and attempt == 1,
+                                                        on_token=stream if attempt == 1 else None,
+                                                        stage="section", depth=depth, section=section)
+                content = result.get(section) if isinstance(result, dict) else None
+                if isinstance(content, str) and content.strip():
+                    return section, content
+                
+                keys = sorted(result) if isinstance(result, dict) else type(result).__name__
+                logger.warning("Section %r missing or empty in completion (attempt %d of %d, keys: %s)",
+                               section, attempt, self.SECTION_ATTEMPTS, keys)
+                tracing.metrics.inc("section_elaboration_misses_total", section=section)
+            raise ValueError(f"Section '{section}' was missing or empty after {self.SECTION_ATTEMPTS} attempts")
+        
+        try:
+            first_pass = [
+                section for section in self.REPORT_SECTIONS
+                if not (overview_last and section == "overview")
+            ]
+            report = dict(await asyncio.gather(*[write_section(section) for section in first_pass]))
+            
+            if overview_last:
+                section, overview = await write_section("overview", report)
+                report[section] = overview
+            
+        except Exception as e:
+            raise Exception(f"Error elaborating on blockchain research: {str(e)}") from e
+        
+        # Same shape as the single-completion report, in display order
+        report = {section: report[section] for section in self.REPORT_SECTIONS}
+        validate_report(report)
+        return report
+    
+    async def elaborate_comparison_async(self, topic, analyses, depth=3, use_cache=True, on_token=None):
+        """
+        Write one comparative report from the initial analyses of several entities
+        
+        Args:
+            topic (str): The comparison question, e.g. "Solana vs Sui parallel execution"
+            analyses (dict): Initial analysis from ResearchAgent per entity name
+            depth (int): Research depth (1-5)
+            use_cache (bool): Set to False to bypass the response cache
+            on_token (callable): Called with each streamed content delta
+            
+        Returns:
+            dict: Elaborated research results with the usual sections, each comparing the entities
+        """
+        if not self.api_key:
+            raise ValueError("OpenAI API key is required")
+        
+        system_message, comparison_prompt = self._build_comparison_messages(topic, analyses, depth)
+        
+        try:
+            report = await self._complete_async(system_message, comparison_prompt, temperature=0.2,
+                                                use_cache=use_cache, on_token=on_token,
+                                                stage="elaboration", depth=depth)
+        except Exception as e:
+            raise Exception(f"Error elaborating on blockchain research: {str(e)}") from e
+        
+        validate_report(report)
+        return report
+    
+    def _build_comparison_messages(self, topic, analyses, depth):
+        """
+        Build the system message and prompt for a comparative report
+        
+        Args:
+            topic (str): The comparison question
+            analyses (dict): Initial analysis per entity name
+            depth (int): Research depth (1-5)
+            
+        Returns:
+            tuple: (system_message, comparison_prompt)
+        """
+        system_message = """
+        You are a specialized blockchain elaboration agent with expertise in explaining complex
+        blockchain concepts, mechanisms, and implications. Your task is to take initial research
+        analyses of several blockchain protocols or projects and write one comparative report.
+        
+        Your comparison should:
+        1. Contrast the technical mechanisms side by side in clear, accessible terms
+        2. Point out where the entities make different trade-offs and why it matters
+        3. Compare adoption, market position and economics with specific figures where available
+        4. Compare regulatory exposure and future development paths
+        5. Stay balanced, and say so when the analyses lack data for a fair comparison
+        
+        Structure your response as JSON with the following sections:
+        {
+            "overview": "Executive summary of the comparison, including a markdown table of key differences",
+            "technical_analysis": "Side-by-side comparison of technical aspects",
+            "market_adoption": "Comparison of market position, adoption metrics, and economic implications",
+            "regulatory": "Comparison of regulatory considerations and compliance frameworks",
+            "future_outlook": "Comparison of future potential and development paths",
+            "references": "Key sources and references for each entity (formatted as markdown links)"
+        }
+        
+        Each section should be comprehensive and formatted in markdown for readability.
+        """
+        
+        analyses_str = "\n\n".join(
+            f"Initial Analysis of {entity}:\n{json.dumps(analysis, indent=2)}" for entity, analysis in analyses.items()
+        )
+        comparison_prompt = f"""
+        Comparison Topic: {topic}
+        
+        Entities Compared: {", ".join(analyses)}
+        
+        Research Depth: {depth}/5
+        
+        {analyses_str}
+        
+        Please compare these entities in a single comprehensive blockchain research report
+        following the structure specified. Focus on the differences that matter for the topic.
+        """
+        
+        return system_message, comparison_prompt
+    
+    def _build_section_messages(self, topic, initial_analysis, depth, section, completed_sections=None):
+        """
+        Build the system message and prompt for a single report section
+        
+        Args:
+            topic (str): The blockchain research topic
+            initial_analysis (dict): Initial analysis from ResearchAgent
+            depth (int): Research depth (1-5)
+            section (str): Key from REPORT_SECTIONS
+            completed_sections (dict): Already written sections to summarize (for the overview)
+            
+        Returns:
+            tuple: (system_message, section_prompt)
+        """
+        system_message = f"""
+        You are a specialized blockchain elaboration agent with expertise in explaining complex
+        blockchain concepts, mechanisms, and implications. You are writing one section of a
+        comprehensive blockchain research report; other sections are written separately.
+        
+        Write only this section: {self.REPORT_SECTIONS[section]}.
+        Explain mechanisms in clear, accessible terms, include relevant comparisons and
+        implications, and stay within the scope of this section.
+        
+        Structure your response as JSON with a single key:
+        {{
+            "{section}": "..."
+        }}
+        
+        The section should be comprehensive and formatted in markdown for readability.
+        """
+        
+        _, section_prompt = self._build_messages(topic, initial_analysis, depth)
+        if completed_sections:
+            written = "\n\n".join(
+                f"## {key}\n{value}" for key, value in completed_sections.items()
+            )
+            section_prompt += f"""
+        Report Sections Already Written:
+        {written}
+        
+        Summarize the report above into the requested section.
+        """
+        
+        return system_message, section_prompt
+    
+    def _build_messages(self, topic, initial_analysis, depth):
+        """
+        Build the system message and elaboration prompt for a research topic
+        
+        Args:
+            topic (str): The blockchain research topic
+            initial_analysis (dict): Initial analysis from ResearchAgent
+            depth (int): Research depth (1-5)
+            
+        Returns:
+            tuple: (system_message, elaboration_prompt)
+        """
         # Convert initial analysis to string format for the prompt
         initial_analysis_str = json.dumps(initial_analysis, indent=2)
         
@@ -172,23 +1000,19 @@ class ElaborationAgent:
         following the structure specified. Focus on depth, clarity, and actionable insights.
         """
         
-        try:
-            # Call OpenAI API for elaboration
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": elaboration_prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.2
-            )
-            
-            # Parse the response
-            elaboration_text = response.choices[0].message.content
-            elaboration_json = json.loads(elaboration_text)
-            
-            return elaboration_json
-            
-        except Exception as e:
-            raise Exception(f"Error elaborating on blockchain research: {str(e)}")
+        return system_message, elaboration_prompt
+
+
+def validate_report(report):
+    """
+    Check that a report has the shape conduct_research returns
+    
+    Args:
+        report (dict): Elaborated research results
+        
+    Raises:
+        ValueError: If a section is missing or is not a string
+    """
+    for section in ElaborationAgent.REPORT_SECTIONS:
+        if not isinstance(report.get(section), str):
+            raise ValueError(f"Research report section '{section}' is missing or not text")
@@ -0,0 +1,153 @@
+import time
+import random
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header into a delay in seconds
+
+    Args:
+        value (str): Header value, either delta-seconds or an HTTP date
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class PollingStrategy:
+    """
+    Configurable schedule for polling long-running Firecrawl jobs
+
+    The first status check happens after a short first_delay; later checks back
+    off exponentially from base_delay up to max_delay with random jitter. A
+    server-supplied Retry-After always takes precedence, and no poll is
+    scheduled past the overall deadline: a backoff step that would overshoot it
+    is shortened so the last check lands on the deadline.
+    """
+
+    def __init__(self, first_delay=0.25, base_delay=1.0, multiplier=2.0, max_delay=8.0,
+                 jitter=0.2, deadline=60.0):
+        """
+        Args:
+            first_delay (float): Seconds before the first status check
+            base_delay (float): Delay before the second status check
+            multiplier (float): Growth factor applied to each following delay
+            max_delay (float): Upper bound for a single backoff delay
+            jitter (float): Fraction of each delay randomized (+/-) to spread load
+            deadline (float): Wall-clock budget in seconds for the whole job
+        """
+        self.first_delay = first_delay
+        self.base_delay = base_delay
+        self.multiplier = multiplier
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.deadline = deadline
+
+    def backoff(self, attempt):
+        """
+        Compute the delay before a status check
+
+        Args:
+            attempt (int): Zero-based index of the status check
+
+        Returns:
+            float: Delay in seconds, including jitter
+        """
+        if attempt == 0:
+            delay = self.first_delay
+        else:
+            delay = min(self.base_delay * (self.multiplier ** (attempt - 1)), self.max_delay)
+        if self.jitter:
+            delay *= 1 + random.uniform(-self.jitter, self.jitter)
+        return max(delay, 0.0)
+
+    def start(self):
+        """
+        Begin timing a new job
+
+        Returns:
+            PollTimer: Tracks the deadline and the split between waiting and working
+        """
+        return PollTimer(self)
+
+
+class PollTimer:
+    """
+    Per-job polling state: deadline tracking and wait/work time accounting
+    """
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+        self.started = time.monotonic()
+        self.attempts = 0
+        self.waited = 0.0
+        self.worked = 0.0
+
+    def remaining(self):
+        """Seconds left before the job deadline"""
+        return self.strategy.deadline - (time.monotonic() - self.started)
+
+    def next_delay(self, retry_after=None):
+        """
+        Delay before the next status check
+
+        Args:
+            retry_after (float): Server-requested delay from a Retry-After header
+
+        Returns:
+            float: Seconds to wait, or None if the deadline has passed or the server asks
+                to wait beyond it
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            return None
+
+        if retry_after is not None:
+            if retry_after >= remaining:
+                return None
+            delay = retry_after
+        else:
+            # Time is left, so poll once more at the deadline rather than giving up early
+            delay = min(self.strategy.backoff(self.attempts), remaining)
+
+        self.attempts += 1
+        return delay
+
+    def record_wait(self, seconds):
+        """Account for time spent sleeping between polls"""
+        self.waited += seconds
+
+    @contextmanager
+    def working(self):
+        """Context manager that accounts the enclosed block as time spent on HTTP work"""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.worked += time.monotonic() - started
+
+    def report(self):
+        """
+        Summarize how the job's wall-clock time was spent
+
+        Returns:
+            dict: Poll count, seconds waiting, seconds working and total elapsed
+        """
+        return {
+            "polls": self.attempts,
+            "waited": round(self.waited, 3),
+            "worked": round(self.worked, 3),
+            "elapsed": round(time.monotonic() - self.started, 3)
+        }
@@ -0,0 +1,208 @@
+import os
+import sys
+import time
+import asyncio
+import argparse
+import threading
+from collections import deque
+from crawl_cache import normalize_topic
+from clients import registry
+from firecrawl_client import FirecrawlClient
+from blockchain_research import conduct_research_async
+from batch_research import load_topics
+
+_default_prefetcher = None
+_default_prefetcher_lock = threading.Lock()
+
+
+class Prefetcher:
+    """
+    Warm the caches for popular topics before anyone asks for them
+
+    Warm-up runs the full research pipeline for a list of topics, filling the
+    crawl cache, the LLM response cache and the report archive, either once or
+    on a schedule. Speculative prefetch starts only the crawl for a topic that
+    is likely to be requested next (e.g. one just picked in the app).
+
+    Both are bounded: at most max_concurrent warm-up jobs or speculative crawls
+    run at once, a warm-up round stops starting topics once its estimated
+    OpenAI spend reaches budget_usd, and at most max_crawls_per_hour
+    speculative crawls are started. Speculative requests over a limit are
+    dropped rather than queued.
+    """
+
+    def __init__(self, max_concurrent=None, budget_usd=None, max_crawls_per_hour=None, recent_seconds=3600):
+        """
+        Args:
+            max_concurrent (int): Warm-up jobs, and separately speculative crawls, running at
+                once (PREFETCH_MAX_CONCURRENT, default 2)
+            budget_usd (float): Estimated OpenAI spend allowed per warm-up round
+                (PREFETCH_BUDGET_USD, default 1.0); needs tracing, which reports the cost
+            max_crawls_per_hour (int): Speculative crawls started per rolling hour
+                (PREFETCH_MAX_CRAWLS_PER_HOUR, default 20)
+            recent_seconds (float): Don't prefetch a topic again within this many seconds
+        """
+        self.max_concurrent = max_concurrent or int(os.getenv("PREFETCH_MAX_CONCURRENT", 2))
+        self.budget_usd = budget_usd if budget_usd is not None else float(os.getenv("PREFETCH_BUDGET_USD", 1.0))
+        self.max_crawls_per_hour = max_crawls_per_hour or int(os.getenv("PREFETCH_MAX_CRAWLS_PER_HOUR", 20))
+        self.recent_seconds = recent_seconds
+        self.spent_usd = 0.0
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self._crawls = {}
+        self._crawl_times = deque()
+        self._recent = {}
+        self._schedule = None
+        self._lock = threading.Lock()
+
+    def prefetch_crawl(self, topic, depth=3, api_key=None):
+        """
+        Start crawling a topic in the background so a research job can reuse the result
+
+        The crawl lands in the crawl cache, and a research job that starts while it
+        is still running joins it instead of crawling again. Returns immediately.
+
+        Args:
+            topic (str): The blockchain research topic
+            depth (int): Research depth level (1-5)
+            api_key (str): Firecrawl API key to crawl with; None reads FIRECRAWL_API_KEY
+
+        Returns:
+            bool: True if a crawl was started, False if it was recent, already running or over a limit
+        """
+        key = f"{normalize_topic(topic)}|{int(depth)}"
+        now = time.time()
+        with self._lock:
+            if key in self._crawls or now - self._recent.get(key, 0.0) < self.recent_seconds:
+                return False
+            while self._crawl_times and now - self._crawl_times[0] > 3600:
+                self._crawl_times.popleft()
+            if len(self._crawls) >= self.max_concurrent or len(self._crawl_times) >= self.max_crawls_per_hour:
+                return False
+
+            self._crawl_times.append(now)
+            self._crawls[key] = registry.submit(self._crawl(key, topic, depth, api_key))
+        return True
+
+    async def _crawl(self, key, topic, depth, api_key):
+        try:
+            await FirecrawlClient(api_key=api_key).explore_blockchain_topic_async(topic, depth=depth)
+        finally:
+            with self._lock:
+                self._crawls.pop(key, None)
+                self._recent[key] = time.time()
+
+    async def warm_async(self, topics, depth=3, **research_options):
+        """
+        Research every topic once so later requests are served from the caches
+
+        Args:
+            topics (list): Topic strings, or dicts with "topic" and "depth"
+            depth (int): Depth for topics given as strings
+            **research_options: Extra keyword arguments for conduct_research_async
+
+        Returns:
+            list: One dict per topic with "topic", "depth", "status" ("ok", "error" or
+                "skipped" once the budget is used up), "seconds" and "cost_usd"
+        """
+        self.spent_usd = 0.0
+        jobs = [job if isinstance(job, dict) else {"topic": job, "depth": depth} for job in topics]
+        return await asyncio.gather(*(self._warm_one(job, research_options) for job in jobs))
+
+    async def _warm_one(self, job, research_options):
+        record = {"topic": job["topic"], "depth": job["depth"], "status": "skipped", "seconds": 0.0, "cost_usd": 0.0}
+        async with self._semaphore:
+            # Checked before starting, so a round overshoots by at most the topics already running
+            if self.spent_usd >= self.budget_usd:
+                return record
+
+            started = time.perf_counter()
+            try:
+                results = await conduct_research_async(job["topic"], depth=job["depth"], **research_options)
+            except Exception as e:
+                record.update(status="error", error=str(e))
+            else:
+                record.update(status="ok", cost_usd=results.get("trace", {}).get("cost_usd", 0.0))
+                self.spent_usd += record["cost_usd"]
+            record["seconds"] = round(time.perf_counter() - started, 3)
+        return record
+
+    def warm(self, topics, depth=3, **research_options):
+        """
+        Blocking wrapper around warm_async
+
+        Returns:
+            list: Per-topic records (see warm_async)
+        """
+        return registry.run_sync(self.warm_async(topics, depth=depth, **research_options))
+
+    def start(self, topics, depth=3, interval=None, **research_options):
+        """
+        Warm the topics in the background, once or every interval seconds
+
+        Args:
+            topics (list): Topic strings, or dicts with "topic" and "depth"
+            depth (int): Depth for topics given as strings
+            interval (float): Seconds between warm-up rounds; None for a single round
+            **research_options: Extra keyword arguments for conduct_research_async
+
+        Returns:
+            concurrent.futures.Future: The warm-up schedule, cancelled by stop()
+        """
+        with self._lock:
+            if self._schedule is None or self._schedule.done():
+                self._schedule = registry.submit(self._run_schedule(topics, depth, interval, research_options))
+            return self._schedule
+
+    async def _run_schedule(self, topics, depth, interval, research_options):
+        while True:
+            await self.warm_async(topics, depth=depth, **research_options)
+            if not interval:
+                return
+            await asyncio.sleep(interval)
+
+    def stop(self):
+        """Cancel the warm-up schedule"""
+        with self._lock:
+            if self._schedule is not None:
+                self._schedule.cancel()
+
+
+def get_default_prefetcher():
+    """
+    Return the process-wide prefetcher, configured from the PREFETCH_* environment variables
+
+    Returns:
+        Prefetcher: The shared prefetcher
+    """
+    global _default_prefetcher
+
+    with _default_prefetcher_lock:
+        if _default_prefetcher is None:
+            _default_prefetcher = Prefetcher()
+        return _default_prefetcher
+
+
+def main(argv=None):
+    """Command-line entry point for warming the caches"""
+    parser = argparse.ArgumentParser(description="Pre-crawl and pre-analyze blockchain research topics")
+    parser.add_argument("topics", help="Text file with one topic per line, or JSONL with topic/depth")
+    parser.add_argument("--depth", type=int, default=3, help="Research depth for topics without one")
+    parser.add_argument("--interval", type=float, default=None, help="Repeat every this many seconds")
+    parser.add_argument("--max-concurrent", type=int, default=None, help="Topics researched at once")
+    parser.add_argument("--budget-usd", type=float, default=None, help="Estimated OpenAI spend per round")
+    args = parser.parse_args(argv)
+
+    prefetcher = Prefetcher(max_concurrent=args.max_concurrent, budget_usd=args.budget_usd)
+    topics = load_topics(args.topics, default_depth=args.depth)
+    while True:
+        for record in prefetcher.warm(topics):
+            print(f"{record['status']:>7}  {record['seconds']:>7.1f}s  ${record['cost_usd']:.4f}  "
+                  f"{record['topic']} (depth {record['depth']})")
+        print(f"Estimated spend: ${prefetcher.spent_usd:.4f} of ${prefetcher.budget_usd:.2f}")
+        if not args.interval:
+            return 0
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
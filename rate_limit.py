@@ -0,0 +1,162 @@
+import time
+import asyncio
+import contextvars
+
+# Rough completion size reserved up front for an OpenAI call; corrected once usage is known
+DEFAULT_COMPLETION_ESTIMATE = 1500
+
+_current_limits = contextvars.ContextVar("rate_limits", default=None)
+
+
+class TokenBucket:
+    """
+    Async token bucket: at most `rate` units per second with bursts up to `capacity`
+    """
+
+    def __init__(self, rate, capacity=None):
+        """
+        Args:
+            rate (float): Units replenished per second
+            capacity (float): Maximum burst size; defaults to one second's worth (at least 1)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.waited = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount=1):
+        """
+        Wait until `amount` units are available and consume them
+
+        Requests larger than the capacity are clamped so they can still proceed.
+
+        Args:
+            amount (float): Units to consume
+        """
+        amount = min(amount, self.capacity)
+        # Waiters queue on the lock so the bucket is served first-come, first-served
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                delay = (amount - self.tokens) / self.rate
+                self.waited += delay
+                await asyncio.sleep(delay)
+
+    def debit(self, amount):
+        """
+        Consume units after the fact, e.g. when actual usage exceeded the estimate
+
+        The balance may go negative, which delays the next acquire accordingly.
+
+        Args:
+            amount (float): Units to consume
+        """
+        self._refill()
+        self.tokens -= amount
+
+
+class RateLimits:
+    """
+    Separate budgets for Firecrawl requests and OpenAI requests and tokens
+    """
+
+    def __init__(self, firecrawl_rps=None, openai_rpm=None, openai_tpm=None):
+        """
+        Args:
+            firecrawl_rps (float): Firecrawl HTTP requests per second (None for unlimited)
+            openai_rpm (float): OpenAI requests per minute (None for unlimited)
+            openai_tpm (float): OpenAI tokens per minute (None for unlimited)
+        """
+        self.firecrawl = TokenBucket(firecrawl_rps) if firecrawl_rps else None
+        # Per-minute budgets refill continuously; token bursts are capped at 10 seconds' worth
+        self.openai_requests = TokenBucket(openai_rpm / 60.0) if openai_rpm else None
+        self.openai_tokens = TokenBucket(openai_tpm / 60.0, capacity=openai_tpm / 6.0) if openai_tpm else None
+
+    def stats(self):
+        """
+        Report how long callers were held back by each limiter
+
+        Returns:
+            dict: Seconds waited per limiter
+        """
+        return {
+            name: round(bucket.waited, 3)
+            for name, bucket in (
+                ("firecrawl", self.firecrawl),
+                ("openai_requests", self.openai_requests),
+                ("openai_tokens", self.openai_tokens)
+            )
+            if bucket is not None
+        }
+
+
+def use_limits(limits):
+    """
+    Apply rate limits to every Firecrawl and OpenAI call made in the current context
+
+    Tasks started afterwards inherit the limits, so a batch runner can set them
+    once and every research job it spawns shares the same budgets.
+
+    Args:
+        limits (RateLimits): Limits to apply, or None to remove them
+
+    Returns:
+        contextvars.Token: Token for resetting the previous limits
+    """
+    return _current_limits.set(limits)
+
+
+def reset_limits(token):
+    """
+    Restore the rate limits that were active before use_limits
+
+    Args:
+        token (contextvars.Token): Token returned by use_limits
+    """
+    _current_limits.reset(token)
+
+
+async def acquire_firecrawl():
+    """Wait for the Firecrawl request budget, if limits are active"""
+    limits = _current_limits.get()
+    if limits is not None and limits.firecrawl is not None:
+        await limits.firecrawl.acquire()
+
+
+async def acquire_openai(estimated_tokens):
+    """
+    Wait for the OpenAI request and token budgets, if limits are active
+
+    Args:
+        estimated_tokens (int): Prompt tokens plus expected completion tokens
+    """
+    limits = _current_limits.get()
+    if limits is None:
+        return
+    if limits.openai_requests is not None:
+        await limits.openai_requests.acquire()
+    if limits.openai_tokens is not None:
+        await limits.openai_tokens.acquire(estimated_tokens)
+
+
+def settle_openai(estimated_tokens, actual_tokens):
+    """
+    Charge the token budget for usage beyond what was reserved
+
+    Args:
+        estimated_tokens (int): Tokens reserved by acquire_openai
+        actual_tokens (int): Tokens reported in the response usage
+    """
+    limits = _current_limits.get()
+    if limits is not None and limits.openai_tokens is not None and actual_tokens > estimated_tokens:
+        limits.openai_tokens.debit(actual_tokens - estimated_tokens)
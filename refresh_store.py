@@ -0,0 +1,181 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from crawl_cache import normalize_topic
+from chunking import estimate_tokens, iter_documents
+
+DEFAULT_STORE_PATH = os.path.join(".cache", "refresh_state.sqlite3")
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def document_key(document):
+    """Stable identity of a crawled document across runs: its URL, else its source"""
+    return document.get("url") or document.get("source") or ""
+
+
+def fingerprint_document(document):
+    """
+    Record what is needed to tell whether a document changed since the last run
+
+    Args:
+        document (dict): Crawled document with "content" and optional HTTP metadata
+
+    Returns:
+        dict: Content hash plus ETag / Last-Modified validators when Firecrawl provides them
+    """
+    metadata = document.get("metadata") or {}
+    return {
+        "hash": hashlib.sha256(document["content"].encode()).hexdigest(),
+        "etag": document.get("etag") or metadata.get("etag"),
+        "last_modified": document.get("last_modified") or metadata.get("lastModified")
+    }
+
+
+def _unchanged(previous, current):
+    """Compare fingerprints, trusting matching HTTP validators before content hashes"""
+    if previous is None:
+        return False
+    if current["etag"] and previous.get("etag"):
+        return current["etag"] == previous["etag"]
+    if current["last_modified"] and previous.get("last_modified"):
+        return current["last_modified"] == previous["last_modified"] and current["hash"] == previous["hash"]
+    return current["hash"] == previous["hash"]
+
+
+def diff_documents(previous_documents, raw_data):
+    """
+    Split a fresh crawl into documents that are new or changed and those that are not
+
+    Args:
+        previous_documents (dict): Document key -> fingerprint from the previous run
+        raw_data (dict): Raw data from Firecrawl for this run
+
+    Returns:
+        tuple: (raw data holding only new/changed documents, fingerprints of every
+            current document, report with document counts and tokens skipped)
+    """
+    changed = []
+    fingerprints = {}
+    report = {"new": 0, "changed": 0, "unchanged": 0, "removed": 0, "tokens_skipped": 0}
+
+    for document in iter_documents(raw_data):
+        key = document_key(document)
+        fingerprint = fingerprint_document(document)
+        fingerprints[key] = fingerprint
+        previous = previous_documents.get(key)
+
+        if _unchanged(previous, fingerprint):
+            report["unchanged"] += 1
+            report["tokens_skipped"] += estimate_tokens(document["content"])
+        else:
+            report["new" if previous is None else "changed"] += 1
+            changed.append(document)
+
+    report["removed"] = len(set(previous_documents) - set(fingerprints))
+
+    delta = dict(raw_data)
+    delta["raw_data"] = changed
+    return delta, fingerprints, report
+
+
+class RefreshStore:
+    """
+    SQLite store of the last run of each topic for incremental refreshes
+
+    For every (normalized topic, depth) it keeps the per-document fingerprints,
+    the initial analysis and the final report of the most recent run.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        """
+        Args:
+            path (str): SQLite database file, or ":memory:"
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if path != ":memory:" and directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS refresh_state (
+                topic TEXT NOT NULL,
+                depth INTEGER NOT NULL,
+                documents TEXT NOT NULL,
+                initial_analysis TEXT NOT NULL,
+                results TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (topic, depth)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, topic, depth):
+        """
+        Load the previous run of a topic
+
+        Args:
+            topic (str): The blockchain research topic
+            depth (int): Research depth level (1-5)
+
+        Returns:
+            dict: "documents", "initial_analysis", "results" and "updated_at", or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT documents, initial_analysis, results, updated_at FROM refresh_state "
+                "WHERE topic = ? AND depth = ?",
+                (normalize_topic(topic), int(depth))
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "documents": json.loads(row[0]),
+            "initial_analysis": json.loads(row[1]),
+            "results": json.loads(row[2]),
+            "updated_at": row[3]
+        }
+
+    def save(self, topic, depth, documents, initial_analysis, results):
+        """
+        Record the outcome of a run as the baseline for the next refresh
+
+        Args:
+            topic (str): The blockchain research topic
+            depth (int): Research depth level (1-5)
+            documents (dict): Document key -> fingerprint
+            initial_analysis (dict): Merged initial analysis
+            results (dict): Final research report
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO refresh_state "
+                "(topic, depth, documents, initial_analysis, results, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (normalize_topic(topic), int(depth), json.dumps(documents),
+                 json.dumps(initial_analysis), json.dumps(results), time.time())
+            )
+            self._conn.commit()
+
+
+def get_default_refresh_store():
+    """
+    Return the process-wide refresh store (path from REFRESH_STORE_PATH)
+
+    Returns:
+        RefreshStore: The shared store
+    """
+    global _default_store
+
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = RefreshStore(os.getenv("REFRESH_STORE_PATH", DEFAULT_STORE_PATH))
+        return _default_store
@@ -0,0 +1,231 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from crawl_cache import normalize_topic
+from retrieval import tokenize
+
+DEFAULT_ARCHIVE_PATH = os.path.join(".cache", "reports.sqlite3")
+
+# Report sections stored and returned, in display order
+REPORT_SECTIONS = ("overview", "technical_analysis", "market_adoption", "regulatory", "future_outlook", "references")
+
+_default_archive = None
+_default_archive_lock = threading.Lock()
+
+
+def topic_similarity(first, second):
+    """
+    Jaccard similarity of two topics' index terms (stopwords ignored)
+
+    Args:
+        first (str): A research topic
+        second (str): Another research topic
+
+    Returns:
+        float: 1.0 for the same terms, 0.0 for no terms in common
+    """
+    first_terms, second_terms = set(tokenize(first)), set(tokenize(second))
+    if not first_terms or not second_terms:
+        return 1.0 if normalize_topic(first) == normalize_topic(second) else 0.0
+    return len(first_terms & second_terms) / len(first_terms | second_terms)
+
+
+class ReportArchive:
+    """
+    Searchable SQLite archive of finished research reports
+
+    Each report keeps its sections, source list and metadata. An FTS5 index
+    over topics and section text supports full-text search and finding an
+    earlier report on a similar topic before starting a new crawl.
+    """
+
+    def __init__(self, path=DEFAULT_ARCHIVE_PATH):
+        """
+        Args:
+            path (str): SQLite database file, or ":memory:"
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if path != ":memory:" and directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS reports (
+                id INTEGER PRIMARY KEY,
+                topic TEXT NOT NULL,
+                topic_key TEXT NOT NULL,
+                depth INTEGER NOT NULL,
+                created REAL NOT NULL,
+                sections TEXT NOT NULL,
+                sources TEXT NOT NULL,
+                metadata TEXT NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5(topic, body, tokenize = 'porter');
+            """
+        )
+        self._conn.commit()
+
+    def add(self, topic, depth, results, sources=None, metadata=None):
+        """
+        Archive a finished report
+
+        Args:
+            topic (str): The blockchain research topic
+            depth (int): Research depth level (1-5)
+            results (dict): Research results with the report sections
+            sources (list): Crawled sources, e.g. dicts with "source" and "url"
+            metadata (dict): Anything else worth keeping (modes, timings, ...)
+
+        Returns:
+            int: Id of the archived report
+        """
+        sections = {key: results.get(key, "") for key in REPORT_SECTIONS}
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO reports (topic, topic_key, depth, created, sections, sources, metadata) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (topic, normalize_topic(topic), int(depth), time.time(), json.dumps(sections),
+                 json.dumps(sources or []), json.dumps(metadata or {}))
+            )
+            report_id = cursor.lastrowid
+            self._conn.execute(
+                "INSERT INTO reports_fts (rowid, topic, body) VALUES (?, ?, ?)",
+                (report_id, topic, "\n\n".join(sections.values()))
+            )
+            self._conn.commit()
+        return report_id
+
+    def get(self, report_id):
+        """
+        Load an archived report
+
+        Args:
+            report_id (int): Report id
+
+        Returns:
+            dict: Report with "topic", "depth", "created", "sections", "sources" and "metadata", or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, topic, depth, created, sections, sources, metadata FROM reports WHERE id = ?",
+                (report_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row[0],
+            "topic": row[1],
+            "depth": row[2],
+            "created": row[3],
+            "sections": json.loads(row[4]),
+            "sources": json.loads(row[5]),
+            "metadata": json.loads(row[6])
+        }
+
+    def search(self, query, limit=10):
+        """
+        Full-text search over report topics and sections
+
+        Args:
+            query (str): Free-text query; every term must match
+            limit (int): Maximum number of reports
+
+        Returns:
+            list: Dicts with "id", "topic", "depth", "created" and a highlighted "snippet", best first
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        match = " ".join(f'"{term}"' for term in terms)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT r.id, r.topic, r.depth, r.created, snippet(reports_fts, 1, '**', '**', '...', 16) "
+                "FROM reports_fts JOIN reports r ON r.id = reports_fts.rowid "
+                "WHERE reports_fts MATCH ? ORDER BY bm25(reports_fts, 5.0, 1.0) LIMIT ?",
+                (match, limit)
+            ).fetchall()
+        return [
+            {"id": row[0], "topic": row[1], "depth": row[2], "created": row[3], "snippet": row[4]}
+            for row in rows
+        ]
+
+    def find_similar(self, topic, depth=1, max_age=None, min_similarity=0.6, candidates=20, compare=None):
+        """
+        Find the closest fresh report on a similar topic
+
+        Candidates come from the FTS index on topic terms and are ranked by
+        topic_similarity. A report counts only if it is at least as deep as
+        requested, since a deeper report covers a shallower request, and only
+        if it compares the same entities (or, for a plain request, none).
+
+        Args:
+            topic (str): The blockchain research topic
+            depth (int): Minimum research depth
+            max_age (float): Maximum report age in seconds (None for any age)
+            min_similarity (float): Minimum topic_similarity to accept
+            candidates (int): FTS candidates to consider
+            compare (list): Entities of a comparison request (None for a plain request)
+
+        Returns:
+            dict: Report (see get) plus "similarity" and "age", or None
+        """
+        terms = sorted(set(tokenize(topic)))
+        if not terms:
+            return None
+        match = "topic : (" + " OR ".join(f'"{term}"' for term in terms) + ")"
+        oldest = time.time() - max_age if max_age is not None else 0.0
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT r.id, r.topic, r.metadata FROM reports_fts JOIN reports r ON r.id = reports_fts.rowid "
+                "WHERE reports_fts MATCH ? AND r.depth >= ? AND r.created >= ? "
+                "ORDER BY bm25(reports_fts), r.created DESC LIMIT ?",
+                (match, int(depth), oldest, candidates)
+            ).fetchall()
+
+        best_id, best_similarity = None, min_similarity
+        wanted = _entity_key(compare)
+        for report_id, candidate, metadata in rows:
+            if _entity_key(json.loads(metadata).get("compare")) != wanted:
+                continue
+            similarity = topic_similarity(topic, candidate)
+            if similarity >= best_similarity and (best_id is None or similarity > best_similarity):
+                best_id, best_similarity = report_id, similarity
+        if best_id is None:
+            return None
+
+        report = self.get(best_id)
+        report["similarity"] = round(best_similarity, 3)
+        report["age"] = round(time.time() - report["created"], 1)
+        return report
+
+
+def _entity_key(entities):
+    # Comparisons of the same entities match regardless of order and case
+    return sorted(name.strip().lower() for name in entities) if entities else None
+
+
+def get_default_archive():
+    """
+    Return the process-wide report archive
+
+    REPORT_ARCHIVE_PATH overrides the default location; setting
+    REPORT_ARCHIVE_DISABLED=1 turns archiving off.
+
+    Returns:
+        ReportArchive: The shared archive, or None if archiving is disabled
+    """
+    global _default_archive
+
+    if os.getenv("REPORT_ARCHIVE_DISABLED", "") in ("1", "true", "yes"):
+        return None
+
+    with _default_archive_lock:
+        if _default_archive is None:
+            _default_archive = ReportArchive(os.getenv("REPORT_ARCHIVE_PATH", DEFAULT_ARCHIVE_PATH))
+        return _default_archive
@@ -0,0 +1,313 @@
+import os
+import sys
+import json
+import asyncio
+import argparse
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qs
+import tracing
+from report_archive import get_default_archive
+from jobs import COMPLETED, FAILED, FINISHED_STATES, JobManager, JobStore, QueueFullError
+from blockchain_research import ANALYSIS_MODES, ELABORATION_MODES
+from model_routing import POLICIES
+from comparison import validate_entities
+
+DEFAULT_SERVICE_JOB_STORE_PATH = os.path.join(".cache", "service_jobs.sqlite3")
+
+# Longest a result request may wait for its job with ?wait=
+MAX_WAIT = 60.0
+
+# Request fields passed through to conduct_research_async, with their validators
+RESEARCH_OPTIONS = {
+    "analysis_mode": lambda value: value in ANALYSIS_MODES,
+    "elaboration_mode": lambda value: value in ELABORATION_MODES,
+    "dedupe": lambda value: value in (None, "paragraph", "document"),
+    "incremental": lambda value: isinstance(value, bool),
+    "clean": lambda value: isinstance(value, bool),
+    "overlap": lambda value: isinstance(value, bool),
+    # Named policies only: rules files are for operators, not API clients
+    "routing": lambda value: value is None or value in POLICIES,
+    "compare": lambda value: value is None or _valid_entities(value),
+    "archive_max_age": lambda value: value is None or (
+        isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0
+    )
+}
+
+
+def _valid_entities(value):
+    """True for a list of 2 to MAX_ENTITIES distinct entity names"""
+    try:
+        validate_entities(value)
+    except ValueError:
+        return False
+    return True
+
+
+class ResearchService:
+    """
+    Headless HTTP API for running research jobs
+
+    Endpoints:
+        POST   /research                 Submit {"topic", "depth", ...options}; 202 with a job id
+        GET    /research/{id}            Job status and progress
+        GET    /research/{id}/result     Report once completed (202 while pending); ?wait=N long-polls
+        DELETE /research/{id}            Cancel a queued or running job
+        GET    /reports?q=...            Full-text search over archived reports
+        GET    /reports/{id}             An archived report
+        GET    /health                   Queue state
+        GET    /metrics                  Prometheus metrics
+
+    Identical concurrent submissions (same normalized topic, depth and options)
+    share one job. New jobs are rejected with 503 as soon as max_concurrent
+    running plus queue_limit waiting jobs are pending, instead of queueing
+    without bound.
+    """
+
+    def __init__(self, manager=None, queue_limit=None, token=None, max_body=64 * 1024):
+        """
+        Args:
+            manager (JobManager): Runs the jobs; defaults to one with its own job store
+                (RESEARCH_SERVICE_JOB_STORE, default .cache/service_jobs.sqlite3)
+            queue_limit (int): Jobs allowed to wait for a slot (RESEARCH_QUEUE_LIMIT, default 16)
+            token (str): Bearer token required on every request (RESEARCH_SERVICE_TOKEN; None for no auth)
+            max_body (int): Largest accepted request body in bytes
+        """
+        self.manager = manager or JobManager(
+            JobStore(os.getenv("RESEARCH_SERVICE_JOB_STORE", DEFAULT_SERVICE_JOB_STORE_PATH))
+        )
+        self.queue_limit = queue_limit if queue_limit is not None else int(os.getenv("RESEARCH_QUEUE_LIMIT", 16))
+        self.token = token if token is not None else os.getenv("RESEARCH_SERVICE_TOKEN") or None
+        self.max_body = max_body
+
+    @property
+    def max_pending(self):
+        """Jobs that may be queued or running before new ones are rejected"""
+        return self.manager.max_concurrent + self.queue_limit
+
+    async def serve(self, host="127.0.0.1", port=8080):
+        """
+        Listen for HTTP requests until cancelled
+
+        Args:
+            host (str): Interface to bind
+            port (int): Port to listen on
+        """
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def handle_connection(self, reader, writer):
+        """Read one HTTP request, route it and write the response"""
+        try:
+            try:
+                method, target, headers, body = await asyncio.wait_for(self._read_request(reader), timeout=30)
+                status, payload, extra_headers = await self.route(method, target, headers, body)
+            except (ValueError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+                status, payload, extra_headers = 400, {"error": f"Bad request: {e}"}, {}
+            await self._write_response(writer, status, payload, extra_headers)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, target, headers, body):
+        """
+        Dispatch a request to its endpoint
+
+        Args:
+            method (str): HTTP method
+            target (str): Request target (path and query string)
+            headers (dict): Lower-cased request headers
+            body (bytes): Request body
+
+        Returns:
+            tuple: (HTTP status, JSON payload or text, extra response headers)
+        """
+        url = urlsplit(target)
+        parts = [part for part in url.path.split("/") if part]
+
+        if self.token and headers.get("authorization") != f"Bearer {self.token}":
+            return 401, {"error": "Missing or invalid bearer token"}, {"WWW-Authenticate": "Bearer"}
+
+        if parts == ["health"] and method == "GET":
+            return 200, {"status": "ok", **self._queue_state()}, {}
+        if parts == ["metrics"] and method == "GET":
+            return 200, self._render_metrics(), {"Content-Type": "text/plain; version=0.0.4"}
+
+        if parts == ["research"] and method == "POST":
+            return self._submit(body)
+        if len(parts) == 2 and parts[0] == "research":
+            if method == "GET":
+                return self._status(parts[1])
+            if method == "DELETE":
+                return self._cancel(parts[1])
+        if len(parts) == 3 and parts[0] == "research" and parts[2] == "result" and method == "GET":
+            wait = min(float(parse_qs(url.query).get("wait", ["0"])[0]), MAX_WAIT)
+            return await self._result(parts[1], wait)
+
+        if parts == ["reports"] and method == "GET":
+            return self._search_reports(parse_qs(url.query).get("q", [""])[0])
+        if len(parts) == 2 and parts[0] == "reports" and method == "GET":
+            return self._archived_report(parts[1])
+
+        return 404, {"error": f"No route for {method} {url.path}"}, {}
+
+    def _submit(self, body):
+        """POST /research"""
+        try:
+            request = json.loads(body or b"{}")
+            topic, depth, options = self._validate(request)
+        except ValueError as e:
+            return 400, {"error": str(e)}, {}
+
+        try:
+            job_id, coalesced = self.manager.submit_coalesced(topic, depth, max_pending=self.max_pending, **options)
+        except QueueFullError as e:
+            # Shed load straight away rather than letting callers time out in a long queue
+            tracing.metrics.inc("research_service_submissions_total", outcome="rejected")
+            return 503, {"error": str(e)}, {"Retry-After": "30"}
+
+        tracing.metrics.inc("research_service_submissions_total", outcome="coalesced" if coalesced else "accepted")
+        return 202, {"job_id": job_id, "coalesced": coalesced, **self._queue_state()}, {
+            "Location": f"/research/{job_id}"
+        }
+
+    def _status(self, job_id):
+        """GET /research/{id}"""
+        job = self.manager.get(job_id)
+        if job is None:
+            return 404, {"error": "Unknown job"}, {}
+        job.pop("results")
+        job.pop("session_id")
+        return 200, job, {}
+
+    def _cancel(self, job_id):
+        """DELETE /research/{id}"""
+        if self.manager.get(job_id) is None:
+            return 404, {"error": "Unknown job"}, {}
+        return 200, {"job_id": job_id, "cancelled": self.manager.cancel(job_id)}, {}
+
+    async def _result(self, job_id, wait):
+        """GET /research/{id}/result"""
+        job = self.manager.get(job_id)
+        if job is None:
+            return 404, {"error": "Unknown job"}, {}
+        if job["status"] not in FINISHED_STATES and wait > 0:
+            await self.manager.wait(job_id, wait)
+            job = self.manager.get(job_id)
+
+        if job["status"] == COMPLETED:
+            return 200, {"job_id": job_id, "topic": job["topic"], "depth": job["depth"],
+                         "results": job["results"]}, {}
+        if job["status"] == FAILED:
+            return 500, {"job_id": job_id, "status": FAILED, "error": job["error"]}, {}
+        return 202, {"job_id": job_id, "status": job["status"], "progress": job["progress"]}, {"Retry-After": "5"}
+
+    def _search_reports(self, query):
+        """GET /reports?q=..."""
+        archive = get_default_archive()
+        if archive is None:
+            return 404, {"error": "Report archive is disabled"}, {}
+        return 200, {"query": query, "reports": archive.search(query)}, {}
+
+    def _archived_report(self, report_id):
+        """GET /reports/{id}"""
+        archive = get_default_archive()
+        report = archive.get(int(report_id)) if archive is not None and report_id.isdigit() else None
+        if report is None:
+            return 404, {"error": "Unknown report"}, {}
+        return 200, report, {}
+
+    def _validate(self, request):
+        """Check a submission and split it into topic, depth and research options"""
+        if not isinstance(request, dict):
+            raise ValueError("Request body must be a JSON object")
+        topic = request.get("topic")
+        if not isinstance(topic, str) or not topic.strip() or len(topic) > 500:
+            raise ValueError("topic must be a non-empty string of at most 500 characters")
+        depth = request.get("depth", 3)
+        if not isinstance(depth, int) or isinstance(depth, bool) or not 1 <= depth <= 5:
+            raise ValueError("depth must be an integer between 1 and 5")
+
+        options = {}
+        for name, value in request.items():
+            if name in ("topic", "depth"):
+                continue
+            if name not in RESEARCH_OPTIONS:
+                raise ValueError(f"Unknown option: {name}")
+            if not RESEARCH_OPTIONS[name](value):
+                raise ValueError(f"Invalid value for {name}: {value!r}")
+            options[name] = value
+        return topic.strip(), depth, options
+
+    def _queue_state(self):
+        running = self.manager.running()
+        pending = self.manager.pending()
+        return {"running": running, "queued": pending - running, "max_pending": self.max_pending}
+
+    def _render_metrics(self):
+        state = self._queue_state()
+        gauges = [
+            "# TYPE research_service_running_jobs gauge",
+            f"research_service_running_jobs {state['running']}",
+            "# TYPE research_service_queued_jobs gauge",
+            f"research_service_queued_jobs {state['queued']}"
+        ]
+        return tracing.metrics.render() + "\n".join(gauges) + "\n"
+
+    async def _read_request(self, reader):
+        request_line = (await reader.readline()).decode("latin-1").rstrip("\r\n")
+        method, target, _ = request_line.split(" ", 2)
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").rstrip("\r\n")
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", 0))
+        if length > self.max_body:
+            raise ValueError("request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, headers, body
+
+    async def _write_response(self, writer, status, payload, extra_headers):
+        if isinstance(payload, str):
+            body = payload.encode()
+            content_type = "text/plain; charset=utf-8"
+        else:
+            body = json.dumps(payload).encode()
+            content_type = "application/json"
+        headers = {"Content-Type": content_type, "Content-Length": str(len(body)), "Connection": "close",
+                   **extra_headers}
+        head = f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n" + "".join(
+            f"{name}: {value}\r\n" for name, value in headers.items()
+        )
+        writer.write(head.encode("latin-1") + b"\r\n" + body)
+        await writer.drain()
+
+
+def main(argv=None):
+    """Command-line entry point for the research HTTP service"""
+    parser = argparse.ArgumentParser(description="Serve blockchain research over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    parser.add_argument("--max-concurrent", type=int, default=None, help="Research jobs running at once")
+    parser.add_argument("--queue-limit", type=int, default=None, help="Jobs allowed to wait before rejecting")
+    parser.add_argument("--job-store", default=None, help="SQLite file for job state")
+    args = parser.parse_args(argv)
+
+    store = JobStore(args.job_store or os.getenv("RESEARCH_SERVICE_JOB_STORE", DEFAULT_SERVICE_JOB_STORE_PATH))
+    service = ResearchService(JobManager(store, max_concurrent=args.max_concurrent), queue_limit=args.queue_limit)
+    print(f"Serving research API on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
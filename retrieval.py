@@ -0,0 +1,186 @@
+import re
+import math
+from collections import Counter
+from chunking import estimate_tokens, iter_documents, split_paragraphs
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have in into is it its of on or that the their
+this to was were which will with not can also more than such these those they them been
+""".split())
+
+# Retrieval queries describing what each analysis section (ResearchAgent.ANALYSIS_SECTIONS)
+# needs from the crawl
+SECTION_QUERIES = {
+    "technical_specs": "architecture consensus protocol virtual machine execution throughput latency "
+                       "specification smart contract implementation cryptography proof",
+    "adoption_metrics": "users transactions tvl volume adoption market share growth partners "
+                        "integrations daily active",
+    "tokenomics": "token supply emission inflation staking rewards fees burn distribution "
+                  "allocation vesting treasury",
+    "roadmap": "roadmap milestone upgrade release launch mainnet testnet timeline phase planned",
+    "stakeholders": "team foundation founders developers contributors investors validators "
+                    "governance dao community",
+    "key_findings": "key summary overview important significant"
+}
+
+
+def tokenize(text):
+    """
+    Split text into lower-cased index terms, dropping stopwords
+
+    Args:
+        text (str): Text to tokenize
+
+    Returns:
+        list: Terms in order of appearance
+    """
+    return [term for term in _WORD.findall(text.lower()) if term not in STOPWORDS and len(term) > 1]
+
+
+class PassageIndex:
+    """
+    In-process BM25 index over the passages of a single research run
+
+    The index is a sparse inverted list (term -> [(passage id, term frequency)]),
+    so scoring a query only touches passages that contain its terms.
+    """
+
+    def __init__(self, passages, k1=1.5, b=0.75):
+        """
+        Args:
+            passages (list): Passage dicts with "text" and optionally "source"/"url"
+            k1 (float): BM25 term-frequency saturation
+            b (float): BM25 length normalization
+        """
+        self.passages = passages
+        self.k1 = k1
+        self.b = b
+        self._postings = {}
+        self._lengths = []
+
+        for passage_id, passage in enumerate(passages):
+            terms = tokenize(passage["text"])
+            self._lengths.append(len(terms))
+            for term, frequency in Counter(terms).items():
+                self._postings.setdefault(term, []).append((passage_id, frequency))
+
+        self._average_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+
+    @classmethod
+    def from_raw_data(cls, raw_data, passage_tokens=200):
+        """
+        Build an index from crawled documents, splitting them into passages
+
+        Args:
+            raw_data (dict): Raw data from Firecrawl
+            passage_tokens (int): Approximate maximum passage size in tokens
+
+        Returns:
+            PassageIndex: Index over every passage of every document
+        """
+        max_chars = passage_tokens * 4
+        passages = []
+        for document in iter_documents(raw_data):
+            buffer = ""
+            for paragraph in split_paragraphs(document["content"], max_chars):
+                # Merge short paragraphs so passages carry enough context to rank well
+                if buffer and len(buffer) + len(paragraph) + 2 > max_chars:
+                    passages.append({"text": buffer, "source": document.get("source"), "url": document.get("url")})
+                    buffer = ""
+                buffer = f"{buffer}\n\n{paragraph}" if buffer else paragraph
+            if buffer:
+                passages.append({"text": buffer, "source": document.get("source"), "url": document.get("url")})
+        return cls(passages)
+
+    def search(self, query, k=10):
+        """
+        Rank passages against a query with BM25
+
+        Args:
+            query (str): Free-text query
+            k (int): Number of results
+
+        Returns:
+            list: (score, passage id) pairs, best first
+        """
+        count = len(self.passages)
+        scores = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for passage_id, frequency in postings:
+                length_norm = 1 - self.b + self.b * self._lengths[passage_id] / (self._average_length or 1)
+                scores[passage_id] = scores.get(passage_id, 0.0) + idf * frequency * (self.k1 + 1) / (
+                    frequency + self.k1 * length_norm
+                )
+        ranked = sorted(((score, passage_id) for passage_id, score in scores.items()), reverse=True)
+        return ranked[:k]
+
+    def select(self, query, token_budget, k=8, exclude=None):
+        """
+        Pick the best passages for a query that fit in a token budget
+
+        Args:
+            query (str): Free-text query
+            token_budget (int): Maximum estimated tokens across selected passages
+            k (int): Maximum number of passages
+            exclude (set): Passage ids already used elsewhere
+
+        Returns:
+            list: Selected passage ids, best first
+        """
+        exclude = exclude or set()
+        selected = []
+        used = 0
+        for _, passage_id in self.search(query, k=k + len(exclude)):
+            if passage_id in exclude:
+                continue
+            tokens = estimate_tokens(self.passages[passage_id]["text"])
+            if used + tokens > token_budget:
+                continue
+            selected.append(passage_id)
+            used += tokens
+            if len(selected) >= k:
+                break
+        return selected
+
+
+def build_section_context(index, topic, sections, token_budget=4000, k=6):
+    """
+    Assemble a prompt context with a top-k, token-budgeted slice per report section
+
+    The budget is split evenly across sections and each passage is included at
+    most once, under the first section that selected it.
+
+    Args:
+        index (PassageIndex): Index over the run's passages
+        topic (str): The research topic, added to every section query
+        sections (list): Section keys from SECTION_QUERIES
+        token_budget (int): Total estimated tokens for the whole context
+        k (int): Maximum passages per section
+
+    Returns:
+        str: Context text grouped by section, with source attribution
+    """
+    per_section = max(token_budget // max(len(sections), 1), 1)
+    used = set()
+    blocks = []
+
+    for section in sections:
+        query = f"{topic} {SECTION_QUERIES.get(section, section.replace('_', ' '))}"
+        selected = index.select(query, per_section, k=k, exclude=used)
+        if not selected:
+            continue
+        used.update(selected)
+        passages = "\n\n".join(
+            f"[Source: {index.passages[passage_id].get('source') or index.passages[passage_id].get('url') or 'unknown'}]\n"
+            f"{index.passages[passage_id]['text']}"
+            for passage_id in selected
+        )
+        blocks.append(f"### Context for {section.replace('_', ' ')}\n{passages}")
+
+    return "\n\n".join(blocks)
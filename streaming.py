@@ -0,0 +1,142 @@
+import json
+import queue
+
+# Event types emitted by the research pipeline, in the order they usually occur
+ARCHIVE_HIT = "archive_hit"
+CRAWL_STARTED = "crawl_started"
+SOURCE_RECEIVED = "source_received"
+CRAWL_FINISHED = "crawl_finished"
+CLEAN_FINISHED = "clean_finished"
+DEDUP_FINISHED = "dedup_finished"
+REFRESH_DIFF = "refresh_diff"
+COMPARISON_PLANNED = "comparison_planned"
+ANALYSIS_TOKEN = "analysis_token"
+ANALYSIS_FINISHED = "analysis_finished"
+ELABORATION_TOKEN = "elaboration_token"
+ELABORATION_FINISHED = "elaboration_finished"
+RESEARCH_COMPLETED = "research_completed"
+RESEARCH_FAILED = "research_failed"
+
+_DONE = object()
+
+
+def emit(on_event, event_type, **data):
+    """
+    Send a pipeline event to a listener, if one is registered
+
+    Args:
+        on_event (callable): Listener receiving event dicts, or None
+        event_type (str): One of the event type constants in this module
+        **data: Event payload
+    """
+    if on_event is not None:
+        on_event({"type": event_type, **data})
+
+
+def parse_partial_json(text):
+    """
+    Extract the string fields of a JSON object that is still being streamed
+
+    Lets the UI render report sections while the model is generating them.
+    Fields whose value is still open are returned with the text received so far.
+
+    Args:
+        text (str): Prefix of a JSON object, e.g. streamed completion content
+
+    Returns:
+        dict: Mapping of top-level keys to (possibly incomplete) string values
+    """
+    try:
+        parsed = json.loads(text)
+        if isinstance(parsed, dict):
+            return {key: value for key, value in parsed.items() if isinstance(value, str)}
+    except ValueError:
+        pass
+
+    fields = {}
+    decoder = json.JSONDecoder()
+    position = text.find("{")
+    if position < 0:
+        return fields
+    position += 1
+    length = len(text)
+
+    while position < length:
+        # Skip whitespace and separators up to the next key
+        while position < length and text[position] in " \t\r\n,":
+            position += 1
+        if position >= length or text[position] != '"':
+            break
+        try:
+            key, position = decoder.raw_decode(text, position)
+        except ValueError:
+            break
+
+        while position < length and text[position] in " \t\r\n:":
+            position += 1
+        if position >= length:
+            break
+
+        if text[position] != '"':
+            # Non-string value: skip it if complete, stop otherwise
+            try:
+                _, position = decoder.raw_decode(text, position)
+                continue
+            except ValueError:
+                break
+
+        try:
+            value, position = decoder.raw_decode(text, position)
+            fields[key] = value
+        except ValueError:
+            fields[key] = _decode_open_string(text[position + 1:])
+            break
+
+    return fields
+
+
+def _decode_open_string(fragment):
+    """Decode the body of an unterminated JSON string, dropping a trailing partial escape"""
+    for trim in range(0, 7):
+        candidate = fragment[:len(fragment) - trim] if trim else fragment
+        try:
+            return json.loads('"' + candidate + '"')
+        except ValueError:
+            continue
+    return fragment
+
+
+def iterate_events(run, loop_runner):
+    """
+    Run a pipeline coroutine in the background and yield its events synchronously
+
+    Args:
+        run (callable): Function taking an on_event listener and returning the pipeline coroutine
+        loop_runner (callable): Function scheduling a coroutine on a background loop and
+            returning a concurrent.futures.Future (e.g. ClientRegistry.submit)
+
+    Yields:
+        dict: Pipeline events; the last one is research_completed or research_failed
+    """
+    events = queue.Queue()
+
+    async def runner():
+        try:
+            results = await run(events.put)
+            events.put({"type": RESEARCH_COMPLETED, "results": results})
+        except Exception as e:
+            events.put({"type": RESEARCH_FAILED, "error": str(e)})
+        finally:
+            events.put(_DONE)
+
+    future = loop_runner(runner())
+    try:
+        while True:
+            event = events.get()
+            if event is _DONE:
+                break
+            yield event
+    finally:
+        # Stop the background work if the consumer goes away early
+        if not future.done():
+            future.cancel()
@@ -0,0 +1,19 @@
+import os
+import ast
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def _calls(name):
+    # app.py runs Streamlit at import time, so its archive lookups are checked in the source
+    with open(APP, encoding="utf-8") as handle:
+        tree = ast.parse(handle.read())
+    return [node for node in ast.walk(tree)
+            if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == name]
+
+
+def test_archive_lookups_pass_the_compared_entities():
+    calls = _calls("find_similar")
+    assert calls
+    for call in calls:
+        assert "compare" in [keyword.arg for keyword in call.keywords]
@@ -0,0 +1,36 @@
+import json
+import asyncio
+import streaming
+import batch_research
+from batch_research import BatchRunner, job_key, load_completed
+
+
+def _research(simulated):
+    async def conduct_research_async(topic, depth=3, on_event=None, **options):
+        streaming.emit(on_event, streaming.CRAWL_FINISHED, sources=1, simulated=simulated, stale=False)
+        return {"overview": f"Report on {topic}"}
+    return conduct_research_async
+
+
+def _run(monkeypatch, path, simulated):
+    monkeypatch.setattr(batch_research, "conduct_research_async", _research(simulated))
+    runner = BatchRunner(str(path), workers=1)
+    return asyncio.run(runner.run([{"topic": "Rollups", "depth": 2}]))
+
+
+def test_simulated_reports_are_degraded_and_rerun_on_resume(monkeypatch, tmp_path):
+    path = tmp_path / "results.jsonl"
+
+    summary = _run(monkeypatch, path, simulated=True)
+    assert summary["degraded"] == 1 and summary["ok"] == 0
+    record = json.loads(path.read_text().splitlines()[0])
+    assert record["status"] == "degraded"
+    assert record["degraded"] == ["simulated"]
+    assert load_completed(str(path)) == set()
+
+    summary = _run(monkeypatch, path, simulated=False)
+    assert summary["ok"] == 1 and summary["skipped"] == 0
+    assert load_completed(str(path)) == {job_key("Rollups", 2)}
+
+    summary = _run(monkeypatch, path, simulated=False)
+    assert summary["skipped"] == 1
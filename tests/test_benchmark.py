@@ -0,0 +1,40 @@
+import random
+import benchmark
+from mock_servers import Latency, MockConfig
+
+
+def test_percentile_interpolates_between_ranks():
+    assert benchmark.percentile([], 95) == 0.0
+    assert benchmark.percentile([3.0, 1.0, 2.0, 4.0], 50) == 2.5
+    assert benchmark.percentile([1.0, 2.0], 100) == 2.0
+
+
+def test_latency_specs_parse_and_sample():
+    assert Latency.parse("0.25").to_dict() == {"kind": "fixed", "mean": 0.25, "spread": 0.0}
+    assert Latency.parse("lognormal:0.4:0.5").kind == "lognormal"
+    rng = random.Random(0)
+    assert Latency("fixed", 0.3).sample(rng) == 0.3
+    assert all(0.0 <= Latency("uniform", 0.1, 0.2).sample(rng) <= 0.3 for _ in range(100))
+
+
+def test_comparison_flags_regressions_of_five_percent_or_more():
+    def results(p95, throughput):
+        return {"scenarios": {"single": {"latency": {"p95": p95}, "throughput": throughput}}}
+
+    rows = {row[1]: row for row in benchmark.compare_results(results(1.0, 10.0), results(1.2, 9.8))}
+    assert rows["latency.p95"][4:] == (20.0, True)
+    assert rows["throughput"][4:] == (-2.0, False)
+
+
+def test_benchmark_runs_the_pipeline_against_the_stand_in_servers():
+    instant = Latency("fixed", 0.0)
+    config = MockConfig(firecrawl_latency=instant, job_time=instant, openai_latency=instant, document_chars=500)
+    results = benchmark.run_benchmark(config, jobs=2, concurrency=2, depth=1, options={"dedupe": "paragraph"})
+
+    for name, jobs in (("single", 2), ("concurrent", 4)):
+        scenario = results["scenarios"][name]
+        assert scenario["jobs"] == jobs
+        assert scenario["errors"] == 0, scenario["first_error"]
+        assert scenario["simulated_crawls"] == 0
+        assert scenario["openai_requests"] > 0 and scenario["prompt_tokens"]["calls"] > 0
+    assert "single" in benchmark.format_results(results)
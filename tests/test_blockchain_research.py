@@ -0,0 +1,72 @@
+import asyncio
+import pytest
+import blockchain_research
+
+REPEATED = "Validators stake tokens to propose and attest blocks on the beacon chain every slot."
+CRAWL = {"status": "completed", "raw_data": [
+    {"source": "ethereum.org", "url": "https://ethereum.org/a", "content": f"{REPEATED}\n\nOriginal analysis A."},
+    {"source": "mirror.xyz", "url": "https://mirror.xyz/b", "content": f"{REPEATED}\n\nOriginal analysis B."}
+]}
+REPORT = {"overview": "o", "technical_analysis": "t", "market_adoption": "m", "regulatory": "r",
+          "future_outlook": "f", "references": "refs"}
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Run the pipeline on a fixed crawl, recording what each agent was given"""
+    seen = {}
+
+    class Firecrawl:
+        def __init__(self, **kwargs):
+            pass
+
+        async def explore_blockchain_topic_async(self, topic, depth=3, use_cache=True):
+            return {**CRAWL, "raw_data": [dict(item) for item in CRAWL["raw_data"]]}
+
+    class ResearchAgent:
+        def __init__(self, **kwargs):
+            pass
+
+        async def analyze_async(self, topic, raw_data, depth=3, on_token=None):
+            seen["raw_data"] = raw_data
+            return {"key_findings": "k"}
+
+        analyze_map_reduce_async = analyze_retrieval_async = analyze_async
+
+    class ElaborationAgent:
+        def __init__(self, **kwargs):
+            pass
+
+        async def elaborate_async(self, topic, initial_analysis, depth=3, on_token=None, **kwargs):
+            seen["elaboration"] = kwargs
+            return dict(REPORT)
+
+    monkeypatch.setattr(blockchain_research, "FirecrawlClient", Firecrawl)
+    monkeypatch.setattr(blockchain_research, "ResearchAgent", ResearchAgent)
+    monkeypatch.setattr(blockchain_research, "ElaborationAgent", ElaborationAgent)
+    monkeypatch.setattr(blockchain_research, "get_default_archive", lambda: None)
+
+    def run(**options):
+        events = []
+        results = asyncio.run(blockchain_research.conduct_research_async("Staking", depth=1,
+                                                                         on_event=events.append, **options))
+        return results, seen, [event["type"] for event in events]
+    return run
+
+
+def _contents(raw_data):
+    return "\n\n".join(item["content"] for item in raw_data["raw_data"])
+
+
+def test_dedup_is_off_by_default(pipeline):
+    results, seen, events = pipeline()
+    assert _contents(seen["raw_data"]).count(REPEATED) == 2
+    assert "dedup_finished" not in events
+    assert results["overview"] == "o"
+
+
+def test_paragraph_dedup_on_request(pipeline):
+    _, seen, events = pipeline(dedupe="paragraph")
+    assert _contents(seen["raw_data"]).count(REPEATED) == 1
+    assert "Original analysis B." in _contents(seen["raw_data"])
+    assert "dedup_finished" in events
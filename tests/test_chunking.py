@@ -0,0 +1,43 @@
+from chunking import chunk_documents, estimate_tokens, iter_documents, split_paragraphs
+
+
+def test_estimate_tokens_rounds_up():
+    assert [estimate_tokens(text) for text in ("", "a", "abcd", "abcde")] == [0, 1, 1, 2]
+
+
+def test_iter_documents_skips_items_without_content():
+    raw_data = {"raw_data": [{"content": "a"}, {"content": ""}, "junk", {"source": "b"}, {"content": "c"}]}
+    assert [item["content"] for item in iter_documents(raw_data)] == ["a", "c"]
+    assert list(iter_documents({"raw_data": None})) == []
+    assert list(iter_documents(None)) == []
+
+
+def test_split_paragraphs_wraps_long_paragraphs():
+    text = "Short one.\n\n  \n\n" + "x" * 25 + "\n \nLast."
+    assert list(split_paragraphs(text, 10)) == ["Short one.", "x" * 10, "x" * 10, "x" * 5, "Last."]
+
+
+def test_chunks_stay_within_budget_and_keep_source_headers():
+    documents = [
+        {"source": "ethereum.org", "content": "\n\n".join(f"Ethereum paragraph {i}. " * 5 for i in range(6))},
+        {"url": "https://l2beat.com", "content": "Rollup paragraph."},
+        {"content": "Anonymous paragraph."}
+    ]
+    chunks = list(chunk_documents(documents, max_tokens=100))
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 100 * 4 for chunk in chunks)
+    # A document split across chunks repeats its header, so every chunk is attributable
+    assert all(chunk.startswith("[Source: ") for chunk in chunks)
+    text = "\n\n".join(chunks)
+    assert text.count("[Source: ethereum.org]") == len([c for c in chunks if "Ethereum paragraph" in c])
+    assert "[Source: https://l2beat.com]\n\nRollup paragraph." in text
+    assert "[Source: unknown]\n\nAnonymous paragraph." in text
+    for i in range(6):
+        assert f"Ethereum paragraph {i}." in text
+
+
+def test_small_documents_share_one_chunk():
+    documents = [{"source": "a", "content": "One."}, {"source": "b", "content": "Two."}]
+    assert list(chunk_documents(documents)) == ["[Source: a]\n\nOne.\n\n[Source: b]\n\nTwo."]
+    assert list(chunk_documents([])) == []
@@ -0,0 +1,132 @@
+import time
+import pytest
+import circuit_breaker
+import tracing
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, LatencyWindow
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+def _breaker(**settings):
+    return CircuitBreaker("test endpoint", **{"window": 4, "min_calls": 4, "failure_rate": 0.5,
+                                              "slow_seconds": 1.0, "cooldown": 30.0, **settings})
+
+
+def test_opens_once_enough_recent_calls_failed(clock):
+    breaker = _breaker()
+    for success in (False, False, True):
+        assert breaker.allow()
+        breaker.record(success, 0.1)
+    # Below min_calls the breaker stays closed whatever the failure rate
+    assert breaker.state == CLOSED
+
+    assert breaker.allow()
+    breaker.record(True, 0.1)
+    assert breaker.state == OPEN and not breaker.allow()
+
+
+def test_only_the_recent_window_counts(clock):
+    breaker = _breaker()
+    for success in (True, True, False, True, True, True, False):
+        breaker.allow()
+        breaker.record(success, 0.1)
+    assert breaker.state == CLOSED
+
+    # Two of the last four calls failed, though only three of all eight did
+    breaker.allow()
+    breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+
+
+def test_slow_calls_count_as_failures(clock):
+    breaker = _breaker()
+    for _ in range(4):
+        breaker.allow()
+        breaker.record(True, 2.0)
+    assert breaker.state == OPEN
+
+    lenient = _breaker(slow_seconds=None)
+    for _ in range(4):
+        lenient.allow()
+        lenient.record(True, 2.0)
+    assert lenient.state == CLOSED
+
+
+def test_half_open_probe_closes_or_reopens(clock):
+    breaker = _breaker()
+    for _ in range(4):
+        breaker.record(False, 0.1)
+    assert breaker.is_open()
+
+    clock[0] += 30
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    # Only one probe at a time
+    assert not breaker.allow()
+    breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED and breaker.allow()
+
+
+def test_released_probe_lets_another_through(clock):
+    breaker = _breaker()
+    for _ in range(4):
+        breaker.record(False, 0.1)
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_guard_records_errors_and_unsuccessful_calls(clock):
+    breaker = _breaker(min_calls=2, window=2)
+    with pytest.raises(RuntimeError):
+        with breaker.guard():
+            raise RuntimeError("connection reset")
+    with breaker.guard() as call:
+        call.success = False
+    assert breaker.state == OPEN
+
+    with pytest.raises(CircuitOpenError):
+        with breaker.guard():
+            pass
+
+
+def test_state_and_transitions_are_exported(clock):
+    tracing.metrics.reset()
+    breaker = _breaker(min_calls=1, window=1)
+    breaker.record(False, 0.1)
+    breaker.allow()
+    rendered = tracing.metrics.render()
+    assert 'circuit_breaker_state{endpoint="test endpoint"} 2' in rendered
+    assert 'circuit_breaker_transitions_total{endpoint="test endpoint",state="open"} 1' in rendered
+    assert 'circuit_breaker_rejections_total{endpoint="test endpoint"} 1' in rendered
+
+
+def test_breakers_are_shared_per_endpoint_and_configured_from_the_environment(monkeypatch):
+    circuit_breaker.reset_breakers()
+    monkeypatch.setenv("CIRCUIT_BREAKER_COOLDOWN", "5")
+    breaker = circuit_breaker.get_breaker("firecrawl /research/start")
+    assert breaker is circuit_breaker.get_breaker("firecrawl /research/start")
+    assert breaker.cooldown == 5.0
+    circuit_breaker.reset_breakers()
+    assert circuit_breaker.get_breaker("firecrawl /research/start") is not breaker
+    circuit_breaker.reset_breakers()
+
+
+def test_latency_window_percentile():
+    window = LatencyWindow(size=4)
+    assert window.percentile(95) is None
+    for seconds in (5.0, 1.0, 2.0, 3.0, 4.0):
+        window.add(seconds)
+    assert len(window) == 4
+    assert (window.percentile(50), window.percentile(95)) == (2.0, 4.0)
@@ -0,0 +1,57 @@
+from cleaning import clean_content
+
+CHROME = """[Home](https://example.org/) 
+[Docs](https://example.org/docs)
+[Blog](https://example.org/blog)
+[Careers](https://example.org/careers)
+
+We use cookies to improve your experience. Accept all
+
+© 2025 Example Foundation. All rights reserved."""
+
+
+def _cleaned(body):
+    return clean_content(f"{CHROME}\n\n{body}\n\n{CHROME}")
+
+
+def test_boilerplate_is_removed():
+    text = _cleaned("Solana orders transactions with a verifiable delay function called Proof of History.")
+    assert "Proof of History" in text
+    assert "cookies" not in text
+    assert "Careers" not in text
+    assert "All rights reserved" not in text
+
+
+def test_numeric_facts_survive():
+    for fact in ("Total supply: 588,012,345 SOL.", "Inflation 5.1%, staking APY 7.2%.",
+                 "Block time: 400 ms", "TPS: 65,000"):
+        assert fact in _cleaned(fact)
+
+
+def test_tables_survive():
+    table = ("| Chain | TPS | Finality |\n"
+             "|---|---|---|\n"
+             "| Solana | 65,000 | 12.8 s |\n"
+             "| Sui | 297,000 | 0.4 s |\n"
+             "| Aptos | 160,000 | 0.9 s |")
+    assert table in _cleaned(table)
+
+
+def test_lists_survive():
+    chains = "- Ethereum\n- Solana\n- Avalanche\n- Polygon"
+    assert chains in _cleaned(chains)
+    steps = "1. Stake\n2. Delegate\n3. Claim"
+    assert steps in _cleaned(steps)
+
+
+def test_fact_blocks_of_several_lines_survive():
+    facts = "Block time: 400 ms\nValidators: 1,900\nFees paid in SOL"
+    assert facts in _cleaned(facts)
+
+
+def test_menus_and_footers_with_numbers_are_removed():
+    for chrome in ("Web3 · Layer 2 · Subscribe", "News · Layer 2 · Web3 · Top 10 · Events",
+                   "Home | Docs | Layer 2 | Blog", "Markets\nLayer 2\nWeb3\nDeFi\nTop 10 Coins"):
+        text = _cleaned(f"{chrome}\n\nSolana orders transactions with Proof of History.")
+        assert "Layer 2" not in text and "Web3" not in text, chrome
+        assert "Proof of History" in text
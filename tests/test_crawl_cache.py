@@ -0,0 +1,76 @@
+import json
+import time
+from crawl_cache import CrawlCache
+
+SOURCES = ["ethereum.org", "coindesk.com"]
+
+
+def _crawl(text="Rollups post data to Ethereum."):
+    return {"status": "completed", "raw_data": [{"source": "ethereum.org", "content": text}]}
+
+
+def _size(data):
+    return len(json.dumps(data).encode())
+
+
+def test_key_ignores_topic_spelling_and_source_order():
+    cache = CrawlCache(":memory:")
+    assert cache.put("Layer 2  Rollups", 3, SOURCES, _crawl())
+    assert cache.get("layer 2 rollups", 3, list(reversed(SOURCES))) == _crawl()
+    assert cache.get("layer 2 rollups", 4, SOURCES) is None
+    assert cache.get("layer 2 rollups", 3, SOURCES[:1]) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_expired_entry_is_a_miss_but_kept_for_stale_reads(monkeypatch):
+    cache = CrawlCache(":memory:", ttl=60)
+    now = time.time()
+    cache.put("Rollups", 3, SOURCES, _crawl())
+
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert cache.get("Rollups", 3, SOURCES) is None
+    assert cache.get("Rollups", 3, SOURCES, allow_stale=True) == _crawl()
+    assert cache.stats()["entries"] == 1
+
+
+def test_simulated_and_oversized_payloads_are_not_stored():
+    cache = CrawlCache(":memory:", max_bytes=_size(_crawl()))
+    assert not cache.put("Rollups", 3, SOURCES, {**_crawl(), "simulated": True})
+    assert not cache.put("Rollups", 3, SOURCES, _crawl("x" * 100))
+    assert cache.put("Rollups", 3, SOURCES, _crawl())
+    assert cache.stats()["entries"] == 1
+
+
+def test_eviction_keeps_the_cache_under_its_byte_budget_dropping_least_recently_used(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+    cache = CrawlCache(":memory:", max_bytes=_size(_crawl("a")) * 2)
+
+    for topic in ("a", "b"):
+        cache.put(topic, 3, SOURCES, _crawl(topic))
+        clock[0] += 1
+    cache.get("a", 3, SOURCES)
+    clock[0] += 1
+    cache.put("c", 3, SOURCES, _crawl("c"))
+
+    assert cache.get("b", 3, SOURCES) is None
+    assert cache.get("a", 3, SOURCES) == _crawl("a")
+    assert cache.get("c", 3, SOURCES) == _crawl("c")
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["bytes"] <= stats["max_bytes"]
+
+
+def test_eviction_drops_expired_entries_before_recently_used_ones(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+    cache = CrawlCache(":memory:", ttl=60, max_bytes=_size(_crawl("a")) * 2)
+
+    cache.put("a", 3, SOURCES, _crawl("a"), ttl=10)
+    clock[0] += 1
+    cache.put("b", 3, SOURCES, _crawl("b"))
+    clock[0] += 20
+    cache.get("a", 3, SOURCES, allow_stale=True)
+    cache.put("c", 3, SOURCES, _crawl("c"))
+
+    assert cache.get("a", 3, SOURCES, allow_stale=True) is None
+    assert cache.get("b", 3, SOURCES) == _crawl("b")
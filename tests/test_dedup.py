@@ -0,0 +1,86 @@
+import pytest
+import dedup
+from dedup import MAX_DISTANCE, NearDuplicateIndex, deduplicate, simhash
+
+ARTICLE = ("Ethereum validators stake thirty two ether to propose and attest blocks on the beacon chain every twelve "
+           "seconds. Rollups batch thousands of transactions off chain and post compressed call data back to the main "
+           "chain, inheriting its security. Optimistic rollups assume batches are valid and allow a challenge window "
+           "for fraud proofs, while zero knowledge rollups submit validity proofs with each batch. Fees on layer two "
+           "networks dropped sharply after blobs were introduced, and activity on the largest rollups has grown "
+           "steadily since then.")
+SYNDICATED = ARTICLE + " Originally published on CoinDesk."
+UNRELATED = ("Bitcoin miners compete to find a proof of work hash below the network target, and the winner collects "
+             "the block subsidy plus the fees of every transaction included in the block.")
+
+
+def _fingerprints(monkeypatch, *fingerprints):
+    by_text = {f"text {i}": fingerprint for i, fingerprint in enumerate(fingerprints)}
+    monkeypatch.setattr(dedup, "simhash", lambda text: by_text[text])
+    return list(by_text)
+
+
+def test_index_matches_fingerprints_within_max_distance_in_any_band(monkeypatch):
+    base = 0x0123456789ABCDEF
+    # Three flipped bits in three different bands still leave one band identical
+    close = base ^ (1 << 0) ^ (1 << 20) ^ (1 << 40)
+    # Four flipped bits, one per band, share no band; four in one band share the rest but are too far
+    spread = base ^ (1 << 0) ^ (1 << 20) ^ (1 << 40) ^ (1 << 60)
+    packed = base ^ 0b1111
+    texts = _fingerprints(monkeypatch, base, close, spread, packed)
+
+    index = NearDuplicateIndex()
+    assert not index.seen(texts[0])
+    assert index.seen(texts[1])
+    assert not index.seen(texts[2])
+    assert not index.seen(texts[3])
+
+
+def test_max_distance_sets_the_threshold():
+    distance = (simhash(ARTICLE) ^ simhash(SYNDICATED)).bit_count()
+    assert 0 < distance <= MAX_DISTANCE
+    assert (simhash(ARTICLE) ^ simhash(UNRELATED)).bit_count() > MAX_DISTANCE
+
+    strict = NearDuplicateIndex(max_distance=distance - 1)
+    assert not strict.seen(ARTICLE) and not strict.seen(SYNDICATED)
+    default = NearDuplicateIndex()
+    assert not default.seen(ARTICLE) and default.seen(SYNDICATED) and not default.seen(UNRELATED)
+
+
+def test_short_blocks_only_match_exactly():
+    assert simhash("Subscribe to our newsletter") is None
+    index = NearDuplicateIndex()
+    assert not index.seen("Subscribe to our newsletter")
+    assert index.seen("  subscribe to OUR newsletter!")
+    assert not index.seen("Subscribe to our podcast")
+
+
+def test_paragraph_level_keeps_the_first_copy_and_reports_savings():
+    raw_data = {"status": "completed", "raw_data": [
+        {"source": "ethereum.org", "content": f"{ARTICLE}\n\nEthereum.org intro."},
+        {"source": "coindesk.com", "content": f"{SYNDICATED}\n\nCoinDesk take."},
+        {"source": "mirror.xyz", "content": SYNDICATED}
+    ]}
+    deduplicated, report = deduplicate(raw_data)
+
+    assert [item["content"] for item in deduplicated["raw_data"]] == [
+        f"{ARTICLE}\n\nEthereum.org intro.", "CoinDesk take."
+    ]
+    assert report["paragraphs_removed"] == 2 and report["documents_removed"] == 1
+    assert report["chars_removed"] == 2 * len(SYNDICATED) and report["tokens_removed"] > 0
+    assert raw_data["raw_data"][1]["content"].startswith(ARTICLE)
+
+
+def test_document_level_drops_only_whole_near_duplicate_documents():
+    raw_data = {"raw_data": [
+        {"source": "a", "content": ARTICLE},
+        {"source": "b", "content": SYNDICATED},
+        {"source": "c", "content": f"{UNRELATED}\n\n{ARTICLE}"}
+    ]}
+    deduplicated, report = deduplicate(raw_data, level="document")
+    assert [item["source"] for item in deduplicated["raw_data"]] == ["a", "c"]
+    assert report["documents_removed"] == 1 and report["paragraphs_removed"] == 0
+
+
+def test_unknown_level_is_rejected():
+    with pytest.raises(ValueError):
+        deduplicate({"raw_data": []}, level="sentence")
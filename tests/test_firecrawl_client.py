@@ -0,0 +1,100 @@
+import os
+import sys
+import asyncio
+import subprocess
+import pytest
+from circuit_breaker import get_breaker, reset_breakers
+from crawl_cache import CrawlCache
+from firecrawl_client import FirecrawlClient, ResearchJobError
+
+TOPIC = "Ethereum rollups"
+CRAWL = {"status": "completed", "query": TOPIC, "raw_data": [{"source": "ethereum.org", "content": "Cached crawl"}]}
+
+
+@pytest.fixture(autouse=True)
+def breakers():
+    reset_breakers()
+    yield
+    reset_breakers()
+
+
+def _client(ttl):
+    client = FirecrawlClient(cache=CrawlCache(":memory:"), api_key="test")
+    payload = client._build_payload(TOPIC, 1)
+    client.cache.put(TOPIC, 1, payload["sources"], CRAWL, ttl=ttl)
+    return client
+
+
+def _open_breaker():
+    breaker = get_breaker("firecrawl /research/start")
+    for _ in range(breaker.min_calls):
+        breaker.record(False, 0.0)
+    assert breaker.is_open()
+
+
+def test_expired_crawl_is_served_stale_while_the_breaker_is_open():
+    client = _client(ttl=-1)
+    _open_breaker()
+
+    result = asyncio.run(client.explore_blockchain_topic_async(TOPIC, depth=1))
+    assert result["stale"] is True
+    assert not result.get("simulated")
+    assert result["raw_data"] == CRAWL["raw_data"]
+
+    assert client.explore_blockchain_topic(TOPIC, depth=1)["stale"] is True
+
+
+def test_expired_crawl_is_not_served_as_fresh():
+    client = _client(ttl=-1)
+    payload = client._build_payload(TOPIC, 1)
+    assert client._cache_get(payload) is None
+    # The failed fresh lookup leaves the entry for the fallback
+    assert client.cache.get(TOPIC, 1, payload["sources"], allow_stale=True) is not None
+
+
+def test_fresh_crawl_is_served_even_while_the_breaker_is_open():
+    client = _client(ttl=60)
+    _open_breaker()
+    result = asyncio.run(client.explore_blockchain_topic_async(TOPIC, depth=1))
+    assert "stale" not in result
+    assert result["raw_data"] == CRAWL["raw_data"]
+
+
+def _split_crawl(monkeypatch, failing_sources):
+    client = FirecrawlClient(cache=CrawlCache(":memory:"), api_key="test")
+
+    async def poll(payload, timer):
+        if set(payload["sources"]) & set(failing_sources):
+            raise ResearchJobError("failed")
+        return {"raw_data": [{"source": source, "content": f"From {source}"} for source in payload["sources"]]}
+
+    monkeypatch.setattr(client, "_poll_research_job_async", poll)
+
+    async def crawl():
+        return [batch async for batch in client.iter_blockchain_topic_async(TOPIC, depth=3)]
+
+    batches = asyncio.run(crawl())
+    payload = client._build_payload(TOPIC, 3)
+    return batches, client.cache.get(TOPIC, 3, payload["sources"]), payload["sources"]
+
+
+def test_split_crawl_is_cached_when_every_job_succeeds(monkeypatch):
+    batches, cached, sources = _split_crawl(monkeypatch, [])
+    assert len(batches) == 3
+    assert sorted(item["source"] for item in cached["raw_data"]) == sorted(sources)
+
+
+def test_partial_split_crawl_is_not_cached(monkeypatch):
+    sources = FirecrawlClient.BLOCKCHAIN_SOURCES[:9]
+    batches, cached, _ = _split_crawl(monkeypatch, [sources[0]])
+    assert sum(len(batch["raw_data"]) for batch in batches) == 6
+    assert cached is None
+
+
+def test_async_client_does_not_import_requests():
+    # A fresh interpreter, since other tests may already have imported requests
+    code = ("import sys; from firecrawl_client import FirecrawlClient; "
+            "FirecrawlClient(cache=False, api_key='test'); print('requests' in sys.modules)")
+    output = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.dirname(__file__)),
+                            capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "False"
@@ -0,0 +1,107 @@
+import os
+import json
+import time
+import socket
+import asyncio
+import threading
+import concurrent.futures
+import jobs
+import streaming
+from clients import registry
+from jobs import COMPLETED, FAILED, QUEUED, JobManager, JobStore
+
+ALICE = {"openai": "sk-alice", "firecrawl": "fc-alice"}
+BOB = {"openai": "sk-bob", "firecrawl": "fc-bob"}
+
+
+def test_jobs_run_with_their_own_keys_and_coalesce_only_on_matching_keys(monkeypatch):
+    used = []
+
+    async def conduct_research_async(topic, depth=3, on_event=None, api_keys=None, **options):
+        await asyncio.sleep(0.2)
+        used.append(api_keys)
+        return {"overview": topic}
+
+    monkeypatch.setattr(jobs, "conduct_research_async", conduct_research_async)
+    manager = JobManager(store=JobStore(":memory:"))
+
+    alice, joined = manager.submit_coalesced("Rollups", 2, session_id="a", api_keys=ALICE, compare=["A", "B"])
+    assert not joined
+    bob, joined = manager.submit_coalesced("Rollups", 2, session_id="b", api_keys=BOB, compare=["A", "B"])
+    assert not joined and bob != alice
+    again, joined = manager.submit_coalesced("rollups", 2, session_id="c", api_keys=dict(ALICE), compare=["A", "B"])
+    assert joined and again == alice
+
+    for job_id in (alice, bob):
+        registry.run_sync(manager.wait(job_id, 5))
+        job = manager.store.get(job_id)
+        assert job["status"] == COMPLETED
+        assert job["options"] == {"compare": ["A", "B"]}
+        assert "sk-" not in json.dumps(job)
+    assert sorted(keys["openai"] for keys in used) == ["sk-alice", "sk-bob"]
+    assert "sk-alice" not in JobManager.flight_key("Rollups", 2, {}, ALICE)
+
+
+def _unfinished_job(store, owner):
+    return store.create("s", "Rollups", 2, {}, owner=owner)
+
+
+def test_restart_fails_only_jobs_of_managers_that_are_gone(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    store = JobStore(path)
+    live = JobManager(store=store)
+    gone = f"{socket.gethostname()}:{os.getpid()}:finished"
+    live_job = _unfinished_job(store, live.owner)
+    elsewhere_job = _unfinished_job(store, "other-host:1:abc")
+    orphan_job = _unfinished_job(store, gone)
+    legacy_job = _unfinished_job(store, None)
+
+    JobManager(store=JobStore(path))
+
+    statuses = {job_id: store.get(job_id)["status"] for job_id in (live_job, elsewhere_job, orphan_job, legacy_job)}
+    assert statuses == {live_job: QUEUED, elsewhere_job: QUEUED, orphan_job: FAILED, legacy_job: FAILED}
+
+
+def test_job_store_writes_stay_off_the_event_loop(monkeypatch):
+    loop_threads = set()
+
+    async def conduct_research_async(topic, depth=3, on_event=None, api_keys=None, **options):
+        loop_threads.add(threading.get_ident())
+        streaming.emit(on_event, streaming.CRAWL_FINISHED, sources=1, simulated=False, stale=False)
+        return {"overview": topic}
+
+    monkeypatch.setattr(jobs, "conduct_research_async", conduct_research_async)
+    manager = JobManager(store=JobStore(":memory:"))
+    writer_threads = set()
+    update = manager.store.update
+
+    def recording_update(job_id, **fields):
+        writer_threads.add(threading.get_ident())
+        update(job_id, **fields)
+
+    monkeypatch.setattr(manager.store, "update", recording_update)
+    job_id = manager.submit("Rollups", 2)
+    registry.run_sync(manager.wait(job_id, 5))
+
+    assert manager.store.get(job_id)["status"] == COMPLETED
+    assert writer_threads and not writer_threads & loop_threads
+
+
+def test_job_cancelled_before_it_starts_is_forgotten_and_failed(monkeypatch):
+    def submit(coro):
+        # A job whose task is cancelled before its first step never enters _run
+        coro.close()
+        return concurrent.futures.Future()
+
+    monkeypatch.setattr(jobs.registry, "submit", submit)
+    manager = JobManager(store=JobStore(":memory:"))
+    job_id, _ = manager.submit_coalesced("Rollups", 2)
+    assert manager.cancel(job_id)
+
+    assert manager.pending() == 0
+    again, joined = manager.submit_coalesced("Rollups", 2, max_pending=1)
+    assert not joined and again != job_id
+    deadline = time.monotonic() + 2
+    while manager.store.get(job_id)["status"] != FAILED and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert manager.store.get(job_id)["error"] == "Cancelled"
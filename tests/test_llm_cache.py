@@ -0,0 +1,73 @@
+import asyncio
+from types import SimpleNamespace
+from llm_cache import LLMCache, MemoryLRUBackend, SQLiteBackend
+from openai_agent import ResearchAgent
+
+USAGE = {"prompt_tokens": 90, "completion_tokens": 10, "total_tokens": 100}
+
+
+def _key(prompt="Summarize rollups", **overrides):
+    request = dict(model="gpt-4o", system_message="You are a researcher", prompt=prompt,
+                   temperature=0.1, response_format={"type": "json_object"})
+    request.update(overrides)
+    return LLMCache.make_key(**request)
+
+
+def test_key_covers_every_input_that_changes_the_output():
+    assert _key() == _key()
+    assert len({_key(), _key(prompt="Summarize sidechains"), _key(model="gpt-4o-mini"),
+                _key(temperature=0.2), _key(response_format=None)}) == 5
+
+
+def test_hits_record_saved_tokens_and_latency():
+    cache = LLMCache()
+    assert cache.get(_key()) is None
+    cache.set(_key(), '{"overview": "o"}', usage=USAGE, latency=1.5)
+    assert cache.get(_key())["content"] == '{"overview": "o"}'
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "tokens_saved": 100,
+                             "latency_saved": 1.5, "entries": 1}
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryLRUBackend(max_entries=2)
+    backend.set("a", 1)
+    backend.set("b", 2)
+    backend.get("a")
+    backend.set("c", 3)
+    assert backend.get("b") is None
+    assert (backend.get("a"), backend.get("c"), len(backend)) == (1, 3, 2)
+
+
+def test_sqlite_backend_persists_across_instances_and_trims(tmp_path):
+    path = str(tmp_path / "llm.sqlite3")
+    SQLiteBackend(path).set("a", {"content": "{}"})
+    backend = SQLiteBackend(path, max_entries=2)
+    assert backend.get("a") == {"content": "{}"}
+    backend.set("b", {"content": "{}"})
+    backend.set("c", {"content": "{}"})
+    assert len(backend) == 2 and backend.get("c") is not None
+
+
+def test_identical_completions_are_served_from_the_cache(monkeypatch):
+    calls = []
+
+    async def create(**request):
+        calls.append(request)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content='{"overview": "o"}'))],
+                               usage=SimpleNamespace(**USAGE))
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(ResearchAgent, "async_client", property(lambda self: client))
+    cache = LLMCache()
+    first = ResearchAgent(cache=cache, api_key="test")
+    second = ResearchAgent(cache=cache, api_key="test")
+
+    async def run():
+        return [await agent._complete_async("system", "prompt", 0.1) for agent in (first, second)]
+
+    assert asyncio.run(run()) == [{"overview": "o"}, {"overview": "o"}]
+    assert len(calls) == 1
+    assert cache.stats()["tokens_saved"] == 100
+
+    asyncio.run(first._complete_async("system", "prompt", 0.1, use_cache=False))
+    assert len(calls) == 2
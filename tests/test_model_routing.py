@@ -0,0 +1,61 @@
+import json
+import pytest
+import model_routing
+from model_routing import ModelRouter, get_router
+from openai_agent import ElaborationAgent
+
+
+def test_fixed_policy_keeps_the_default_model():
+    router = ModelRouter.from_policy("fixed")
+    assert all(router.route(stage, 100, 1) is None for stage in model_routing.STAGES)
+
+
+def test_tiered_policy_routes_by_stage_size_and_depth():
+    router = ModelRouter.from_policy("tiered")
+    assert router.route("map", 50000, 5) == "gpt-4o-mini"
+    assert router.route("analysis", 2500, 2) == "gpt-4o-mini"
+    assert router.route("analysis", 2501, 2) is None
+    assert router.route("analysis", 1000, 3) is None
+    assert router.route("refresh", 100, 1) is None
+
+
+def test_section_rules_take_precedence_over_the_stage():
+    router = ModelRouter.from_policy("tiered")
+    assert router.route("section", 100, 5, section="references") == "gpt-4o-mini"
+    assert router.route("section", 100, 5, section="overview") is None
+    assert router.route("section", 100, 2, section="overview") == "gpt-4o-mini"
+
+
+def test_stage_rules_take_precedence_over_the_wildcard():
+    router = ModelRouter({"*": [{"model": "small"}], "merge": [{"model": "large", "max_tokens": 10}]})
+    assert router.route("map") == "small"
+    assert router.route("merge", 5) == "large"
+    assert router.route("merge", 50) is None
+    assert ModelRouter.from_policy("small").route("elaboration", 10 ** 6, 5) == "gpt-4o-mini"
+
+
+def test_rules_files_and_invalid_policies(tmp_path):
+    rules = tmp_path / "cheap.json"
+    rules.write_text(json.dumps({"section:regulatory": [{"model": "gpt-4o-mini"}]}))
+    router = get_router(str(rules))
+    assert router.name == "cheap"
+    assert router.route("section", section="regulatory") == "gpt-4o-mini"
+
+    with pytest.raises(ValueError):
+        ModelRouter({"summarize": [{"model": "gpt-4o-mini"}]})
+    with pytest.raises(ValueError):
+        get_router("no-such-policy")
+
+
+def test_default_router_comes_from_the_environment(monkeypatch):
+    monkeypatch.setattr(model_routing, "_default_router", None)
+    monkeypatch.setenv("MODEL_ROUTING_POLICY", "small")
+    assert get_router() is get_router()
+    assert get_router().name == "small"
+
+
+def test_agents_call_the_routed_model_and_fall_back_to_their_own():
+    agent = ElaborationAgent(cache=False, router=ModelRouter.from_policy("tiered"), api_key="test")
+    assert agent._select_model("section", "system", "prompt", 5, "references") == "gpt-4o-mini"
+    assert agent._select_model("section", "system", "prompt", 5, "overview") == agent.model
+    assert agent._select_model(None, "system", "prompt", 1, None) == agent.model
@@ -0,0 +1,102 @@
+import time
+import asyncio
+import logging
+import pytest
+from openai_agent import ElaborationAgent, ResearchAgent
+
+
+def _batches(*batches):
+    async def iterate():
+        for batch in batches:
+            await asyncio.sleep(0)
+            yield batch
+    return iterate()
+
+
+def _agent(monkeypatch, seconds):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    agent = ResearchAgent(cache=False)
+
+    async def complete(system_message, prompt, temperature, use_cache=True, on_token=None, **route):
+        await asyncio.sleep(seconds)
+        return {section: "finding" for section in ResearchAgent.ANALYSIS_SECTIONS}
+
+    monkeypatch.setattr(agent, "_complete_async", complete)
+    return agent
+
+
+def test_analyze_batches_waits_instead_of_spinning(monkeypatch):
+    agent = _agent(monkeypatch, 0.3)
+    waits = []
+    wait = asyncio.wait
+
+    async def counting_wait(*args, **kwargs):
+        waits.append(1)
+        return await wait(*args, **kwargs)
+
+    monkeypatch.setattr(asyncio, "wait", counting_wait)
+    batch = {"raw_data": [{"source": "a", "content": "Rollups post data to Ethereum."}]}
+
+    cpu_started = time.process_time()
+    analysis = asyncio.run(agent.analyze_batches_async("Rollups", _batches(batch)))
+    cpu = time.process_time() - cpu_started
+
+    assert analysis["key_findings"] == "finding"
+    # One wait for the producer and one for the completion, not one per loop turn
+    assert len(waits) <= 5
+    assert cpu < 0.2
+
+
+def test_analyze_batches_surfaces_producer_errors(monkeypatch):
+    agent = _agent(monkeypatch, 0.0)
+
+    async def failing():
+        yield {"raw_data": [{"source": "a", "content": "Some content."}]}
+        raise RuntimeError("crawl failed")
+
+    try:
+        asyncio.run(agent.analyze_batches_async("Rollups", failing()))
+    except Exception as e:
+        assert "crawl failed" in str(e)
+    else:
+        raise AssertionError("the crawl error was swallowed")
+
+
+def _elaboration_agent(monkeypatch, responses):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    agent = ElaborationAgent(cache=False)
+    calls = []
+
+    async def complete(system_message, prompt, temperature, use_cache=True, on_token=None, **route):
+        section = route["section"]
+        calls.append((section, use_cache))
+        attempt = sum(1 for called, _ in calls if called == section)
+        return responses(section, attempt)
+
+    monkeypatch.setattr(agent, "_complete_async", complete)
+    return agent, calls
+
+
+def test_elaborate_sections_retries_a_section_under_the_wrong_key(monkeypatch, caplog):
+    def responses(section, attempt):
+        if section == "regulatory" and attempt == 1:
+            return {"Regulatory": "Written under the wrong key"}
+        return {section: f"{section} text"}
+
+    agent, calls = _elaboration_agent(monkeypatch, responses)
+    with caplog.at_level(logging.WARNING, logger="openai_agent"):
+        report = asyncio.run(agent.elaborate_sections_async("Rollups", {}))
+
+    assert report["regulatory"] == "regulatory text"
+    assert [use_cache for section, use_cache in calls if section == "regulatory"] == [True, False]
+    assert "'regulatory' missing or empty" in caplog.text
+
+
+def test_elaborate_sections_fails_when_a_section_stays_empty(monkeypatch):
+    def responses(section, attempt):
+        return {section: "" if section == "references" else f"{section} text"}
+
+    agent, calls = _elaboration_agent(monkeypatch, responses)
+    with pytest.raises(Exception, match="references"):
+        asyncio.run(agent.elaborate_sections_async("Rollups", {}))
+    assert sum(1 for section, _ in calls if section == "references") == ElaborationAgent.SECTION_ATTEMPTS
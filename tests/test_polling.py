@@ -0,0 +1,29 @@
+from polling import PollingStrategy
+
+
+def _timer(deadline, attempts):
+    timer = PollingStrategy(first_delay=0.25, base_delay=1.0, max_delay=8.0, jitter=0.0, deadline=deadline).start()
+    timer.attempts = attempts
+    return timer
+
+
+def test_backoff_is_clamped_to_the_remaining_time():
+    # The fourth backoff step is 4 s, but only 1.5 s of the deadline remain
+    delay = _timer(1.5, 3).next_delay()
+    assert delay is not None and 1.4 < delay <= 1.5
+
+
+def test_backoff_within_the_deadline_is_unchanged():
+    assert _timer(60.0, 2).next_delay() == 2.0
+
+
+def test_no_poll_once_the_deadline_has_passed():
+    timer = _timer(1.0, 1)
+    timer.started -= 2.0
+    assert timer.next_delay() is None
+
+
+def test_retry_after_beyond_the_deadline_gives_up():
+    timer = _timer(1.5, 1)
+    assert timer.next_delay(retry_after=5.0) is None
+    assert timer.next_delay(retry_after=0.5) == 0.5
@@ -0,0 +1,108 @@
+import time
+import asyncio
+import pytest
+import rate_limit
+from rate_limit import RateLimits, TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake monotonic clock that asyncio.sleep advances instead of waiting"""
+    now = [0.0]
+    sleep = asyncio.sleep
+
+    async def fake_sleep(delay):
+        now[0] += delay
+        await sleep(0)
+
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    return now
+
+
+def test_bucket_allows_a_burst_then_paces_callers(clock):
+    bucket = TokenBucket(rate=2, capacity=4)
+
+    async def run():
+        started = []
+        for _ in range(8):
+            await bucket.acquire()
+            started.append(clock[0])
+        return started
+
+    assert asyncio.run(run()) == [0.0, 0.0, 0.0, 0.0, 0.5, 1.0, 1.5, 2.0]
+    assert bucket.waited == pytest.approx(2.0)
+
+
+def test_bucket_serves_concurrent_waiters_in_order(clock):
+    bucket = TokenBucket(rate=1, capacity=1)
+    order = []
+
+    async def worker(name):
+        await bucket.acquire()
+        order.append((name, clock[0]))
+
+    async def run():
+        await asyncio.gather(*(worker(name) for name in "abc"))
+
+    asyncio.run(run())
+    assert order == [("a", 0.0), ("b", 1.0), ("c", 2.0)]
+
+
+def test_oversized_requests_are_clamped_and_debits_delay_the_next_caller(clock):
+    bucket = TokenBucket(rate=10, capacity=20)
+
+    async def run():
+        await bucket.acquire(100)
+        bucket.debit(10)
+        await bucket.acquire(5)
+
+    asyncio.run(run())
+    # The clamped request empties the bucket and the debit leaves it at -10
+    assert clock[0] == pytest.approx(1.5)
+
+
+def test_limits_apply_only_in_their_context(clock):
+    limits = RateLimits(firecrawl_rps=1, openai_rpm=60, openai_tpm=600)
+
+    async def limited():
+        token = rate_limit.use_limits(limits)
+        try:
+            for _ in range(3):
+                await rate_limit.acquire_firecrawl()
+            await rate_limit.acquire_openai(100)
+            await rate_limit.acquire_openai(100)
+            rate_limit.settle_openai(100, 150)
+        finally:
+            rate_limit.reset_limits(token)
+
+    async def unlimited():
+        for _ in range(10):
+            await rate_limit.acquire_firecrawl()
+            await rate_limit.acquire_openai(10 ** 6)
+        rate_limit.settle_openai(0, 10 ** 6)
+
+    asyncio.run(limited())
+    assert limits.stats()["firecrawl"] == pytest.approx(2.0)
+    assert limits.openai_tokens.tokens < 0
+
+    before = clock[0]
+    asyncio.run(unlimited())
+    assert clock[0] == before
+
+
+def test_limits_are_inherited_by_tasks_started_afterwards(clock):
+    limits = RateLimits(firecrawl_rps=1)
+
+    async def job():
+        await rate_limit.acquire_firecrawl()
+
+    async def run():
+        token = rate_limit.use_limits(limits)
+        try:
+            await asyncio.gather(*(asyncio.create_task(job()) for _ in range(3)))
+        finally:
+            rate_limit.reset_limits(token)
+
+    asyncio.run(run())
+    assert limits.stats() == {"firecrawl": pytest.approx(2.0)}
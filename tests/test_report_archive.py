@@ -0,0 +1,52 @@
+import asyncio
+import pytest
+import blockchain_research
+from report_archive import ReportArchive
+
+TOPIC = "Solana vs Sui throughput"
+SECTIONS = {"overview": "Archived overview", "technical_analysis": "Archived analysis"}
+
+
+def _archive(compare):
+    archive = ReportArchive(":memory:")
+    archive.add(TOPIC, 3, SECTIONS, metadata={"compare": compare})
+    return archive
+
+
+def test_find_similar_matches_comparisons_only_to_the_same_entities():
+    archive = _archive(["Solana", "Sui"])
+    assert archive.find_similar(TOPIC, 3) is None
+    assert archive.find_similar(TOPIC, 3, compare=["Solana", "Aptos"]) is None
+    assert archive.find_similar(TOPIC, 3, compare=["sui", "Solana"])["sections"]["overview"] == "Archived overview"
+
+
+def test_find_similar_keeps_plain_reports_from_comparisons():
+    archive = _archive(None)
+    assert archive.find_similar(TOPIC, 3, compare=["Solana", "Sui"]) is None
+    assert archive.find_similar(TOPIC, 3) is not None
+
+
+class _CrawlStarted(Exception):
+    pass
+
+
+def _research(monkeypatch, archive, compare):
+    def crawl_started(**kwargs):
+        raise _CrawlStarted()
+
+    monkeypatch.setattr(blockchain_research, "get_default_archive", lambda: archive)
+    monkeypatch.setattr(blockchain_research, "FirecrawlClient", crawl_started)
+    return asyncio.run(blockchain_research.conduct_research_async(TOPIC, depth=3, archive_max_age=3600,
+                                                                 compare=compare))
+
+
+@pytest.mark.parametrize("archived, requested", [(["Solana", "Sui"], None), (None, ["Solana", "Sui"])])
+def test_pipeline_does_not_reuse_reports_of_the_other_kind(monkeypatch, archived, requested):
+    with pytest.raises(_CrawlStarted):
+        _research(monkeypatch, _archive(archived), requested)
+
+
+def test_pipeline_reuses_a_comparison_of_the_same_entities(monkeypatch):
+    results = _research(monkeypatch, _archive(["Solana", "Sui"]), ["Sui", "Solana"])
+    assert results["archived"]["topic"] == TOPIC
+    assert results["compared"] == ["Sui", "Solana"]
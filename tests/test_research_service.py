@@ -0,0 +1,95 @@
+import json
+import time
+import asyncio
+import threading
+import jobs
+from jobs import COMPLETED, JobManager, JobStore
+from research_service import ResearchService
+
+
+def _service(monkeypatch, max_concurrent=1, queue_limit=1, token=None):
+    release = threading.Event()
+    calls = []
+
+    async def conduct_research_async(topic, depth=3, on_event=None, api_keys=None, **options):
+        calls.append((topic, depth, options))
+        while not release.is_set():
+            await asyncio.sleep(0.01)
+        return {"overview": topic}
+
+    monkeypatch.setattr(jobs, "conduct_research_async", conduct_research_async)
+    manager = JobManager(store=JobStore(":memory:"), max_concurrent=max_concurrent)
+    return ResearchService(manager, queue_limit=queue_limit, token=token), release, calls
+
+
+def _request(service, method, target, body=None, headers=None):
+    payload = json.dumps(body).encode() if body is not None else b""
+    return asyncio.run(service.route(method, target, headers or {}, payload))
+
+
+def test_routes_submission_status_and_result(monkeypatch):
+    service, release, calls = _service(monkeypatch)
+    status, payload, headers = _request(service, "POST", "/research",
+                                        {"topic": " Rollups ", "depth": 2, "dedupe": "paragraph"})
+    assert status == 202 and not payload["coalesced"]
+    job_id = payload["job_id"]
+    assert headers["Location"] == f"/research/{job_id}"
+
+    assert _request(service, "GET", f"/research/{job_id}/result")[0] == 202
+    status, job, _ = _request(service, "GET", f"/research/{job_id}")
+    assert status == 200 and job["topic"] == "Rollups" and "results" not in job
+
+    release.set()
+    status, result, _ = _request(service, "GET", f"/research/{job_id}/result?wait=5")
+    assert status == 200 and result["results"] == {"overview": "Rollups"}
+    assert service.manager.get(job_id)["status"] == COMPLETED
+    assert calls == [("Rollups", 2, {"dedupe": "paragraph"})]
+
+    assert _request(service, "GET", "/research/unknown")[0] == 404
+    assert _request(service, "PUT", "/research")[0] == 404
+    assert _request(service, "GET", "/health")[1]["status"] == "ok"
+
+
+def test_invalid_submissions_are_rejected(monkeypatch):
+    service, release, calls = _service(monkeypatch)
+    for body in ([], {"depth": 2}, {"topic": "  "}, {"topic": "x" * 501}, {"topic": "Rollups", "depth": 6},
+                 {"topic": "Rollups", "depth": True}, {"topic": "Rollups", "speed": "fast"},
+                 {"topic": "Rollups", "analysis_mode": "magic"}, {"topic": "Rollups", "dedupe": "sentence"},
+                 {"topic": "Rollups", "clean": "yes"}, {"topic": "Rollups", "routing": "rules.json"},
+                 {"topic": "Rollups", "compare": ["Arbitrum"]}, {"topic": "Rollups", "archive_max_age": -1}):
+        status, payload, _ = _request(service, "POST", "/research", body)
+        assert status == 400, body
+        assert "error" in payload
+    assert _request(service, "POST", "/research", None)[0] == 400
+    assert calls == [] and service.manager.pending() == 0
+    release.set()
+
+
+def test_submissions_beyond_the_queue_limit_get_503_but_may_join(monkeypatch):
+    service, release, calls = _service(monkeypatch, max_concurrent=1, queue_limit=1)
+    first = _request(service, "POST", "/research", {"topic": "Rollups"})
+    second = _request(service, "POST", "/research", {"topic": "Sidechains"})
+    assert first[0] == second[0] == 202
+
+    status, payload, headers = _request(service, "POST", "/research", {"topic": "Bridges"})
+    assert status == 503 and headers["Retry-After"] == "30"
+
+    status, payload, _ = _request(service, "POST", "/research", {"topic": "rollups"})
+    assert status == 202 and payload["coalesced"] and payload["job_id"] == first[1]["job_id"]
+    assert "research_service_submissions_total{outcome=\"rejected\"}" in _request(service, "GET", "/metrics")[1]
+
+    release.set()
+    for job_id in (first[1]["job_id"], second[1]["job_id"]):
+        assert _request(service, "GET", f"/research/{job_id}/result?wait=5")[0] == 200
+    deadline = time.time() + 5
+    while service.manager.pending() and time.time() < deadline:
+        time.sleep(0.01)
+    assert _request(service, "POST", "/research", {"topic": "Bridges"})[0] == 202
+
+
+def test_bearer_token_is_required_when_configured(monkeypatch):
+    service, release, _ = _service(monkeypatch, token="secret")
+    status, _, headers = _request(service, "GET", "/health")
+    assert status == 401 and headers["WWW-Authenticate"] == "Bearer"
+    assert _request(service, "GET", "/health", headers={"authorization": "Bearer secret"})[0] == 200
+    release.set()
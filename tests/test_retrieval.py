@@ -0,0 +1,59 @@
+from openai_agent import ResearchAgent
+from retrieval import SECTION_QUERIES, PassageIndex, build_section_context, tokenize
+
+
+def test_every_section_query_is_used_by_the_retrieval_analysis():
+    assert set(SECTION_QUERIES) == set(ResearchAgent.ANALYSIS_SECTIONS)
+
+
+def _index(*texts):
+    return PassageIndex([{"text": text, "source": f"site{i}.org"} for i, text in enumerate(texts)])
+
+
+def test_tokenize_drops_stopwords_and_single_characters():
+    assert tokenize("The TVL of a rollup is $4B and growing") == ["tvl", "rollup", "4b", "growing"]
+
+
+def test_bm25_ranks_frequent_and_rare_terms_higher():
+    index = _index("staking staking rewards paid", "staking rewards paid daily", "validators run consensus nodes",
+                   "emission schedule set yearly", "validators vote blocks weekly")
+    assert [passage_id for _, passage_id in index.search("staking")] == [0, 1]
+    # "emission" occurs in one passage and "validators" in two, so the rarer term scores higher
+    assert index.search("emission validators")[0][1] == 3
+    assert index.search("sharding") == []
+
+
+def test_bm25_normalizes_for_passage_length():
+    filler = " ".join(f"filler{i}" for i in range(60))
+    index = _index(f"Rollups post data to Ethereum. {filler}", "Rollups post data to Ethereum.", "Sidechains.")
+    assert [passage_id for _, passage_id in index.search("rollups")] == [1, 0]
+
+
+def test_select_respects_budget_k_and_exclusions():
+    index = _index("rollup " * 40, "rollup rollup fees", "rollup bridge", "rollup")
+    ranked = [passage_id for _, passage_id in index.search("rollup")]
+    assert index.select("rollup", token_budget=1000, k=2) == ranked[:2]
+    assert index.select("rollup", token_budget=20) == [passage_id for passage_id in ranked if passage_id != 0]
+    assert ranked[0] not in index.select("rollup", token_budget=1000, exclude={ranked[0]})
+
+
+def test_from_raw_data_splits_documents_into_attributed_passages():
+    raw_data = {"raw_data": [
+        {"source": "l2beat.com", "content": "\n\n".join(["Rollup throughput grew. " * 10] * 6)},
+        {"url": "https://ethereum.org/staking", "content": "Staking needs 32 ETH."},
+        {"source": "empty.org", "content": ""}
+    ]}
+    index = PassageIndex.from_raw_data(raw_data, passage_tokens=150)
+    assert len(index.passages) == 4
+    assert all(len(passage["text"]) <= 600 for passage in index.passages)
+    assert index.passages[-1]["url"] == "https://ethereum.org/staking"
+
+
+def test_section_context_gives_each_passage_to_one_section():
+    index = _index("Token supply and staking rewards.", "Roadmap: mainnet upgrade planned.",
+                   "Validators and the foundation govern staking.")
+    context = build_section_context(index, "Ethereum", ["tokenomics", "roadmap", "stakeholders"])
+
+    assert context.index("### Context for tokenomics") < context.index("### Context for roadmap")
+    assert context.count("Token supply and staking rewards.") == 1
+    assert "[Source: site1.org]\nRoadmap: mainnet upgrade planned." in context
@@ -0,0 +1,55 @@
+import streaming
+import blockchain_research
+
+
+def test_stream_research_yields_events_then_the_results(monkeypatch):
+    async def conduct_research_async(topic, depth=3, on_event=None, api_keys=None, **options):
+        streaming.emit(on_event, streaming.CRAWL_STARTED, topic=topic)
+        return {"overview": topic, "key": api_keys["openai"]}
+
+    monkeypatch.setattr(blockchain_research, "conduct_research_async", conduct_research_async)
+    events = list(blockchain_research.stream_research("Rollups", api_keys={"openai": "sk-test"}))
+
+    assert [event["type"] for event in events] == [streaming.CRAWL_STARTED, streaming.RESEARCH_COMPLETED]
+    assert events[-1]["results"] == {"overview": "Rollups", "key": "sk-test"}
+
+
+def test_stream_research_reports_failures_as_an_event(monkeypatch):
+    async def conduct_research_async(topic, depth=3, on_event=None, **options):
+        raise ValueError("no key")
+
+    monkeypatch.setattr(blockchain_research, "conduct_research_async", conduct_research_async)
+    events = list(blockchain_research.stream_research("Rollups"))
+    assert events == [{"type": streaming.RESEARCH_FAILED, "error": "no key"}]
+
+
+REPORT = '{"overview": "Rollups \\"batch\\" transactions", "score": 7, "tags": ["l2", "eth"], "regulatory": "MiCA\\u00e9 applies"}'
+
+
+def test_parse_partial_json_returns_string_fields_of_a_complete_object():
+    assert streaming.parse_partial_json(REPORT) == {
+        "overview": 'Rollups "batch" transactions', "regulatory": "MiCAé applies"
+    }
+
+
+def test_parse_partial_json_is_monotonic_over_every_prefix():
+    previous = {}
+    for end in range(len(REPORT) + 1):
+        fields = streaming.parse_partial_json(REPORT[:end])
+        assert set(previous) <= set(fields), REPORT[:end]
+        for key, value in fields.items():
+            assert isinstance(value, str)
+            assert value.startswith(previous.get(key, "")) or key not in previous, REPORT[:end]
+        previous = fields
+
+
+def test_parse_partial_json_keeps_open_strings_and_skips_partial_escapes():
+    assert streaming.parse_partial_json('{"overview": "Rollups post') == {"overview": "Rollups post"}
+    assert streaming.parse_partial_json('{"overview": "Rollups \\') == {"overview": "Rollups "}
+    assert streaming.parse_partial_json('{"overview": "MiCA\\u00') == {"overview": "MiCA"}
+    # Non-string values are skipped, and parsing stops at one that is still incomplete
+    assert streaming.parse_partial_json('{"a": "x", "score": 7') == {"a": "x"}
+    assert streaming.parse_partial_json('{"a": "x", "tags": ["l2", "b": "y"') == {"a": "x"}
+    assert streaming.parse_partial_json('{"overv') == {}
+    assert streaming.parse_partial_json("") == {}
+    assert streaming.parse_partial_json('```json\n{"a": "x"') == {"a": "x"}
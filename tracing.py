@@ -0,0 +1,397 @@
+import os
+import json
+import time
+import uuid
+import threading
+import contextlib
+import contextvars
+
+# USD per million (prompt, completion) tokens, used for cost estimates; extend as models are added
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60)
+}
+
+# Upper bounds (seconds) of the duration histogram buckets exported to Prometheus
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+_current_trace = contextvars.ContextVar("trace", default=None)
+_current_span = contextvars.ContextVar("span", default=None)
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    """
+    Estimate the price of a completion from its token counts
+
+    Args:
+        model (str): Model name; dated variants (e.g. "gpt-4o-2024-08-06") use the base model's price
+        prompt_tokens (int): Prompt tokens
+        completion_tokens (int): Completion tokens
+
+    Returns:
+        float: Estimated cost in USD, or 0.0 for models without a known price
+    """
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        # Longest matching prefix, so "gpt-4o-mini-..." is not priced as "gpt-4o"
+        matches = [name for name in MODEL_PRICES if model.startswith(name)]
+        prices = MODEL_PRICES[max(matches, key=len)] if matches else (0.0, 0.0)
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+
+class Span:
+    """
+    A timed operation within a trace: a pipeline stage or a single HTTP call
+    """
+
+    __slots__ = ("name", "kind", "span_id", "parent_id", "start", "duration", "attributes", "error")
+
+    def __init__(self, name, kind, parent_id, start, attributes):
+        self.name = name
+        self.kind = kind
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.start = start
+        self.duration = None
+        self.attributes = attributes
+        self.error = None
+
+    def set(self, **attributes):
+        """Add attributes known only once the operation has run, e.g. an HTTP status"""
+        self.attributes.update(attributes)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": round(self.start, 6),
+            "duration": round(self.duration, 6) if self.duration is not None else None,
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+
+class _NoopSpan:
+    """Stand-in yielded when no trace is active, so instrumented code needs no checks"""
+
+    __slots__ = ()
+
+    def set(self, **attributes):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """
+    Spans and token usage collected during one research run
+    """
+
+    def __init__(self, name, **attributes):
+        """
+        Args:
+            name (str): Trace name, e.g. "research"
+            **attributes: Attributes of the whole run (topic, depth, ...)
+        """
+        self.name = name
+        self.trace_id = uuid.uuid4().hex
+        self.attributes = attributes
+        self.started = time.time()
+        self.duration = None
+        self.spans = []
+        self.usage = {}
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def offset(self):
+        """Seconds since the trace started"""
+        return time.perf_counter() - self._origin
+
+    def add_span(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def record_usage(self, model, prompt_tokens, completion_tokens, cached=False):
+        """
+        Account for one completion's tokens and cost
+
+        Args:
+            model (str): Model name
+            prompt_tokens (int): Prompt tokens
+            completion_tokens (int): Completion tokens
+            cached (bool): Served from the response cache, so nothing was billed
+        """
+        with self._lock:
+            entry = self.usage.setdefault(model, {
+                "calls": 0, "cached_calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0
+            })
+            if cached:
+                entry["cached_calls"] += 1
+                return
+            entry["calls"] += 1
+            entry["prompt_tokens"] += prompt_tokens
+            entry["completion_tokens"] += completion_tokens
+            entry["cost_usd"] += estimate_cost(model, prompt_tokens, completion_tokens)
+
+    def summary(self):
+        """
+        Condense the trace: time per stage, time in HTTP calls per service, tokens and cost
+
+        Returns:
+            dict: Summary suitable for attaching to research results
+        """
+        stages = {}
+        http = {}
+        for span in self.spans:
+            if span.duration is None:
+                continue
+            if span.kind == "stage":
+                stages[span.name] = round(stages.get(span.name, 0.0) + span.duration, 4)
+            elif span.kind == "http":
+                service = http.setdefault(span.attributes.get("service", span.name), {"calls": 0, "seconds": 0.0})
+                service["calls"] += 1
+                service["seconds"] = round(service["seconds"] + span.duration, 4)
+
+        return {
+            "trace_id": self.trace_id,
+            "duration": round(self.duration if self.duration is not None else self.offset(), 4),
+            "stages": stages,
+            "http": http,
+            "prompt_tokens": sum(entry["prompt_tokens"] for entry in self.usage.values()),
+            "completion_tokens": sum(entry["completion_tokens"] for entry in self.usage.values()),
+            "cost_usd": round(sum(entry["cost_usd"] for entry in self.usage.values()), 6),
+            "models": {model: {**entry, "cost_usd": round(entry["cost_usd"], 6)} for model, entry in self.usage.items()}
+        }
+
+    def to_dict(self):
+        """Full trace with every span, e.g. for JSONL export"""
+        return {
+            "name": self.name,
+            "started": self.started,
+            "attributes": self.attributes,
+            **self.summary(),
+            "spans": [span.to_dict() for span in self.spans]
+        }
+
+
+class Metrics:
+    """
+    Process-wide counters, gauges and duration histograms in Prometheus text format
+
+    Updated as spans finish, so the cost is a few dict operations per span.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+
+    def inc(self, name, value=1.0, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def set(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {"buckets": [0] * len(DURATION_BUCKETS), "sum": 0.0, "count": 0}
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if seconds <= bound:
+                    histogram["buckets"][index] += 1
+            histogram["sum"] += seconds
+            histogram["count"] += 1
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def render(self):
+        """
+        Render every metric in the Prometheus text exposition format
+
+        Returns:
+            str: Metrics text, e.g. to serve at /metrics or write for a textfile collector
+        """
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+            typed = set()
+            for (name, labels), value in counters:
+                if name not in typed:
+                    lines.append(f"# TYPE {name} counter")
+                    typed.add(name)
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+            for (name, labels), value in gauges:
+                if name not in typed:
+                    lines.append(f"# TYPE {name} gauge")
+                    typed.add(name)
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+            for (name, labels), histogram in histograms:
+                if name not in typed:
+                    lines.append(f"# TYPE {name} histogram")
+                    typed.add(name)
+                for bound, count in zip(DURATION_BUCKETS, histogram["buckets"]):
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', str(bound)),))} {count}")
+                lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {histogram['count']}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(histogram['sum'])}")
+                lines.append(f"{name}_count{_labels(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def _number(value):
+    return repr(round(value, 6)) if isinstance(value, float) else str(value)
+
+
+metrics = Metrics()
+
+
+def tracing_enabled():
+    """Tracing is on unless TRACING_DISABLED is set"""
+    return os.getenv("TRACING_DISABLED", "").lower() not in ("1", "true", "yes")
+
+
+def start_trace(name, **attributes):
+    """
+    Begin collecting spans for the current context and the tasks it starts
+
+    Args:
+        name (str): Trace name
+        **attributes: Attributes of the whole run
+
+    Returns:
+        tuple: (Trace or None when tracing is disabled, token for finish_trace)
+    """
+    trace = Trace(name, **attributes) if tracing_enabled() else None
+    return trace, _current_trace.set(trace)
+
+
+def finish_trace(trace, token, error=None):
+    """
+    Stop collecting spans, update the metrics and export the trace if TRACE_JSONL_PATH is set
+
+    Args:
+        trace (Trace): Trace returned by start_trace (may be None)
+        token (contextvars.Token): Token returned by start_trace
+        error (BaseException): Exception that ended the run, if any
+    """
+    _current_trace.reset(token)
+    if trace is None:
+        return
+
+    trace.duration = trace.offset()
+    outcome = "error" if error is not None else "ok"
+    metrics.inc("research_runs_total", outcome=outcome)
+    metrics.observe("research_duration_seconds", trace.duration)
+    for model, entry in trace.usage.items():
+        metrics.inc("llm_tokens_total", entry["prompt_tokens"], model=model, type="prompt")
+        metrics.inc("llm_tokens_total", entry["completion_tokens"], model=model, type="completion")
+        metrics.inc("llm_cost_usd_total", entry["cost_usd"], model=model)
+        metrics.inc("llm_cache_hits_total", entry["cached_calls"], model=model)
+
+    path = os.getenv("TRACE_JSONL_PATH")
+    if path:
+        record = trace.to_dict()
+        if error is not None:
+            record["error"] = str(error)
+        write_jsonl(record, path)
+
+
+def current_trace():
+    """The trace collecting spans in this context, or None"""
+    return _current_trace.get()
+
+
+@contextlib.contextmanager
+def span(name, kind="stage", **attributes):
+    """
+    Time an operation as a span of the current trace (a no-op outside of a trace)
+
+    Args:
+        name (str): Span name, e.g. "crawl" or "openai.chat"
+        kind (str): "stage" for pipeline stages, "http" for single HTTP calls
+        **attributes: Span attributes
+
+    Yields:
+        Span: The span, for setting attributes once known
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield _NOOP_SPAN
+        return
+
+    record = Span(name, kind, _current_span.get(), trace.offset(), attributes)
+    token = _current_span.set(record.span_id)
+    started = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record.error = type(e).__name__
+        raise
+    finally:
+        record.duration = time.perf_counter() - started
+        _current_span.reset(token)
+        trace.add_span(record)
+        if kind == "http":
+            metrics.observe("http_request_duration_seconds", record.duration,
+                            service=attributes.get("service", name), status=str(record.attributes.get("status", "error")))
+        else:
+            metrics.observe("research_stage_duration_seconds", record.duration, stage=name)
+
+
+def record_usage(model, usage, cached=False):
+    """
+    Add a completion's token usage to the current trace
+
+    Args:
+        model (str): Model name
+        usage (dict): Usage with "prompt_tokens" and "completion_tokens" (see llm_cache.usage_to_dict)
+        cached (bool): Served from the response cache
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        usage = usage or {}
+        trace.record_usage(model, usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0), cached=cached)
+
+
+def write_jsonl(record, path):
+    """
+    Append a trace (dict or Trace) to a JSONL file
+
+    Args:
+        record (dict): Trace.to_dict() output, or a Trace
+        path (str): Target file
+    """
+    if isinstance(record, Trace):
+        record = record.to_dict()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as handle:
+        handle.write(json.dumps(record) + "\n")
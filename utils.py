@@ -1,6 +1,15 @@
-import streamlit as st
 import base64
 
+# Report sections in display order, with their markdown headings
+REPORT_HEADINGS = (
+    ("overview", "Overview"),
+    ("technical_analysis", "Technical Analysis"),
+    ("market_adoption", "Market & Adoption"),
+    ("regulatory", "Regulatory Considerations"),
+    ("future_outlook", "Future Outlook"),
+    ("references", "References & Sources")
+)
+
 def download_markdown(markdown_content, filename="research_report.md"):
     """
     Generate a download link for markdown content
@@ -16,6 +25,22 @@ def download_markdown(markdown_content, filename="research_report.md"):
     href = f'<a href="data:file/markdown;base64,{b64}" download="{filename}">Download Markdown File</a>'
     return href
 
+def report_markdown(topic, results):
+    """
+    Render research results as a standalone markdown report
+    
+    Args:
+        topic (str): The blockchain research topic
+        results (dict): The research results dictionary
+        
+    Returns:
+        str: Markdown document with a title and one section per report part
+    """
+    return "\n\n".join(
+        [f"# {topic} - Blockchain Research Report\n"]
+        + [f"## {heading}\n" + (results.get(key) or "") for key, heading in REPORT_HEADINGS]
+    )
+
 def format_research_results(results):
     """
     Format research results for display